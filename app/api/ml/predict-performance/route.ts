@@ -100,14 +100,62 @@ function calculateFeatures(request: PredictionRequest, channelBaseline: number)
   return features;
 }
 
+// Long-lived prediction server (scripts/ml_prediction_server.py) speaking
+// newline-delimited JSON, so the model is loaded once instead of per request
+let predictionServer: any = null;
+let nextRequestId = 1;
+const pendingPredictions = new Map<number, { resolve: (value: any) => void; reject: (reason: Error) => void }>();
+
+function getPredictionServer() {
+  if (predictionServer) {
+    return predictionServer;
+  }
+
+  const { spawn } = require('child_process');
+  const readline = require('readline');
+
+  const pythonPath = 'python'; // Adjust if needed
+  const scriptPath = path.join(process.cwd(), 'scripts', 'ml_prediction_server.py');
+  const serverProcess = spawn(pythonPath, [scriptPath]);
+
+  readline.createInterface({ input: serverProcess.stdout }).on('line', (line: string) => {
+    let result: any;
+    try {
+      result = JSON.parse(line);
+    } catch (parseError) {
+      console.error(`Failed to parse prediction server output: ${line}`);
+      return;
+    }
+    const pending = pendingPredictions.get(result.id);
+    if (pending) {
+      pendingPredictions.delete(result.id);
+      pending.resolve(result);
+    }
+  });
+
+  serverProcess.stderr.on('data', (data: Buffer) => {
+    console.log(`[ml_prediction_server] ${data.toString().trim()}`);
+  });
+
+  serverProcess.on('exit', (code: number) => {
+    // Fail in-flight requests; the next request starts a fresh server
+    predictionServer = null;
+    pendingPredictions.forEach(pending => pending.reject(new Error(`Prediction server exited with code ${code}`)));
+    pendingPredictions.clear();
+  });
+
+  predictionServer = serverProcess;
+  return serverProcess;
+}
+
 async function callPythonModel(request: PredictionRequest, features: any): Promise<any> {
   // Call the actual Python XGBoost model
-  const { spawn } = require('child_process');
-  const path = require('path');
-  
   return new Promise((resolve, reject) => {
-    // Prepare input data for Python script
+    const id = nextRequestId++;
+    
+    // Prepare input data for the prediction server
     const inputData = {
+      id,
       title: request.title,
       topic_cluster_id: request.topic_cluster_id,
       format_type: request.format_type,
@@ -118,45 +166,28 @@ async function callPythonModel(request: PredictionRequest, features: any): Promi
       view_velocity_3_7: features.view_velocity_3_7
     };
     
-    // Spawn Python process
-    const pythonPath = 'python'; // Adjust if needed
-    const scriptPath = path.join(process.cwd(), 'scripts', 'ml_predict.py');
-    const pythonProcess = spawn(pythonPath, [scriptPath]);
-    
-    let output = '';
-    let error = '';
-    
-    // Send input data to Python script
-    pythonProcess.stdin.write(JSON.stringify(inputData));
-    pythonProcess.stdin.end();
-    
-    // Collect output
-    pythonProcess.stdout.on('data', (data: Buffer) => {
-      output += data.toString();
-    });
-    
-    pythonProcess.stderr.on('data', (data: Buffer) => {
-      error += data.toString();
-    });
+    // Timeout after 10 seconds
+    const timer = setTimeout(() => {
+      pendingPredictions.delete(id);
+      reject(new Error('Python model prediction timeout'));
+    }, 10000);
     
-    pythonProcess.on('close', (code: number) => {
-      if (code === 0) {
-        try {
-          const result = JSON.parse(output.trim());
+    pendingPredictions.set(id, {
+      resolve: (result: any) => {
+        clearTimeout(timer);
+        if (result.model_version === 'fallback') {
+          reject(new Error(`Python model failed: ${result.error}`));
+        } else {
           resolve(result);
-        } catch (parseError) {
-          reject(new Error(`Failed to parse Python output: ${output}`));
         }
-      } else {
-        reject(new Error(`Python script failed with code ${code}: ${error}`));
+      },
+      reject: (error: Error) => {
+        clearTimeout(timer);
+        reject(error);
       }
     });
     
-    // Timeout after 10 seconds
-    setTimeout(() => {
-      pythonProcess.kill();
-      reject(new Error('Python model prediction timeout'));
-    }, 10000);
+    getPredictionServer().stdin.write(JSON.stringify(inputData) + '\n');
   });
 }
 
@@ -4,12 +4,22 @@ Base wrapper for all tools with caching, error handling, and retry logic (Python
 
 import asyncio
 import hashlib
+import heapq
+import itertools
 import json
+import math
+import os
+import struct
+import sys
 import time
+import weakref
+from collections import OrderedDict, deque
 from typing import Any, Dict, Optional, List, Callable, TypedDict
 from dataclasses import dataclass
 import uuid
 
+from lib.tools.metrics import global_metrics
+
 
 class ToolError(TypedDict):
     code: str
@@ -33,8 +43,25 @@ class ToolConfig:
     handler: Callable
     parallel_safe: bool = True
     cache_ttl: Optional[int] = None  # seconds
-    timeout: Optional[float] = None  # seconds
+    timeout: Optional[float] = None  # seconds; cold-start value and cap for adaptive timeouts
     retry_config: Optional[Dict[str, Any]] = None
+    coalesce: Optional[bool] = None  # defaults to True when cache_ttl is set
+    stale_ttl: Optional[int] = None  # seconds an expired value may still be served
+    negative_ttl: Optional[int] = None  # seconds to remember "not found" results
+    max_concurrency: Optional[int] = None  # per-tool bulkhead size
+    priority: int = 0  # higher values are admitted first when queued
+    circuit_breaker: Optional[Dict[str, Any]] = None  # opt-in; failureThreshold, resetTimeoutMs, halfOpenMaxCalls
+    adaptive_timeout: Optional[Dict[str, Any]] = None  # percentile, multiplier, minMs, maxMs, minSamples
+    hedge: Optional[Dict[str, Any]] = None  # percentile, minSamples, minDelayMs
+    batch_handler: Optional[Callable] = None  # (keys, context) -> ToolResponse mapping key -> data
+    key_param: Optional[str] = None  # ID parameter batched by wrapBatchTool
+    batch_window_ms: float = 3
+    max_batch_size: int = 100
+
+
+# Size of the cache a context gets when it doesn't bring its own
+DEFAULT_CACHE_MAX_ENTRIES = int(os.environ.get('TOOL_CACHE_MAX_ENTRIES', 1000))
+DEFAULT_CACHE_MAX_BYTES = int(os.environ.get('TOOL_CACHE_MAX_BYTES', 64 * 1024 * 1024))
 
 
 class MemoryCache:
@@ -83,14 +110,211 @@ class MemoryCache:
             del self.cache[key]
 
 
+def _estimate_size(value: Any, _depth: int = 0) -> int:
+    """Approximate the in-memory footprint of a cached value in bytes"""
+    size = sys.getsizeof(value)
+    if _depth > 6:
+        return size
+    
+    if isinstance(value, dict):
+        for k, v in value.items():
+            size += _estimate_size(k, _depth + 1) + _estimate_size(v, _depth + 1)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            size += _estimate_size(item, _depth + 1)
+    
+    return size
+
+
+class LRUCache:
+    """
+    Bounded in-memory cache with LRU eviction and size accounting.
+    
+    Entries are limited by count and by approximate byte size. With the
+    'ttl-lru' policy, expired entries are evicted before live ones. A background
+    task sweeps expired entries so idle keys don't linger until they are read.
+    """
+    
+    EVICTION_POLICIES = ('lru', 'ttl-lru')
+    
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+        max_bytes: Optional[int] = DEFAULT_CACHE_MAX_BYTES,
+        eviction_policy: str = 'lru',
+        sweep_interval: Optional[float] = 60.0
+    ):
+        if eviction_policy not in self.EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy: {eviction_policy}")
+        
+        self.cache: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.eviction_policy = eviction_policy
+        self.sweep_interval = sweep_interval
+        self.total_bytes = 0
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        
+        # Min-heap of (expiry, key); stale pairs are skipped when popped
+        self._expiry_heap: List[tuple] = []
+        self._sweeper: Optional[asyncio.Task] = None
+    
+    async def get(self, key: str) -> Optional[Any]:
+        item = self.cache.get(key)
+        if not item:
+            self.misses += 1
+            return None
+        
+        if time.time() > item['expiry']:
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        
+        self.cache.move_to_end(key)
+        self.hits += 1
+        return item['value']
+    
+    async def set(self, key: str, value: Any, ttl: int = 300) -> None:
+        self._ensure_sweeper()
+        
+        size = _estimate_size(value)
+        if key in self.cache:
+            self._remove(key)
+        
+        # A single value larger than the whole budget is never stored
+        if self.max_bytes is not None and size > self.max_bytes:
+            self.evictions += 1
+            return
+        
+        expiry = time.time() + ttl
+        self.cache[key] = {'value': value, 'expiry': expiry, 'size': size}
+        self.total_bytes += size
+        heapq.heappush(self._expiry_heap, (expiry, key))
+        
+        self._enforce_limits()
+    
+    async def delete(self, key: str) -> None:
+        if key in self.cache:
+            self._remove(key)
+    
+    async def exists(self, key: str) -> bool:
+        item = self.cache.get(key)
+        if not item:
+            return False
+        
+        if time.time() > item['expiry']:
+            self._remove(key)
+            self.expirations += 1
+            return False
+        
+        return True
+    
+    def cleanup(self) -> int:
+        """Remove expired entries, returning how many were dropped"""
+        now = time.time()
+        removed = 0
+        heap = self._expiry_heap
+        
+        while heap and heap[0][0] <= now:
+            expiry, key = heapq.heappop(heap)
+            item = self.cache.get(key)
+            if item and item['expiry'] == expiry:
+                self._remove(key)
+                removed += 1
+        
+        # Overwritten keys leave stale heap pairs behind; rebuild when they dominate
+        if len(heap) > 2 * len(self.cache) + 64:
+            self._expiry_heap = [(item['expiry'], k) for k, item in self.cache.items()]
+            heapq.heapify(self._expiry_heap)
+        
+        self.expirations += removed
+        return removed
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters for sizing the cache from real traffic"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.cache),
+            'bytes': self.total_bytes,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations
+        }
+    
+    def close(self) -> None:
+        """Stop the background sweeper"""
+        if self._sweeper:
+            self._sweeper.cancel()
+            self._sweeper = None
+    
+    def _remove(self, key: str) -> None:
+        item = self.cache.pop(key)
+        self.total_bytes -= item['size']
+    
+    def _over_limits(self) -> bool:
+        if len(self.cache) > self.max_entries:
+            return True
+        return self.max_bytes is not None and self.total_bytes > self.max_bytes
+    
+    def _enforce_limits(self) -> None:
+        if not self._over_limits():
+            return
+        
+        if self.eviction_policy == 'ttl-lru':
+            self.cleanup()
+        
+        while self._over_limits():
+            key, item = self.cache.popitem(last=False)
+            self.total_bytes -= item['size']
+            self.evictions += 1
+    
+    def _ensure_sweeper(self) -> None:
+        if not self.sweep_interval or (self._sweeper and not self._sweeper.done()):
+            return
+        
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        
+        self._sweeper = loop.create_task(
+            LRUCache._sweep_loop(weakref.ref(self), self.sweep_interval)
+        )
+    
+    @staticmethod
+    async def _sweep_loop(cache_ref: 'weakref.ref', interval: float) -> None:
+        # Holds only a weak reference so an abandoned cache can still be collected
+        while True:
+            await asyncio.sleep(interval)
+            cache = cache_ref()
+            if cache is None:
+                return
+            cache.cleanup()
+            del cache
+
+
 class SimpleLogger:
     """Simple logger implementation"""
     
-    def __init__(self, prefix: str = '[Tool]'):
+    def __init__(self, prefix: str = '[Tool]', debug_enabled: Optional[bool] = None):
         self.prefix = prefix
+        # Like the TypeScript wrapper, debug output is a development-only default
+        if debug_enabled is None:
+            debug_enabled = os.environ.get('NODE_ENV') == 'development'
+        self.debug_enabled = debug_enabled
     
     def debug(self, message: str, data: Any = None):
-        print(f"{self.prefix} DEBUG: {message}", data or '')
+        if self.debug_enabled:
+            print(f"{self.prefix} DEBUG: {message}", data or '')
     
     def info(self, message: str, data: Any = None):
         print(f"{self.prefix} INFO: {message}", data or '')
@@ -102,79 +326,685 @@ class SimpleLogger:
         print(f"{self.prefix} ERROR: {message}", error or '')
 
 
+_pack_len = struct.Struct('<Q').pack
+_pack_float = struct.Struct('<d').pack
+
+
+def _hash_value(update: Callable, value: Any) -> None:
+    """
+    Feed a canonical, type-tagged encoding of value into a hash.
+    
+    Dicts are walked in sorted key order, so equal params hash equally in any
+    process. Lists of strings (video IDs) and floats (embeddings) are packed
+    in one call instead of element by element.
+    """
+    t = type(value)
+    if t is str:
+        data = value.encode()
+        update(b's' + _pack_len(len(data)))
+        update(data)
+    elif t is int:
+        update(b'i' + str(value).encode() + b';')
+    elif t is float:
+        update(b'f' + _pack_float(value))
+    elif t is bool:
+        update(b'T' if value else b'F')
+    elif value is None:
+        update(b'N')
+    elif isinstance(value, dict):
+        update(b'd' + _pack_len(len(value)))
+        for key in sorted(value):
+            _hash_value(update, key)
+            _hash_value(update, value[key])
+    elif isinstance(value, (list, tuple)):
+        n = len(value)
+        first = type(value[0]) if n else None
+        if first is str:
+            try:
+                joined = ''.join(value)
+            except TypeError:
+                joined = None
+            if joined is not None:
+                # Per-item lengths keep ['ab', 'c'] apart from ['a', 'bc']
+                update(b'S' + _pack_len(n))
+                update(struct.pack(f'<{n}Q', *map(len, value)))
+                update(joined.encode())
+                return
+        elif first is float and all(type(x) is float for x in value):
+            update(b'F' + _pack_len(n))
+            update(struct.pack(f'<{n}d', *value))
+            return
+        update(b'l' + _pack_len(n))
+        for item in value:
+            _hash_value(update, item)
+    elif hasattr(value, 'dtype') and hasattr(value, 'tobytes'):
+        # numpy arrays and scalars
+        update(b'a' + str(value.dtype).encode() + str(getattr(value, 'shape', ())).encode())
+        update(value.tobytes())
+    else:
+        update(b'o')
+        update(json.dumps(value, sort_keys=True, default=str).encode())
+
+
 def create_cache_key(tool_name: str, params: Any) -> str:
     """Create a cache key from tool name and parameters"""
-    param_string = json.dumps(params, sort_keys=True)
-    return hashlib.md5(f"{tool_name}:{param_string}".encode()).hexdigest()
+    hasher = hashlib.blake2b(digest_size=16)
+    _hash_value(hasher.update, tool_name)
+    _hash_value(hasher.update, params)
+    return hasher.hexdigest()
 
 
-def wrapTool(config: Dict[str, Any]) -> Callable:
-    """Wrap a tool handler with caching, error handling, and retry logic"""
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key onto one in-flight task.
     
-    async def wrapped_handler(params: Any, context: Optional[Dict] = None) -> ToolResponse:
-        start_time = time.time()
-        cache = context.get('cache') if context else MemoryCache()
-        logger = context.get('logger') if context else SimpleLogger(f"[{config['name']}]")
+    The first caller for a key starts the work; callers arriving while it runs
+    await the same task. A waiter that is cancelled only detaches itself; the
+    shared task is cancelled once its last waiter has gone away.
+    """
+    
+    def __init__(self):
+        self.in_flight: Dict[str, Dict[str, Any]] = {}
+        self.leaders = 0
+        self.deduplicated = 0
+    
+    async def do(self, key: str, fn: Callable) -> tuple:
+        """Run fn() once per concurrent key, returning (result, shared)"""
+        entry = self.in_flight.get(key)
+        shared = entry is not None
         
-        # Check cache if enabled
-        cache_key = None
-        if config.get('cacheTTL') and config['cacheTTL'] > 0:
-            cache_key = create_cache_key(config['name'], params)
-            
-            try:
-                cached_value = await cache.get(cache_key)
-                if cached_value is not None:
-                    logger.debug('Cache hit', {'cache_key': cache_key})
-                    return {
-                        'success': True,
-                        'data': cached_value,
-                        'metadata': {
-                            'cached': True,
-                            'executionTime': int((time.time() - start_time) * 1000),
-                            'source': 'cache'
-                        }
-                    }
-            except Exception as e:
-                logger.warn('Cache read error', e)
+        if entry is None:
+            task = asyncio.ensure_future(fn())
+            entry = {'task': task, 'waiters': 0}
+            self.in_flight[key] = entry
+            task.add_done_callback(lambda _task: self._release(key, entry))
+            self.leaders += 1
+        else:
+            self.deduplicated += 1
+        
+        entry['waiters'] += 1
+        try:
+            result = await asyncio.shield(entry['task'])
+        except asyncio.CancelledError:
+            entry['waiters'] -= 1
+            if not entry['task'].done() and entry['waiters'] == 0:
+                entry['task'].cancel()
+            raise
+        
+        entry['waiters'] -= 1
+        return result, shared
+    
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'in_flight': len(self.in_flight),
+            'leaders': self.leaders,
+            'deduplicated': self.deduplicated
+        }
+    
+    def _release(self, key: str, entry: Dict[str, Any]) -> None:
+        if self.in_flight.get(key) is entry:
+            del self.in_flight[key]
+
+
+# Shared across wrapped tools so identical calls coalesce between fan-outs
+global_single_flight = SingleFlight()
+
+class Bulkhead:
+    """Concurrency limiter that admits queued callers in priority order"""
+    
+    def __init__(self, limit: int):
+        if limit < 1:
+            raise ValueError("Bulkhead limit must be at least 1")
+        self.limit = limit
+        self.active = 0
+        self._waiters: List[tuple] = []
+        self._seq = itertools.count()
+    
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, future in self._waiters if not future.done())
+    
+    async def acquire(self, priority: int = 0) -> None:
+        if self.active < self.limit and not self.queued:
+            self.active += 1
+            return
+        
+        # Highest priority first, FIFO within the same priority
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (-priority, next(self._seq), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # The slot may have been handed over just before cancellation
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+    
+    def try_acquire(self) -> bool:
+        """Take a free slot without waiting; False when full or callers are queued"""
+        if self.active < self.limit and not self.queued:
+            self.active += 1
+            return True
+        return False
+    
+    def release(self) -> None:
+        # Hand the slot straight to the next live waiter instead of freeing it
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+
+class BulkheadRegistry:
+    """Per-tool bulkheads plus an optional global limit shared by every tool"""
+    
+    def __init__(self, global_limit: Optional[int] = None):
+        self.global_bulkhead = Bulkhead(global_limit) if global_limit else None
+        self.tool_bulkheads: Dict[str, Bulkhead] = {}
+    
+    def for_tool(self, tool_name: str, limit: Optional[int]) -> Optional[Bulkhead]:
+        if not limit:
+            return None
+        bulkhead = self.tool_bulkheads.get(tool_name)
+        if bulkhead is None or bulkhead.limit != limit:
+            bulkhead = Bulkhead(limit)
+            self.tool_bulkheads[tool_name] = bulkhead
+        return bulkhead
+    
+    async def acquire(self, tool_name: str, limit: Optional[int], priority: int = 0) -> List[Bulkhead]:
+        """Acquire the tool slot, then the global slot; returns what must be released"""
+        held: List[Bulkhead] = []
+        try:
+            for bulkhead in (self.for_tool(tool_name, limit), self.global_bulkhead):
+                if bulkhead:
+                    await bulkhead.acquire(priority)
+                    held.append(bulkhead)
+        except BaseException:
+            self.release(held)
+            raise
+        return held
+    
+    def try_acquire(self, tool_name: str, limit: Optional[int]) -> Optional[List[Bulkhead]]:
+        """Acquire the tool and global slots only if both are free now; None otherwise"""
+        held: List[Bulkhead] = []
+        for bulkhead in (self.for_tool(tool_name, limit), self.global_bulkhead):
+            if bulkhead:
+                if not bulkhead.try_acquire():
+                    self.release(held)
+                    return None
+                held.append(bulkhead)
+        return held
+    
+    def release(self, held: List[Bulkhead]) -> None:
+        for bulkhead in reversed(held):
+            bulkhead.release()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        stats = {
+            name: {'limit': b.limit, 'active': b.active, 'queued': b.queued}
+            for name, b in self.tool_bulkheads.items()
+        }
+        if self.global_bulkhead:
+            b = self.global_bulkhead
+            stats['*'] = {'limit': b.limit, 'active': b.active, 'queued': b.queued}
+        return stats
+
+
+# Process-wide bulkheads; pass a BulkheadRegistry as context['bulkheads'] to override
+global_bulkheads = BulkheadRegistry()
+
+class LatencyWindow:
+    """Rolling window of recent handler latencies in seconds"""
+    
+    def __init__(self, size: int = 200):
+        self.samples: deque = deque(maxlen=size)
+    
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+    
+    def percentile(self, q: float) -> Optional[float]:
+        """Nearest-rank percentile for q in [0, 1], or None without samples"""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        rank = max(1, math.ceil(q * len(ordered)))
+        return ordered[rank - 1]
+
+
+class CircuitBreaker:
+    """
+    Per-tool circuit breaker.
+    
+    Closed: calls flow and consecutive failures are counted. Open: calls fail
+    fast until the reset timeout passes. Half-open: a limited number of probe
+    calls decide whether to close again or re-open.
+    """
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, half_open_max_calls: int = 1):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.probes_in_flight = 0
+        
+        self.successes = 0
+        self.failures = 0
+        self.rejections = 0
+        self.times_opened = 0
+    
+    def allow_request(self) -> bool:
+        if self.state == self.OPEN:
+            if time.time() - self.opened_at < self.reset_timeout:
+                self.rejections += 1
+                return False
+            self.state = self.HALF_OPEN
+            self.probes_in_flight = 0
+        
+        if self.state == self.HALF_OPEN:
+            if self.probes_in_flight >= self.half_open_max_calls:
+                self.rejections += 1
+                return False
+            self.probes_in_flight += 1
+        
+        return True
+    
+    def record_success(self) -> None:
+        self.successes += 1
+        self.consecutive_failures = 0
+        if self.state == self.HALF_OPEN:
+            self.state = self.CLOSED
+            self.probes_in_flight = 0
+    
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self._open()
+    
+    def release_probe(self) -> None:
+        """Give back a half-open probe slot whose call was cancelled"""
+        if self.state == self.HALF_OPEN and self.probes_in_flight > 0:
+            self.probes_in_flight -= 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'state': self.state,
+            'consecutive_failures': self.consecutive_failures,
+            'successes': self.successes,
+            'failures': self.failures,
+            'rejections': self.rejections,
+            'times_opened': self.times_opened,
+            'opened_at': self.opened_at
+        }
+    
+    def _open(self) -> None:
+        self.state = self.OPEN
+        self.opened_at = time.time()
+        self.probes_in_flight = 0
+        self.times_opened += 1
+
+
+class ToolHealthRegistry:
+    """Per-tool circuit breakers and latency windows"""
+    
+    def __init__(self):
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.latencies: Dict[str, LatencyWindow] = {}
+    
+    def breaker(self, tool_name: str, options: Optional[Dict[str, Any]] = None) -> CircuitBreaker:
+        breaker = self.breakers.get(tool_name)
+        if breaker is None:
+            options = options or {}
+            breaker = CircuitBreaker(
+                failure_threshold=options.get('failureThreshold', 5),
+                reset_timeout=options.get('resetTimeoutMs', 30000) / 1000,
+                half_open_max_calls=options.get('halfOpenMaxCalls', 1)
+            )
+            self.breakers[tool_name] = breaker
+        return breaker
+    
+    def latency(self, tool_name: str) -> LatencyWindow:
+        window = self.latencies.get(tool_name)
+        if window is None:
+            window = self.latencies[tool_name] = LatencyWindow()
+        return window
+    
+    def timeout_for(self, config: Dict[str, Any]) -> Optional[float]:
+        """
+        Effective timeout in seconds.
         
+        With 'adaptiveTimeout' the timeout follows a multiple of the tool's own
+        rolling p99, clamped to [minMs, maxMs]. The fixed 'timeout' is used until
+        enough samples exist and otherwise acts as the default ceiling.
+        """
+        fixed = config.get('timeout')
+        options = config.get('adaptiveTimeout')
+        if not options:
+            return fixed
+        if options is True:
+            options = {}
+        
+        window = self.latency(config['name'])
+        if len(window.samples) < options.get('minSamples', 20):
+            return fixed
+        
+        observed = window.percentile(options.get('percentile', 0.99))
+        timeout = observed * options.get('multiplier', 1.5)
+        floor = options.get('minMs', 50) / 1000
+        ceiling = options['maxMs'] / 1000 if 'maxMs' in options else fixed
+        timeout = max(timeout, floor)
+        return min(timeout, ceiling) if ceiling else timeout
+    
+    def get_stats(self, tool_name: Optional[str] = None) -> Dict[str, Any]:
+        names = [tool_name] if tool_name else sorted(set(self.breakers) | set(self.latencies))
+        stats = {}
+        for name in names:
+            window = self.latencies.get(name)
+            breaker = self.breakers.get(name)
+            stats[name] = {
+                'circuit': breaker.get_stats() if breaker else None,
+                'latency': {
+                    'samples': len(window.samples),
+                    'p50': window.percentile(0.5),
+                    'p95': window.percentile(0.95),
+                    'p99': window.percentile(0.99)
+                } if window else None
+            }
+        return stats
+
+
+# Process-wide tool health; pass a ToolHealthRegistry as context['toolHealth'] to override
+global_tool_health = ToolHealthRegistry()
+
+class HedgeBudget:
+    """
+    Caps duplicate (hedged) calls, much like BudgetUsageSimulator caps fan-outs.
+    
+    Hedges are allowed while they stay under max_ratio of the hedge-eligible
+    calls seen so far, and under max_hedges in total when that is set.
+    """
+    
+    def __init__(self, max_ratio: float = 0.1, max_hedges: Optional[int] = None):
+        self.max_ratio = max_ratio
+        self.max_hedges = max_hedges
+        self.usage = {'calls': 0, 'hedges': 0, 'wins': 0, 'denied': 0}
+    
+    def record_call(self) -> None:
+        self.usage['calls'] += 1
+    
+    def try_hedge(self) -> Dict[str, Any]:
+        if self.max_hedges is not None and self.usage['hedges'] >= self.max_hedges:
+            self.usage['denied'] += 1
+            return {
+                'allowed': False,
+                'reason': 'Hedge limit exceeded',
+                'limit': self.max_hedges,
+                'used': self.usage['hedges']
+            }
+        
+        if self.usage['hedges'] >= self.max_ratio * self.usage['calls']:
+            self.usage['denied'] += 1
+            return {
+                'allowed': False,
+                'reason': 'Hedge ratio exceeded',
+                'limit': self.max_ratio,
+                'used': self.usage['hedges']
+            }
+        
+        self.usage['hedges'] += 1
+        return {'allowed': True, 'hedges': self.usage['hedges']}
+    
+    def record_win(self) -> None:
+        self.usage['wins'] += 1
+    
+    def get_stats(self) -> Dict[str, int]:
+        return dict(self.usage)
+
+
+global_hedge_budget = HedgeBudget()
+
+
+async def _call_hedged(handler: Callable, params: Any, context: Optional[Dict], delay: float,
+                       budget: HedgeBudget, bulkheads: Optional[BulkheadRegistry] = None,
+                       tool_name: Optional[str] = None, limit: Optional[int] = None) -> tuple:
+    """
+    Run handler, firing one duplicate if it hasn't answered after delay seconds.
+    
+    Returns (result, hedged, hedge_won). The first successful answer wins and
+    the other call is cancelled; an error only wins if both calls fail. The
+    duplicate needs its own bulkhead slot; when none is free it isn't fired.
+    """
+    budget.record_call()
+    primary = asyncio.ensure_future(handler(params, context))
+    pending = {primary}
+    
+    try:
+        done, pending = await asyncio.wait(pending, timeout=delay)
+        if done:
+            return primary.result(), False, False
+        
+        held = bulkheads.try_acquire(tool_name, limit) if bulkheads else []
+        if held is None:
+            return await primary, False, False
+        if not budget.try_hedge()['allowed']:
+            if bulkheads:
+                bulkheads.release(held)
+            return await primary, False, False
+        
+        hedge = asyncio.ensure_future(handler(params, context))
+        if bulkheads:
+            # The slot is held until the duplicate finishes or is cancelled
+            hedge.add_done_callback(lambda _: bulkheads.release(held))
+        pending = {primary, hedge}
+        last_error = None
+        
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is hedge:
+                        budget.record_win()
+                    return task.result(), True, task is hedge
+                last_error = task.exception()
+        
+        raise last_error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+# Strong references to detached stale-while-revalidate refreshes
+_background_refreshes: set = set()
+
+
+def _is_not_found(result: Dict[str, Any], config: Dict[str, Any]) -> bool:
+    """Whether a failed handler result is a cacheable "not found" answer"""
+    code = (result.get('error') or {}).get('code') or ''
+    negative_codes = config.get('negativeErrorCodes')
+    if negative_codes is not None:
+        return code in negative_codes
+    return code.endswith('NOT_FOUND')
+
+
+def _uses_cache_entries(config: Dict[str, Any]) -> bool:
+    # Entries are wrapped with freshness info only for tools using these modes
+    return (config.get('staleTTL') or 0) > 0 or (config.get('negativeTTL') or 0) > 0
+
+
+async def _store_result(cache: Any, cache_key: str, result: Dict[str, Any],
+                        config: Dict[str, Any], logger: Any) -> None:
+    """Cache a handler result (and "not found" answers when negative caching is on)"""
+    negative_ttl = config.get('negativeTTL') or 0
+    
+    if result.get('success'):
+        if not config.get('cacheTTL'):
+            return
+        if _uses_cache_entries(config):
+            entry = {
+                '__entry__': 'value',
+                'data': result.get('data'),
+                'freshUntil': time.time() + config['cacheTTL']
+            }
+            await cache.set(cache_key, entry, config['cacheTTL'] + (config.get('staleTTL') or 0))
+        else:
+            await cache.set(cache_key, result.get('data'), config['cacheTTL'])
+    elif negative_ttl > 0 and _is_not_found(result, config):
+        entry = {'__entry__': 'negative', 'error': result.get('error')}
+        await cache.set(cache_key, entry, negative_ttl)
+    else:
+        return
+    if getattr(logger, 'debug_enabled', True):
+        logger.debug('Cached result', {'cache_key': cache_key})
+
+
+def wrapTool(config: Dict[str, Any]) -> Callable:
+    """Wrap a tool handler with caching, error handling, and retry logic"""
+    
+    negative_ttl = config.get('negativeTTL') or 0
+    use_entries = _uses_cache_entries(config)
+    
+    def hedge_delay_for(latency: LatencyWindow) -> Optional[float]:
+        """Seconds to wait before hedging, or None when hedging is off or still warming up"""
+        options = config.get('hedge')
+        if not options:
+            return None
+        if options is True:
+            options = {}
+        if len(latency.samples) < options.get('minSamples', 20):
+            return None
+        observed = latency.percentile(options.get('percentile', 0.95))
+        return max(observed, options.get('minDelayMs', 10) / 1000)
+    
+    async def execute(params: Any, context: Optional[Dict], cache: Any, cache_key: Optional[str],
+                      logger: Any, start_time: float) -> ToolResponse:
         # Execute with retry logic
         max_retries = config.get('retryConfig', {}).get('maxRetries', 3)
         backoff_ms = config.get('retryConfig', {}).get('backoffMs', 1000)
         last_error = None
+        bulkheads = (context or {}).get('bulkheads') or global_bulkheads
+        health = (context or {}).get('toolHealth') or global_tool_health
+        latency = health.latency(config['name'])
+        breaker = None
+        options = config.get('circuitBreaker')
+        if options:
+            breaker = health.breaker(config['name'], options if isinstance(options, dict) else None)
+        hedge_budget = (context or {}).get('hedgeBudget') or global_hedge_budget
+        metrics = (context or {}).get('metrics') or global_metrics
+        debug = getattr(logger, 'debug_enabled', True)
+        name = config['name']
+        queue_time = 0.0
         
         for attempt in range(max_retries):
+            if attempt:
+                metrics.inc('retries', name)
+            
+            # Fail fast while the dependency is known to be unhealthy
+            if breaker and not breaker.allow_request():
+                metrics.inc('circuit_rejections', name)
+                logger.warn('Circuit open, failing fast')
+                return {
+                    'success': False,
+                    'error': {
+                        'code': 'CIRCUIT_OPEN',
+                        'message': f"Circuit open for {config['name']}",
+                        'details': str(last_error) if last_error else None,
+                        'retryable': True
+                    },
+                    'metadata': {
+                        'cached': False,
+                        'executionTime': int((time.time() - start_time - queue_time) * 1000),
+                        'queueTime': int(queue_time * 1000),
+                        'source': 'circuit-open'
+                    }
+                }
+            
+            timeout = health.timeout_for(config)
+            hedge_delay = hedge_delay_for(latency)
+            
             try:
-                # Execute handler with timeout if configured
-                if config.get('timeout'):
-                    result = await asyncio.wait_for(
-                        config['handler'](params, context),
-                        timeout=config['timeout']
+                # Wait for a bulkhead slot; the wait is reported apart from execution time
+                queue_start = time.time()
+                held = await bulkheads.acquire(
+                    config['name'], config.get('maxConcurrency'), config.get('priority', 0)
+                )
+                queue_wait = time.time() - queue_start
+                queue_time += queue_wait
+                metrics.observe('queue_wait', name, queue_wait)
+                
+                handler_start = time.time()
+                try:
+                    # Execute handler with timeout if configured
+                    call = config['handler'](params, context) if not hedge_delay else _call_hedged(
+                        config['handler'], params, context, hedge_delay, hedge_budget,
+                        bulkheads, config['name'], config.get('maxConcurrency')
                     )
-                else:
-                    result = await config['handler'](params, context)
+                    if timeout:
+                        result = await asyncio.wait_for(call, timeout=timeout)
+                    else:
+                        result = await call
+                    if hedge_delay:
+                        result, hedged, hedge_won = result
+                finally:
+                    # Free the slot before any backoff sleep
+                    bulkheads.release(held)
                 
-                # Cache successful result
-                if cache_key and result.get('success') and config.get('cacheTTL'):
+                handler_time = time.time() - handler_start
+                latency.record(handler_time)
+                metrics.observe('handler_latency', name, handler_time)
+                if breaker:
+                    breaker.record_success()
+                
+                # Cache successful result (and "not found" answers when negative caching is on)
+                if cache_key:
                     try:
-                        await cache.set(cache_key, result.get('data'), config['cacheTTL'])
-                        logger.debug('Cached result', {'cache_key': cache_key})
+                        await _store_result(cache, cache_key, result, config, logger)
                     except Exception as e:
                         logger.warn('Cache write error', e)
                 
                 # Add metadata
                 result['metadata'] = {
                     'cached': False,
-                    'executionTime': int((time.time() - start_time) * 1000),
+                    'executionTime': int((time.time() - start_time - queue_time) * 1000),
+                    'queueTime': int(queue_time * 1000),
                     'source': 'handler'
                 }
+                if hedge_delay:
+                    result['metadata']['hedged'] = hedged
+                    result['metadata']['hedgeWon'] = hedge_won
+                    if hedged:
+                        metrics.inc('hedges', name)
                 
                 return result
                 
-            except asyncio.TimeoutError:
-                last_error = Exception(f"Tool timeout after {config.get('timeout', 0) * 1000}ms")
-                logger.warn(f"Attempt {attempt + 1} timed out")
+            except asyncio.CancelledError:
+                if breaker:
+                    breaker.release_probe()
+                raise
                 
             except Exception as e:
+                if isinstance(e, asyncio.TimeoutError) and timeout:
+                    # Timed-out attempts count at the timeout so the window can grow
+                    latency.record(timeout)
+                    metrics.inc('timeouts', name)
+                    if breaker:
+                        breaker.record_failure()
+                    last_error = Exception(f"Tool timeout after {timeout * 1000}ms")
+                    logger.warn(f"Attempt {attempt + 1} timed out")
+                    continue
+                
+                # Without a timeout, a TimeoutError can only come from the handler itself
+                metrics.inc('handler_errors', name)
+                if breaker:
+                    breaker.record_failure()
                 last_error = e
                 logger.warn(f"Attempt {attempt + 1} failed", {'error': str(e)})
                 
@@ -185,11 +1015,14 @@ def wrapTool(config: Dict[str, Any]) -> Callable:
                     'temporary' in str(e).lower()  # Added for test
                 )
                 
-                # Continue retrying unless it's the last attempt
+                # Continue retrying unless it's the last attempt (an open circuit fails fast next)
+                if breaker and breaker.state == CircuitBreaker.OPEN:
+                    continue
                 if attempt < max_retries - 1:
                     # Exponential backoff
                     delay = (backoff_ms / 1000) * (2 ** attempt)
-                    logger.debug(f"Retrying in {delay}s...")
+                    if debug:
+                        logger.debug(f"Retrying in {delay}s...")
                     await asyncio.sleep(delay)
                 else:
                     # Last attempt failed
@@ -206,16 +1039,358 @@ def wrapTool(config: Dict[str, Any]) -> Callable:
             },
             'metadata': {
                 'cached': False,
-                'executionTime': int((time.time() - start_time) * 1000),
+                'executionTime': int((time.time() - start_time - queue_time) * 1000),
+                'queueTime': int(queue_time * 1000),
                 'source': 'error'
             }
         }
     
+    async def wrapped_handler(params: Any, context: Optional[Dict] = None) -> ToolResponse:
+        start_time = time.time()
+        cache = context.get('cache') if context else LRUCache(sweep_interval=None)
+        logger = context.get('logger') if context else SimpleLogger(f"[{config['name']}]")
+        
+        cacheable = bool(config.get('cacheTTL') and config['cacheTTL'] > 0) or negative_ttl > 0
+        # Only idempotent (cacheable) tools coalesce unless a tool opts in explicitly
+        coalesce = config.get('coalesce', cacheable)
+        
+        cache_key = None
+        if cacheable or coalesce:
+            cache_key = create_cache_key(config['name'], params)
+        
+        single_flight = (context or {}).get('singleFlight') or global_single_flight
+        metrics = (context or {}).get('metrics') or global_metrics
+        debug = getattr(logger, 'debug_enabled', True)
+        name = config['name']
+        metrics.inc('calls', name)
+        run = lambda: execute(params, context, cache, cache_key if cacheable else None, logger, start_time)
+        
+        # Check cache if enabled
+        if cacheable:
+            try:
+                cached_value = await cache.get(cache_key)
+            except Exception as e:
+                logger.warn('Cache read error', e)
+                cached_value = None
+            
+            metrics.inc('cache_misses' if cached_value is None else 'cache_hits', name)
+            
+            entry_kind = None
+            if use_entries and isinstance(cached_value, dict):
+                entry_kind = cached_value.get('__entry__')
+            
+            if entry_kind == 'negative':
+                if debug:
+                    logger.debug('Negative cache hit', {'cache_key': cache_key})
+                return {
+                    'success': False,
+                    'error': cached_value['error'],
+                    'metadata': {
+                        'cached': True,
+                        'executionTime': int((time.time() - start_time) * 1000),
+                        'source': 'negative-cache'
+                    }
+                }
+            
+            if entry_kind == 'value':
+                source = 'cache'
+                if time.time() > cached_value['freshUntil']:
+                    # Serve the stale value now and refresh it off the request path
+                    source = 'stale'
+                    metrics.inc('stale_served', name)
+                    if cache_key not in single_flight.in_flight:
+                        if debug:
+                            logger.debug('Serving stale value, revalidating', {'cache_key': cache_key})
+                        refresh = asyncio.ensure_future(single_flight.do(cache_key, run))
+                        _background_refreshes.add(refresh)
+                        refresh.add_done_callback(_background_refreshes.discard)
+                return {
+                    'success': True,
+                    'data': cached_value['data'],
+                    'metadata': {
+                        'cached': True,
+                        'executionTime': int((time.time() - start_time) * 1000),
+                        'source': source
+                    }
+                }
+            
+            if cached_value is not None:
+                if debug:
+                    logger.debug('Cache hit', {'cache_key': cache_key})
+                return {
+                    'success': True,
+                    'data': cached_value,
+                    'metadata': {
+                        'cached': True,
+                        'executionTime': int((time.time() - start_time) * 1000),
+                        'source': 'cache'
+                    }
+                }
+        
+        if not coalesce:
+            return await run()
+        
+        result, shared = await single_flight.do(cache_key, run)
+        
+        if not shared:
+            return result
+        
+        metrics.inc('coalesced', name)
+        if debug:
+            logger.debug('Coalesced with in-flight call', {'cache_key': cache_key})
+        return {
+            **result,
+            'metadata': {
+                **(result.get('metadata') or {}),
+                'coalesced': True,
+                'executionTime': int((time.time() - start_time) * 1000)
+            }
+        }
+    
+    return wrapped_handler
+
+
+class BatchLoader:
+    """
+    DataLoader-style micro-batcher.
+    
+    Single-key loads arriving within window_ms (or until max_batch_size keys
+    are queued) are dispatched together as one batch_fn(keys, context) call,
+    using the context of the batch's first caller, and each caller gets the
+    value for its own key. Duplicate keys in a window share one slot.
+    """
+    
+    def __init__(self, batch_fn: Callable, max_batch_size: int = 100, window_ms: float = 3):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.window_ms = window_ms
+        self._pending: Dict[Any, asyncio.Future] = {}
+        self._pending_context: Optional[Dict] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running: set = set()
+        
+        self.batches = 0
+        self.keys_loaded = 0
+    
+    async def load(self, key: Any, context: Optional[Dict] = None) -> Any:
+        future = self._pending.get(key)
+        if future is None:
+            if not self._pending:
+                self._pending_context = context
+            future = asyncio.get_running_loop().create_future()
+            self._pending[key] = future
+            
+            if len(self._pending) >= self.max_batch_size:
+                self._dispatch()
+            elif self._timer is None:
+                self._timer = asyncio.get_running_loop().call_later(self.window_ms / 1000, self._dispatch)
+        
+        # Shielded so one cancelled caller can't fail the key for others in the batch
+        return await asyncio.shield(future)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'batches': self.batches,
+            'keys_loaded': self.keys_loaded,
+            'avg_batch_size': self.keys_loaded / self.batches if self.batches else 0.0
+        }
+    
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        
+        batch, self._pending = self._pending, {}
+        context, self._pending_context = self._pending_context, None
+        self.batches += 1
+        self.keys_loaded += len(batch)
+        
+        task = asyncio.ensure_future(self._run(batch, context))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+    
+    async def _run(self, batch: Dict[Any, asyncio.Future], context: Optional[Dict]) -> None:
+        try:
+            results = await self.batch_fn(list(batch.keys()), context)
+        except BaseException as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+            return
+        
+        for key, future in batch.items():
+            if not future.done():
+                future.set_result(results.get(key))
+
+
+# Loaders are shared per tool name, batch handler and the options that shape the
+# batch call, so separately wrapped calls still batch together but never run
+# another config's handler, priority or concurrency limit. The least recently
+# used loaders are dropped past MAX_BATCH_LOADERS.
+BATCH_LOADER_OPTIONS = ('priority', 'maxConcurrency', 'timeout', 'maxBatchSize', 'batchWindowMs')
+MAX_BATCH_LOADERS = 256
+global_batch_loaders: Dict[tuple, BatchLoader] = {}
+
+
+def wrapBatchTool(config: Dict[str, Any]) -> Callable:
+    """
+    Wrap a batched handler so it can be called one ID at a time.
+    
+    config['batchHandler'](keys, context) resolves many IDs in one round trip
+    (e.g. a single .in_() query) and returns a ToolResponse whose data maps
+    each found key to its value. config['keyParam'] names the ID parameter.
+    Every key keeps its own cache entry, keyed exactly as wrapTool would for
+    {keyParam: key}, and keys missing from the batch answer with a not-found
+    error. The batch handler only ever sees keys, so calls passing any other
+    parameter are rejected rather than answered as if it were absent. The
+    batch call itself runs through wrapTool, so retries, bulkheads
+    and any configured circuit breaker still apply.
+    """
+    
+    key_param = config['keyParam']
+    not_found_code = config.get('notFoundCode', 'NOT_FOUND')
+    batch_tool = wrapTool({
+        **{k: v for k, v in config.items() if k not in ('cacheTTL', 'staleTTL', 'negativeTTL', 'coalesce')},
+        'name': f"{config['name']}:batch",
+        'handler': lambda params, context: config['batchHandler'](params['keys'], context)
+    })
+    
+    async def load_batch(keys: List[Any], context: Optional[Dict]) -> Dict[Any, ToolResponse]:
+        # Every key sees the whole batch response and picks out its own entry
+        response = await batch_tool({'keys': keys}, context)
+        return {key: response for key in keys}
+    
+    loader_key = (config['name'], config['batchHandler'], *(config.get(option) for option in BATCH_LOADER_OPTIONS))
+    
+    def loader_for(context: Optional[Dict]) -> BatchLoader:
+        loaders = (context or {}).get('batchLoaders')
+        if loaders is None:
+            loaders = global_batch_loaders
+        # Re-inserted on every use so dict order runs from least to most recently used
+        loader = loaders.pop(loader_key, None)
+        if loader is None:
+            loader = BatchLoader(
+                load_batch,
+                max_batch_size=config.get('maxBatchSize', 100),
+                window_ms=config.get('batchWindowMs', 3)
+            )
+        loaders[loader_key] = loader
+        while len(loaders) > MAX_BATCH_LOADERS:
+            # An evicted loader still finishes any batch it has already queued
+            loaders.pop(next(iter(loaders)))
+        return loader
+    
+    async def wrapped_handler(params: Any, context: Optional[Dict] = None) -> ToolResponse:
+        start_time = time.time()
+        cache = context.get('cache') if context else LRUCache(sweep_interval=None)
+        logger = context.get('logger') if context else SimpleLogger(f"[{config['name']}]")
+        metrics = (context or {}).get('metrics') or global_metrics
+        key = params[key_param]
+        metrics.inc('calls', config['name'])
+        
+        extra_params = sorted(name for name in params if name != key_param)
+        if extra_params:
+            return {
+                'success': False,
+                'error': {
+                    'code': 'INVALID_PARAMS',
+                    'message': f"{config['name']} only accepts {key_param}; got {', '.join(extra_params)}",
+                    'details': None,
+                    'retryable': False
+                },
+                'metadata': {
+                    'cached': False,
+                    'executionTime': int((time.time() - start_time) * 1000),
+                    'source': 'error'
+                }
+            }
+        
+        cache_key = None
+        if config.get('cacheTTL') or config.get('negativeTTL'):
+            cache_key = create_cache_key(config['name'], {key_param: key})
+            try:
+                cached_value = await cache.get(cache_key)
+            except Exception as e:
+                logger.warn('Cache read error', e)
+                cached_value = None
+            
+            metrics.inc('cache_misses' if cached_value is None else 'cache_hits', config['name'])
+            
+            if cached_value is not None:
+                entry_kind = None
+                if _uses_cache_entries(config) and isinstance(cached_value, dict):
+                    entry_kind = cached_value.get('__entry__')
+                
+                if entry_kind == 'negative':
+                    return {
+                        'success': False,
+                        'error': cached_value['error'],
+                        'metadata': {
+                            'cached': True,
+                            'executionTime': int((time.time() - start_time) * 1000),
+                            'source': 'negative-cache'
+                        }
+                    }
+                
+                if entry_kind is None or time.time() <= cached_value['freshUntil']:
+                    return {
+                        'success': True,
+                        'data': cached_value['data'] if entry_kind else cached_value,
+                        'metadata': {
+                            'cached': True,
+                            'executionTime': int((time.time() - start_time) * 1000),
+                            'source': 'cache'
+                        }
+                    }
+        
+        loader = loader_for(context)
+        batch_result = await loader.load(key, context)
+        
+        if not batch_result.get('success'):
+            result = {'success': False, 'error': batch_result.get('error')}
+        elif key in (batch_result.get('data') or {}):
+            result = {'success': True, 'data': batch_result['data'][key]}
+        else:
+            result = {
+                'success': False,
+                'error': {
+                    'code': not_found_code,
+                    'message': f"{key} not found",
+                    'details': None,
+                    'retryable': False
+                }
+            }
+        
+        if cache_key:
+            try:
+                await _store_result(cache, cache_key, result, config, logger)
+            except Exception as e:
+                logger.warn('Cache write error', e)
+        
+        result['metadata'] = {
+            **(batch_result.get('metadata') or {}),
+            'cached': False,
+            'executionTime': int((time.time() - start_time) * 1000),
+            'source': 'batch' if batch_result.get('success') else 'error'
+        }
+        return result
+    
     return wrapped_handler
 
 
 async def executeParallel(tools: List[Dict[str, Any]], context: Optional[Dict] = None) -> List[ToolResponse]:
-    """Execute multiple tools in parallel"""
+    """
+    Execute multiple tools in parallel.
+    
+    Calls still start together, but each waits for its tool's bulkhead
+    ('maxConcurrency') and any global limit before running. A tool entry may
+    carry its own 'priority' to jump ahead of queued calls. Tools configured
+    with a 'batchHandler' are micro-batched through wrapBatchTool.
+    """
     tasks = []
     
     for tool in tools:
@@ -225,18 +1400,41 @@ async def executeParallel(tools: List[Dict[str, Any]], context: Optional[Dict] =
         if not config.get('parallelSafe', True):
             raise Exception(f"Tool {config['name']} is not marked as parallel-safe")
         
-        wrapped = wrapTool(config)
+        if 'priority' in tool:
+            config = {**config, 'priority': tool['priority']}
+        
+        wrapped = wrapBatchTool(config) if config.get('batchHandler') else wrapTool(config)
         tasks.append(wrapped(params, context))
     
     return await asyncio.gather(*tasks)
 
 
+def getToolStats(context: Optional[Dict] = None, tool_name: Optional[str] = None) -> Dict[str, Any]:
+    """Circuit breaker state, latency percentiles and bulkhead usage per tool"""
+    health = (context or {}).get('toolHealth') or global_tool_health
+    bulkheads = (context or {}).get('bulkheads') or global_bulkheads
+    
+    stats = health.get_stats(tool_name)
+    bulkhead_stats = bulkheads.get_stats()
+    for name, entry in stats.items():
+        entry['bulkhead'] = bulkhead_stats.get(name)
+    return stats
+
+
+def getMetrics(context: Optional[Dict] = None, format: str = 'json') -> Any:
+    """Export the tool metrics registry as a JSON snapshot (dict) or Prometheus text"""
+    metrics = (context or {}).get('metrics') or global_metrics
+    if format == 'prometheus':
+        return metrics.to_prometheus()
+    return metrics.snapshot()
+
+
 def createToolContext(overrides: Optional[Dict] = None) -> Dict:
     """Create a tool context with default implementations"""
     context = {
         'requestId': str(uuid.uuid4()),
         'mode': 'agentic',
-        'cache': MemoryCache(),
+        'cache': LRUCache(),
         'logger': SimpleLogger()
     }
     
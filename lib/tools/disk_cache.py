@@ -0,0 +1,192 @@
+"""
+Persistent cache tiers for wrapped tools (Python version)
+
+SQLiteCache keeps tool results on disk so a worker restart doesn't re-pay every
+embedding search and bundle lookup. TieredCache puts an in-process cache in
+front of it. Both expose the async get/set/delete/exists interface wrapTool
+expects from context['cache'].
+"""
+
+import asyncio
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+from lib.tools.base_wrapper import LRUCache
+
+
+# Payloads above this size are zlib-compressed before hitting disk
+COMPRESS_THRESHOLD = 1024
+
+_RAW = 0
+_ZLIB = 1
+
+
+def serialize(value: Any) -> Tuple[int, bytes]:
+    """Encode a value as (encoding, payload) using pickle, compressing large payloads"""
+    payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(payload) > COMPRESS_THRESHOLD:
+        compressed = zlib.compress(payload, 1)
+        if len(compressed) < len(payload):
+            return _ZLIB, compressed
+    return _RAW, payload
+
+
+def deserialize(encoding: int, payload: bytes) -> Any:
+    if encoding == _ZLIB:
+        payload = zlib.decompress(payload)
+    return pickle.loads(payload)
+
+
+class SQLiteCache:
+    """
+    On-disk cache backed by SQLite.
+    
+    The database runs in WAL mode so several worker processes on one host can
+    share a file. Expiry times are indexed, which keeps cleanup() cheap; it
+    runs after every cleanup_every writes so expired rows don't pile up in a
+    file that is only ever read by key. Blocking SQLite calls run on a worker
+    thread so the event loop stays free.
+    """
+    
+    def __init__(self, path: str = 'data/tool_cache.sqlite3', busy_timeout_ms: int = 5000,
+                 cleanup_every: Optional[int] = 1000):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self.path = path
+        self.cleanup_every = cleanup_every
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=busy_timeout_ms / 1000, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(f'PRAGMA busy_timeout={int(busy_timeout_ms)}')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS tool_cache (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                encoding INTEGER NOT NULL,
+                expiry REAL NOT NULL
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_tool_cache_expiry ON tool_cache (expiry)')
+        self._conn.commit()
+    
+    async def get(self, key: str) -> Optional[Any]:
+        entry = await self.get_with_expiry(key)
+        return entry[0] if entry else None
+    
+    async def get_with_expiry(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Return (value, expiry timestamp) for a live entry, or None"""
+        row = await asyncio.to_thread(self._get_row, key)
+        if row is None:
+            return None
+        value, encoding, expiry = row
+        return deserialize(encoding, value), expiry
+    
+    async def set(self, key: str, value: Any, ttl: int = 300) -> None:
+        encoding, payload = serialize(value)
+        await asyncio.to_thread(self._set_row, key, payload, encoding, time.time() + ttl)
+        
+        self._writes += 1
+        if self.cleanup_every and self._writes % self.cleanup_every == 0:
+            await asyncio.to_thread(self.cleanup)
+    
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._execute, 'DELETE FROM tool_cache WHERE key = ?', (key,))
+    
+    async def exists(self, key: str) -> bool:
+        return await asyncio.to_thread(self._get_row, key) is not None
+    
+    def cleanup(self) -> int:
+        """Remove expired entries, returning how many were dropped"""
+        return self._execute('DELETE FROM tool_cache WHERE expiry <= ?', (time.time(),))
+    
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+    
+    def _get_row(self, key: str) -> Optional[tuple]:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value, encoding, expiry FROM tool_cache WHERE key = ?', (key,)
+            ).fetchone()
+        if row is None or time.time() > row[2]:
+            return None
+        return row
+    
+    def _set_row(self, key: str, payload: bytes, encoding: int, expiry: float) -> None:
+        self._execute(
+            'INSERT OR REPLACE INTO tool_cache (key, value, encoding, expiry) VALUES (?, ?, ?, ?)',
+            (key, sqlite3.Binary(payload), encoding, expiry)
+        )
+    
+    def _execute(self, sql: str, params: tuple) -> int:
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            self._conn.commit()
+            return cursor.rowcount
+
+
+class TieredCache:
+    """
+    Two-tier cache: a fast in-process tier in front of a persistent tier.
+    
+    Reads try the memory tier first and promote persistent hits into it with
+    their remaining TTL. Writes and deletes go to both tiers.
+    """
+    
+    def __init__(self, memory: Optional[Any] = None, persistent: Optional[Any] = None):
+        self.memory = memory if memory is not None else LRUCache()
+        self.persistent = persistent if persistent is not None else SQLiteCache()
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+    
+    async def get(self, key: str) -> Optional[Any]:
+        value = await self.memory.get(key)
+        if value is not None:
+            self.memory_hits += 1
+            return value
+        
+        if hasattr(self.persistent, 'get_with_expiry'):
+            entry = await self.persistent.get_with_expiry(key)
+        else:
+            value = await self.persistent.get(key)
+            entry = (value, None) if value is not None else None
+        
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        value, expiry = entry
+        self.persistent_hits += 1
+        remaining = expiry - time.time() if expiry else 300
+        if remaining > 0:
+            await self.memory.set(key, value, remaining)
+        return value
+    
+    async def set(self, key: str, value: Any, ttl: int = 300) -> None:
+        await self.memory.set(key, value, ttl)
+        await self.persistent.set(key, value, ttl)
+    
+    async def delete(self, key: str) -> None:
+        await self.memory.delete(key)
+        await self.persistent.delete(key)
+    
+    async def exists(self, key: str) -> bool:
+        return await self.memory.exists(key) or await self.persistent.exists(key)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'memory_hits': self.memory_hits,
+            'persistent_hits': self.persistent_hits,
+            'misses': self.misses,
+            'memory': self.memory.get_stats() if hasattr(self.memory, 'get_stats') else None
+        }
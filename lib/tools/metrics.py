@@ -0,0 +1,166 @@
+"""
+Metrics registry for wrapped tools (Python version)
+
+Records per-tool latency histograms and counters (cache hits/misses, retries,
+timeouts, queue wait, ...) cheaply enough to stay on in production: the hot
+path only does a dict lookup on a (metric, tool) tuple, a bisect and an
+increment. Formatting happens only when a snapshot is exported as Prometheus
+text or JSON.
+"""
+
+import json
+import math
+import threading
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def _bucket_bounds(min_value: float, max_value: float, sub_buckets: int) -> List[float]:
+    """Log-linear (HDR-style) bucket upper bounds: each power of two split linearly"""
+    bounds = []
+    exponent = math.floor(math.log2(min_value))
+    while True:
+        base = 2.0 ** exponent
+        for i in range(1, sub_buckets + 1):
+            bound = base * (1 + i / sub_buckets)
+            if bound >= min_value:
+                bounds.append(bound)
+            if bound >= max_value:
+                return bounds
+        exponent += 1
+
+
+class LatencyHistogram:
+    """
+    HDR-style histogram of durations in seconds.
+    
+    Every power-of-two range is split into sub_buckets linear buckets, so the
+    relative error stays around 1/sub_buckets from 100µs up to minutes.
+    """
+    
+    def __init__(self, min_value: float = 1e-4, max_value: float = 120.0, sub_buckets: int = 4):
+        self.bounds = _bucket_bounds(min_value, max_value, sub_buckets)
+        self.counts = [0] * (len(self.bounds) + 1)  # last slot is overflow (+Inf)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+    
+    def record(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+    
+    def percentile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th quantile (q in [0, 1])"""
+        if not self.count:
+            return None
+        target = max(1, math.ceil(q * self.count))
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return self.bounds[i] if i < len(self.bounds) else self.max
+        return self.max
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'max': self.max,
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'p99': self.percentile(0.99)
+        }
+
+
+class MetricsRegistry:
+    """Counters and latency histograms keyed by (metric name, tool name)"""
+    
+    def __init__(self, namespace: str = 'tool'):
+        self.namespace = namespace
+        self.counters: Dict[Tuple[str, str], int] = {}
+        self.histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, name: str, tool: str, value: int = 1) -> None:
+        key = (name, tool)
+        self.counters[key] = self.counters.get(key, 0) + value
+    
+    def observe(self, name: str, tool: str, seconds: float) -> None:
+        key = (name, tool)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(key, LatencyHistogram())
+        histogram.record(seconds)
+    
+    def counter(self, name: str, tool: str) -> int:
+        return self.counters.get((name, tool), 0)
+    
+    def histogram(self, name: str, tool: str) -> Optional[LatencyHistogram]:
+        return self.histograms.get((name, tool))
+    
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Per-tool counters, histogram summaries and cache hit ratio"""
+        tools: Dict[str, Dict[str, Any]] = {}
+        for (name, tool), value in list(self.counters.items()):
+            tools.setdefault(tool, {'counters': {}, 'histograms': {}})['counters'][name] = value
+        for (name, tool), histogram in list(self.histograms.items()):
+            tools.setdefault(tool, {'counters': {}, 'histograms': {}})['histograms'][name] = histogram.snapshot()
+        
+        for entry in tools.values():
+            hits = entry['counters'].get('cache_hits', 0)
+            lookups = hits + entry['counters'].get('cache_misses', 0)
+            entry['cache_hit_ratio'] = hits / lookups if lookups else None
+        return {'tools': tools}
+    
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), sort_keys=True)
+    
+    def to_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines: List[str] = []
+        ns = self.namespace
+        
+        by_name: Dict[str, List[Tuple[str, int]]] = {}
+        for (name, tool), value in sorted(self.counters.items()):
+            by_name.setdefault(name, []).append((tool, value))
+        for name, series in by_name.items():
+            metric = f'{ns}_{name}_total'
+            lines.append(f'# TYPE {metric} counter')
+            for tool, value in series:
+                lines.append(f'{metric}{{tool="{_escape(tool)}"}} {value}')
+        
+        hist_by_name: Dict[str, List[Tuple[str, LatencyHistogram]]] = {}
+        for (name, tool), histogram in sorted(self.histograms.items()):
+            hist_by_name.setdefault(name, []).append((tool, histogram))
+        for name, series in hist_by_name.items():
+            metric = f'{ns}_{name}_seconds'
+            lines.append(f'# TYPE {metric} histogram')
+            for tool, histogram in series:
+                label = _escape(tool)
+                cumulative = 0
+                for bound, n in zip(histogram.bounds, histogram.counts):
+                    cumulative += n
+                    if n:
+                        lines.append(f'{metric}_bucket{{tool="{label}",le="{bound:.6g}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{tool="{label}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{metric}_sum{{tool="{label}"}} {histogram.sum:.6f}')
+                lines.append(f'{metric}_count{{tool="{label}"}} {histogram.count}')
+        
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Process-wide registry; pass a MetricsRegistry as context['metrics'] to override
+global_metrics = MetricsRegistry()
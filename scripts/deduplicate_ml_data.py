@@ -3,96 +3,174 @@
 """
 Deduplicate ML training data batches
 Removes duplicates based on video_id + days_since_published
+
+Batches are streamed one at a time from the columnar training store. Each
+(video_id, days_since_published) pair is packed into a single uint64 key:
+the video_id dictionary code in the high 32 bits and the float32 bits of the
+day in the low 32. Seen keys are kept as a sorted uint64 array. When that
+array outgrows the memory budget it is spilled to disk as a sorted run, and
+later batches are probed against the runs by binary search. Unique rows are
+appended to the clean store as soon as each batch is processed.
 """
 
+import argparse
 import json
-import glob
-from collections import defaultdict
-
-def deduplicate_batches():
-    print("🔍 Loading and deduplicating ML training batches...")
-    
-    # Load all batch files
-    all_records = []
-    batch_files = sorted(glob.glob('data/ml_training_batch_*.json'))
-    
-    print(f"📂 Found {len(batch_files)} batch files")
-    
-    for batch_file in batch_files:
-        print(f"📖 Loading {batch_file}...")
-        with open(batch_file, 'r') as f:
-            batch_data = json.load(f)
-            all_records.extend(batch_data)
-    
-    print(f"📊 Total records loaded: {len(all_records):,}")
-    
-    # Deduplicate using video_id + days_since_published as unique key
-    seen = set()
-    unique_records = []
-    duplicates = 0
-    
-    for record in all_records:
-        # Create unique key
-        unique_key = (record['video_id'], record['days_since_published'])
-        
-        if unique_key not in seen:
-            seen.add(unique_key)
-            unique_records.append(record)
-        else:
-            duplicates += 1
-    
-    print(f"✅ Unique records: {len(unique_records):,}")
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from ml_dataset_store import TrainingDataStore, import_json_batches
+
+CLEAN_STORE_PATH = 'data/ml_training_store_clean'
+DEFAULT_MEMORY_BUDGET_MB = 256
+
+class SeenKeys:
+    """Sorted uint64 key set that spills to sorted on-disk runs past a memory budget"""
+
+    def __init__(self, memory_budget_bytes, spill_dir):
+        self.memory_budget_bytes = memory_budget_bytes
+        self.spill_dir = spill_dir
+        self.keys = np.empty(0, dtype=np.uint64)
+        self.runs = []
+
+    def __len__(self):
+        return len(self.keys) + sum(len(run) for run in self.runs)
+
+    def contains(self, keys):
+        """Boolean mask of which keys have been seen"""
+        found = np.isin(keys, self.keys, assume_unique=True)
+        for run in self.runs:
+            pending = ~found
+            if not pending.any():
+                break
+            candidates = keys[pending]
+            positions = np.searchsorted(run, candidates)
+            in_bounds = positions < len(run)
+            hit = np.zeros(len(candidates), dtype=bool)
+            hit[in_bounds] = run[positions[in_bounds]] == candidates[in_bounds]
+            found[pending] = hit
+        return found
+
+    def add(self, keys):
+        """Add keys that are unique and not yet seen"""
+        self.keys = np.union1d(self.keys, keys)
+        if self.keys.nbytes > self.memory_budget_bytes:
+            self.spill()
+
+    def spill(self):
+        path = os.path.join(self.spill_dir, f"run_{len(self.runs):04d}.npy")
+        np.save(path, self.keys)
+        self.runs.append(np.load(path, mmap_mode='r'))
+        self.keys = np.empty(0, dtype=np.uint64)
+
+def batch_keys(store, chunk_id):
+    """Pack (video_id code, days_since_published) into one uint64 per row"""
+    codes = np.asarray(store.read_column('video_id', chunk_ids={chunk_id}), dtype=np.int64)
+    days = np.asarray(store.read_column('days_since_published', chunk_ids={chunk_id}), dtype=np.float32)
+
+    # Missing video_ids share code -1, just as (None, day) tuples compare equal
+    day_bits = days.view(np.uint32).astype(np.uint64)
+    return (codes.astype(np.uint64) << np.uint64(32)) | day_bits
+
+def deduplicate_batches(memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB):
+    print("🔍 Streaming deduplication of ML training batches...")
+
+    # New JSON batches are imported into the columnar store one file at a time
+    store = TrainingDataStore()
+    import_json_batches(store=store)
+
+    print(f"📂 Found {len(store.chunks)} batches")
+
+    shutil.rmtree(CLEAN_STORE_PATH, ignore_errors=True)
+    clean_store = TrainingDataStore(CLEAN_STORE_PATH, schema=store.columns)
+
+    spill_dir = tempfile.mkdtemp(prefix='ml_dedup_')
+    seen = SeenKeys(memory_budget_mb * 1024 * 1024, spill_dir)
+
+    total_records = 0
+    unique_records = 0
+    batch_reports = []
+
+    try:
+        for chunk in store.chunks:
+            keys = batch_keys(store, chunk['id'])
+
+            # First occurrence of each key within the batch, in original row order
+            _, first_index = np.unique(keys, return_index=True)
+            first_index.sort()
+            within_batch_duplicates = len(keys) - len(first_index)
+
+            # Then drop keys already emitted by earlier batches
+            candidate_keys = keys[first_index]
+            already_seen = seen.contains(candidate_keys)
+            keep = first_index[~already_seen]
+            seen.add(candidate_keys[~already_seen])
+
+            batch_df = store.read(chunk_ids={chunk['id']}, categorical=False)
+            clean_store.append(batch_df.iloc[keep], source=chunk.get('source') or chunk['id'])
+
+            duplicates = len(keys) - len(keep)
+            total_records += len(keys)
+            unique_records += len(keep)
+
+            report = {
+                'batch': chunk.get('source') or chunk['id'],
+                'records': len(keys),
+                'unique': len(keep),
+                'within_batch_duplicates': within_batch_duplicates,
+                'cross_batch_duplicates': int(already_seen.sum()),
+                'duplicate_rate': round(duplicates / len(keys) * 100, 1) if len(keys) else 0.0
+            }
+            batch_reports.append(report)
+
+            print(f"   ✅ {report['batch']}: {report['unique']:,}/{report['records']:,} unique "
+                  f"({report['duplicate_rate']:.1f}% duplicates, "
+                  f"{report['cross_batch_duplicates']:,} seen in earlier batches)")
+
+        spilled_runs = len(seen.runs)
+    finally:
+        shutil.rmtree(spill_dir, ignore_errors=True)
+
+    duplicates = total_records - unique_records
+    dedup_rate = duplicates / total_records * 100 if total_records else 0.0
+
+    print(f"✅ Unique records: {unique_records:,}")
     print(f"🗑️  Duplicates removed: {duplicates:,}")
-    print(f"📈 Deduplication rate: {(duplicates/len(all_records)*100):.1f}%")
-    
-    # Sort by video_id and days for consistent ordering
-    unique_records.sort(key=lambda x: (x['video_id'], x['days_since_published']))
-    
-    # Save deduplicated data
-    print(f"\n💾 Saving deduplicated data...")
-    
-    # Save as single file
-    with open('data/ml_training_dataset_clean.json', 'w') as f:
-        json.dump(unique_records, f, indent=2)
-    
-    # Also save in batches for easier loading
-    batch_size = 25000
-    total_batches = (len(unique_records) + batch_size - 1) // batch_size
-    
-    for i in range(total_batches):
-        start_idx = i * batch_size
-        end_idx = min(start_idx + batch_size, len(unique_records))
-        batch = unique_records[start_idx:end_idx]
-        
-        batch_file = f'data/ml_training_clean_batch_{i+1}.json'
-        with open(batch_file, 'w') as f:
-            json.dump(batch, f, indent=2)
-        
-        print(f"✅ Saved clean batch {i+1}/{total_batches}: {len(batch):,} records → {batch_file}")
-    
+    print(f"📈 Deduplication rate: {dedup_rate:.1f}%")
+    if spilled_runs:
+        print(f"💽 Key set exceeded {memory_budget_mb}MB and spilled {spilled_runs} sorted runs to disk")
+
     # Save metadata
     metadata = {
         "deduplication_date": "2025-08-06",
-        "original_records": len(all_records),
-        "unique_records": len(unique_records),
+        "original_records": total_records,
+        "unique_records": unique_records,
         "duplicates_removed": duplicates,
-        "deduplication_rate": round(duplicates/len(all_records)*100, 1),
-        "clean_batches": total_batches,
-        "batch_size": batch_size
+        "deduplication_rate": round(dedup_rate, 1),
+        "clean_store": CLEAN_STORE_PATH,
+        "batches": batch_reports
     }
-    
+
     with open('data/ml_dataset_clean_metadata.json', 'w') as f:
         json.dump(metadata, f, indent=2)
-    
+
     print(f"✅ Saved metadata to data/ml_dataset_clean_metadata.json")
-    
+
     print("\n" + "="*60)
     print("🎉 Deduplication complete!")
-    print(f"📊 Original: {len(all_records):,} records")
-    print(f"📈 Clean: {len(unique_records):,} records")
-    print(f"🗑️  Removed: {duplicates:,} duplicates ({duplicates/len(all_records)*100:.1f}%)")
-    print(f"📁 Clean files: ml_training_clean_batch_1.json to ml_training_clean_batch_{total_batches}.json")
+    print(f"📊 Original: {total_records:,} records")
+    print(f"📈 Clean: {unique_records:,} records")
+    print(f"🗑️  Removed: {duplicates:,} duplicates ({dedup_rate:.1f}%)")
+    print(f"📁 Clean store: {CLEAN_STORE_PATH}")
     print("="*60)
 
+    return metadata
+
 if __name__ == "__main__":
-    deduplicate_batches()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Deduplicate ML training batches")
+    parser.add_argument('--memory-budget-mb', type=int, default=DEFAULT_MEMORY_BUDGET_MB,
+                        help="Key set size before spilling sorted runs to disk")
+    args = parser.parse_args()
+    deduplicate_batches(args.memory_budget_mb)
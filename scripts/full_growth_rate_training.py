@@ -2,7 +2,7 @@
 
 """
 Full Growth Rate ML Training System
-Train on complete 671K dataset for production-ready growth rate prediction
+Train on every cached view snapshot for production-ready growth rate prediction
 """
 
 import json
@@ -18,6 +18,10 @@ import joblib
 import warnings
 warnings.filterwarnings('ignore')
 
+from growth_rate_dataset import build_full_growth_samples
+from ml_dataset_store import TrainingDataStore, import_json_batches
+from snapshot_cache import load_snapshots, sync as sync_snapshot_cache
+
 class FullGrowthRateTrainer:
     def __init__(self):
         self.growth_model = None
@@ -26,34 +30,34 @@ class FullGrowthRateTrainer:
         self.training_stats = {}
         
     def load_complete_dataset(self):
-        """Load all 14 batches - complete 671K dataset"""
+        """Load every cached view snapshot with the per-video features from the export batches"""
         print("🚀 FULL GROWTH RATE ML TRAINING SYSTEM")
         print("=" * 60)
-        print("📊 Loading complete 671K dataset...")
-        
-        all_data = []
-        successful_batches = []
-        
-        for batch_num in range(1, 15):  # Batches 1-14
-            try:
-                batch_file = f'data/ml_training_batch_{batch_num}.json'
-                with open(batch_file, 'r') as f:
-                    batch_data = json.load(f)
-                    all_data.extend(batch_data)
-                    successful_batches.append(batch_num)
-                    print(f"   ✅ Batch {batch_num}: {len(batch_data):,} records")
-            except FileNotFoundError:
-                print(f"   ❌ Batch {batch_num}: File not found")
-                continue
-            except Exception as e:
-                print(f"   ❌ Batch {batch_num}: Error - {e}")
-                continue
-        
-        print(f"\n✅ Successfully loaded {len(successful_batches)} batches")
-        print(f"📊 Total records: {len(all_data):,}")
-        
-        # Convert to DataFrame
-        df = pd.DataFrame(all_data)
+        print("📊 Loading complete snapshot dataset...")
+        
+        # Snapshots come from the local view_snapshots cache, synced since the last run
+        sync_snapshot_cache()
+        df = load_snapshots(columns=['video_id', 'channel_name', 'title', 'days_since_published', 'view_count'],
+                            categorical=False)
+        
+        # Title and subscriber features per video from the columnar store of the ml_training_batch_*.json exports
+        store = TrainingDataStore()
+        import_json_batches(store=store)
+        video_features = store.read(['video_id', 'title', 'title_length', 'subscriber_count'], categorical=False)\
+            .drop_duplicates('video_id', keep='last')
+        df = df.merge(video_features, on='video_id', how='left', suffixes=('_cached', ''), indicator=True)
+        
+        # Videos missing from the exports keep the cached title; title_length is LENGTH(title) in the export
+        unexported = df['_merge'] == 'left_only'
+        df['title'] = df['title'].fillna(df['title_cached']).fillna('')
+        df['title_length'] = df['title_length'].fillna(df['title'].str.len().where(df['title'] != ''))
+        df = df.drop(columns=['title_cached', '_merge'])
+        
+        print(f"\n✅ Successfully loaded features for {len(video_features):,} videos from {len(store.chunks)} batches")
+        print(f"📊 Total records: {len(df):,}")
+        if unexported.any():
+            print(f"⚠️ {unexported.sum():,} records ({df.loc[unexported, 'video_id'].nunique():,} videos) "
+                  f"have no export features; titles come from the snapshot cache, subscribers stay missing")
         
         # Data type conversion
         print("🔄 Processing data types...")
@@ -81,6 +85,7 @@ class FullGrowthRateTrainer:
         self.training_stats['total_records'] = len(df)
         self.training_stats['unique_videos'] = df['video_id'].nunique()
         self.training_stats['unique_channels'] = df['channel_name'].nunique()
+        self.training_stats['records_without_export_features'] = int(unexported.loc[df.index].sum())
         
         return df
     
@@ -89,68 +94,13 @@ class FullGrowthRateTrainer:
         print(f"\n🔄 Creating growth rate training dataset...")
         print("   Processing all videos with multiple snapshots...")
         
-        growth_samples = []
         video_ids = df['video_id'].unique()
         
         print(f"   Processing {len(video_ids):,} unique videos...")
         
-        processed_videos = 0
-        valid_growth_samples = 0
-        
-        for i, video_id in enumerate(video_ids):
-            if i % 25000 == 0:
-                print(f"   Progress: {i:,}/{len(video_ids):,} videos ({i/len(video_ids)*100:.1f}%)")
-            
-            video_data = df[df['video_id'] == video_id].sort_values('days_since_published')
-            
-            if len(video_data) < 2:
-                continue
-            
-            processed_videos += 1
-            
-            # Create growth samples between consecutive snapshots
-            for j in range(len(video_data) - 1):
-                current_row = video_data.iloc[j]
-                next_row = video_data.iloc[j + 1]
-                
-                # Calculate time difference
-                days_diff = next_row['days_since_published'] - current_row['days_since_published']
-                if days_diff <= 0:
-                    continue
-                
-                # Calculate growth ratio
-                if current_row['view_count'] <= 0 or next_row['view_count'] <= 0:
-                    continue
-                
-                view_ratio = next_row['view_count'] / current_row['view_count']
-                
-                # Calculate daily growth rate
-                if view_ratio <= 0:
-                    daily_growth_rate = -0.01  # Small decline
-                else:
-                    daily_growth_rate = view_ratio ** (1.0 / days_diff) - 1.0
-                
-                # Filter extreme outliers (but keep more data than before)
-                if daily_growth_rate < -0.5 or daily_growth_rate > 1.0:  # -50% to +100% daily
-                    continue
-                
-                # Create training sample
-                sample = {
-                    'video_id': video_id,
-                    'channel_name': current_row['channel_name'],
-                    'current_day': current_row['days_since_published'],
-                    'current_log_views': np.log1p(current_row['view_count']),
-                    'log_subscribers': np.log1p(current_row['subscriber_count']) if pd.notna(current_row['subscriber_count']) else 10.0,
-                    'title_length': current_row['title_length'] if pd.notna(current_row['title_length']) else 50,
-                    'days_to_next': days_diff,
-                    'view_ratio': view_ratio,
-                    'daily_growth_rate': daily_growth_rate
-                }
-                
-                growth_samples.append(sample)
-                valid_growth_samples += 1
-        
-        growth_df = pd.DataFrame(growth_samples)
+        # One sort by (video, day); consecutive pairs and outlier filters are column-wise
+        growth_df = build_full_growth_samples(df)
+        processed_videos = int((df['video_id'].value_counts() >= 2).sum())
         
         print(f"✅ Growth rate dataset created:")
         print(f"   Videos processed: {processed_videos:,}")
@@ -375,67 +325,109 @@ class FullGrowthRateTrainer:
     
     def generate_progression(self, test_video, max_days=90):
         """Generate smooth video progression using full growth rate model"""
-        video_data = test_video['data']
-        actual_days = video_data['days_since_published'].values
-        actual_views = video_data['view_count'].values
+        views, actual_mask = self.generate_progressions([test_video], max_days)
         
-        progression = []
-        current_views = actual_views[0]
+        return [
+            {
+                'day': day,
+                'views': views[0, day - 1],
+                'type': 'actual' if actual_mask[0, day - 1] else 'predicted'
+            }
+            for day in range(1, max_days + 1)
+        ]
+    
+    def generate_progressions(self, videos, max_days=90):
+        """
+        Roll out many videos at once, one predict call per day.
+        
+        Returns (views, actual_mask), both (n_videos, max_days) with column
+        d - 1 holding day d. Days with actual data keep the actual views.
+        """
+        n_videos = len(videos)
+        actual_views = np.full((n_videos, max_days), np.nan)
+        start_views = np.empty(n_videos)
+        static = np.empty((n_videos, 3))  # log_subscribers, title_length, channel_encoded
+        channel_names = []
+        
+        for i, video in enumerate(videos):
+            video_data = video['data']
+            days = video_data['days_since_published'].to_numpy(dtype=float)
+            views = video_data['view_count'].to_numpy(dtype=float)
+            start_views[i] = views[0]
+            
+            # Whole days in range; the first snapshot wins on duplicate days
+            in_range = (days >= 1) & (days <= max_days) & (days == np.floor(days))
+            columns = days[in_range].astype(int) - 1
+            _, first = np.unique(columns, return_index=True)
+            actual_views[i, columns[first]] = views[in_range][first]
+            
+            video_info = video_data.iloc[0]
+            static[i, 0] = np.log1p(video_info['subscriber_count']) if pd.notna(video_info['subscriber_count']) else 10.0
+            static[i, 1] = video_info['title_length'] if pd.notna(video_info['title_length']) else 50
+            channel_names.append(video_info['channel_name'])
         
-        # Get video metadata for predictions
-        video_info = video_data.iloc[0]
+        static[:, 2] = self.encode_channels(channel_names)
+        actual_mask = ~np.isnan(actual_views)
         
-        # Encode channel name
-        try:
-            channel_encoded = self.label_encoders['channel'].transform([video_info['channel_name']])[0]
-        except:
-            channel_encoded = 0  # Fallback for unknown channels
+        progression = np.empty((n_videos, max_days))
+        current_views = start_views
         
         for day in range(1, max_days + 1):
-            if day in actual_days:
-                # Use actual data
-                idx = np.where(actual_days == day)[0][0]
-                current_views = actual_views[idx]
-                data_type = 'actual'
-            else:
-                # Predict growth rate
-                growth_rate = self.predict_growth_rate(
-                    day, current_views, video_info, channel_encoded
+            column = day - 1
+            predict_rows = ~actual_mask[:, column]
+            
+            if predict_rows.any():
+                growth_rates = self.predict_growth_rates(
+                    day, current_views[predict_rows], static[predict_rows]
                 )
-                current_views = current_views * (1 + growth_rate)
-                data_type = 'predicted'
+                current_views[predict_rows] *= 1 + growth_rates
             
-            progression.append({
-                'day': day,
-                'views': current_views,
-                'type': data_type
-            })
+            current_views[~predict_rows] = actual_views[~predict_rows, column]
+            progression[:, column] = current_views
         
-        return progression
+        return progression, actual_mask
     
-    def predict_growth_rate(self, day, current_views, video_info, channel_encoded):
-        """Predict growth rate using full model"""
+    def encode_channels(self, channel_names):
+        """Encode channel names, using 0 for channels unseen in training"""
+        encoder = self.label_encoders.get('channel')
+        if encoder is None:
+            return np.zeros(len(channel_names))
+        
+        lookup = {name: code for code, name in enumerate(encoder.classes_)}
+        return np.array([lookup.get(str(name), 0) for name in channel_names], dtype=float)
+    
+    def predict_growth_rates(self, day, current_views, static_features):
+        """Predict growth rates for many videos on the same day"""
+        n_rows = len(current_views)
         if not self.growth_model or not self.scaler:
-            return 0.01  # Fallback
+            return np.full(n_rows, 0.01)  # Fallback
         
         try:
-            features = [
-                day,
-                np.log1p(current_views),
-                np.log1p(video_info['subscriber_count']) if pd.notna(video_info['subscriber_count']) else 10.0,
-                video_info['title_length'] if pd.notna(video_info['title_length']) else 50,
-                1,  # days_to_next = 1 for daily prediction
-                channel_encoded
-            ]
+            features = np.empty((n_rows, 6))
+            features[:, 0] = day
+            features[:, 1] = np.log1p(current_views)
+            features[:, 2:4] = static_features[:, :2]
+            features[:, 4] = 1  # days_to_next = 1 for daily prediction
+            features[:, 5] = static_features[:, 2]
             
-            features_scaled = self.scaler.transform([features])
-            growth_rate = self.growth_model.predict(features_scaled)[0]
+            features_scaled = self.scaler.transform(features)
+            growth_rates = self.growth_model.predict(features_scaled)
             
             # Clamp to reasonable range
-            return max(min(growth_rate, 0.15), -0.1)  # -10% to +15% daily
+            return np.clip(growth_rates, -0.1, 0.15)  # -10% to +15% daily
             
         except Exception as e:
-            return 0.01  # Fallback minimal growth
+            return np.full(n_rows, 0.01)  # Fallback minimal growth
+    
+    def predict_growth_rate(self, day, current_views, video_info, channel_encoded):
+        """Predict growth rate using full model"""
+        static_features = np.array([[
+            np.log1p(video_info['subscriber_count']) if pd.notna(video_info['subscriber_count']) else 10.0,
+            video_info['title_length'] if pd.notna(video_info['title_length']) else 50,
+            channel_encoded
+        ]])
+        
+        return float(self.predict_growth_rates(day, np.array([current_views], dtype=float), static_features)[0])
     
     def run_full_training(self):
         """Execute complete training pipeline"""
@@ -6,13 +6,27 @@ Focus on channel characteristics, not early video performance signals
 
 import pandas as pd
 import numpy as np
-import json
-import pickle
+import argparse
 from datetime import datetime
-import xgboost as xgb
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-import os
+
+from ml_training_harness import fit_model, parameter_grid, save_winner, search
+
+BASE_PARAMS = {
+    'n_estimators': 100,
+    'max_depth': 6,
+    'learning_rate': 0.1,
+    'subsample': 0.8,
+    'colsample_bytree': 0.8,
+    'random_state': 42
+}
+
+PARAM_GRID = {
+    'max_depth': [4, 6, 8],
+    'learning_rate': [0.05, 0.1],
+    'n_estimators': [100, 200]
+}
 
 def load_training_data():
     """Load and prepare training data for baseline prediction"""
@@ -122,8 +136,8 @@ def load_training_data():
     
     return df
 
-def train_baseline_model(df):
-    """Train XGBoost model for baseline prediction"""
+def train_baseline_model(df, search_mode='none'):
+    """Train XGBoost model for baseline prediction, optionally after a grid search"""
     
     # Prepare features
     feature_cols = [col for col in df.columns if col != 'log_baseline_multiplier']
@@ -137,17 +151,11 @@ def train_baseline_model(df):
         X, y, test_size=0.2, random_state=42
     )
     
-    # Train XGBoost model
-    model = xgb.XGBRegressor(
-        n_estimators=100,
-        max_depth=6,
-        learning_rate=0.1,
-        subsample=0.8,
-        colsample_bytree=0.8,
-        random_state=42
-    )
-    
-    model.fit(X_train, y_train)
+    # With --search grid, cross-validate the grid on the training split and fit the winner
+    search_results = None
+    if search_mode == 'grid':
+        search_results = search(X_train, y_train, parameter_grid(BASE_PARAMS, PARAM_GRID))
+    model = fit_model(X_train, y_train, search_results[0]['params'] if search_results else BASE_PARAMS)
     
     # Evaluate
     train_pred = model.predict(X_train)
@@ -194,19 +202,14 @@ def train_baseline_model(df):
         'improvement_mae': improvement_mae,
         'improvement_rmse': improvement_rmse,
         'feature_importance': [{'feature': f, 'importance': float(i)} for f, i in feature_importance]
-    }
+    }, search_results
 
-def save_baseline_model(model, feature_cols, performance):
+def save_baseline_model(model, feature_cols, performance, search_results=None):
     """Save the trained baseline model"""
     
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     model_id = f"xgboost_baseline_predictor_{timestamp}"
     
-    # Save model
-    model_path = f"models/{model_id}.pkl"
-    with open(model_path, 'wb') as f:
-        pickle.dump(model, f)
-    
     # Save metadata
     metadata = {
         'model_id': model_id,
@@ -218,9 +221,8 @@ def save_baseline_model(model, feature_cols, performance):
         'description': 'Channel baseline prediction model (not early performance prediction)'
     }
     
-    metadata_path = f"models/{model_id}_metadata.json"
-    with open(metadata_path, 'w') as f:
-        json.dump(metadata, f, indent=2)
+    # Save model (native XGBoost format) and metadata with the search summary
+    model_path, metadata_path = save_winner(model, metadata, search_results)
     
     print(f"💾 Saved model: {model_path}")
     print(f"💾 Saved metadata: {metadata_path}")
@@ -229,16 +231,21 @@ def save_baseline_model(model, feature_cols, performance):
 
 def main():
     """Train baseline prediction model"""
+    parser = argparse.ArgumentParser(description="Train the channel baseline predictor")
+    parser.add_argument('--search', choices=['grid', 'none'], default='none',
+                        help="Hyperparameter search run before the final fit")
+    args = parser.parse_args()
+    
     print("🚀 Training Channel Baseline Prediction Model...")
     
     # Load training data
     df = load_training_data()
     
     # Train model
-    model, feature_cols, performance = train_baseline_model(df)
+    model, feature_cols, performance, search_results = train_baseline_model(df, args.search)
     
     # Save model
-    model_path, metadata_path = save_baseline_model(model, feature_cols, performance)
+    model_path, metadata_path = save_baseline_model(model, feature_cols, performance, search_results)
     
     print(f"\n✅ Baseline model training complete!")
     print(f"🎯 Model focuses on channel characteristics, not early performance signals")
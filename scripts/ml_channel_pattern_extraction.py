@@ -7,37 +7,26 @@ Generate actionable creator insights based on channel size + content decisions (
 import pandas as pd
 import numpy as np
 import json
-import pickle
 from datetime import datetime
 import xgboost as xgb
 import shap
-import os
 from collections import defaultdict
 import psycopg2
 from psycopg2.extras import RealDictCursor
 
+from ml_model_registry import get_registry
+
 def load_model_and_metadata():
     """Load the trained model and metadata"""
     
     # Find the latest model
-    model_dir = "models"
-    model_files = [f for f in os.listdir(model_dir) if f.endswith('.pkl') and 'xgboost_performance_predictor' in f]
-    if not model_files:
+    handle = get_registry("models").latest('xgboost_performance_predictor')
+    if handle is None:
         raise FileNotFoundError("No trained XGBoost model found")
     
-    latest_model = sorted(model_files)[-1]
-    model_path = f"{model_dir}/{latest_model}"
-    
-    print(f"📦 Loading model: {latest_model}")
-    
-    # Load model
-    with open(model_path, 'rb') as f:
-        model = pickle.load(f)
+    print(f"📦 Loading model: {handle.entry['artifact']}")
     
-    # Load metadata
-    metadata_path = model_path.replace('.pkl', '_metadata.json')
-    with open(metadata_path, 'r') as f:
-        metadata = json.load(f)
+    model, metadata = handle.model, handle.metadata
     
     print(f"📊 Loaded model with {len(metadata['features'])} features")
     
@@ -81,86 +81,99 @@ def fetch_training_data(limit=5000):
     print(f"Fetched {len(df)} snapshot records for {df['video_id'].nunique()} videos")
     return df
 
-def interpolate_snapshots(group):
-    """Interpolate view counts for missing days"""
-    # Create full day range
-    min_day = group['days_since_published'].min()
-    max_day = group['days_since_published'].max()
-    full_days = pd.DataFrame({
-        'days_since_published': range(min_day, min(max_day + 1, 31))
-    })
-    
-    # Merge with actual data
-    merged = full_days.merge(group, on='days_since_published', how='left')
-    
-    # Interpolate missing values
-    merged['view_count'] = merged['view_count'].interpolate(method='linear')
-    
-    return merged
+TARGET_DAYS = [1, 3, 7, 14, 30]
+MAX_GRID_DAY = 30
+DAY_TOLERANCE = 2
+
+VIDEO_INFO_COLUMNS = ['video_id', 'title', 'published_at', 'topic_cluster_id',
+                      'format_type', 'channel_id', 'day_of_week', 'hour_of_day',
+                      'title_word_count', 'channel_avg_views']
+
+def interpolate_snapshots(days, views, video_index, n_videos):
+    """
+    Reindex every video's snapshots onto a shared 0-30 day grid at once and
+    fill gaps by linear interpolation along each row.
+    
+    Returns an (n_videos, 31) array. Cells before a video's first snapshot
+    stay NaN; cells after its last snapshot hold the last value.
+    """
+    grid = np.full((n_videos, MAX_GRID_DAY + 1), np.nan)
+    on_grid = days <= MAX_GRID_DAY
+    grid[video_index[on_grid], days[on_grid]] = views[on_grid]
+    
+    known = ~np.isnan(grid)
+    columns = np.arange(MAX_GRID_DAY + 1)
+    prev_day = np.maximum.accumulate(np.where(known, columns, -1), axis=1)
+    next_day = np.minimum.accumulate(np.where(known, columns, MAX_GRID_DAY + 1)[:, ::-1], axis=1)[:, ::-1]
+    
+    has_prev = prev_day >= 0
+    has_next = next_day <= MAX_GRID_DAY
+    prev_views = np.take_along_axis(grid, np.where(has_prev, prev_day, 0), axis=1)
+    next_views = np.take_along_axis(grid, np.where(has_next, next_day, 0), axis=1)
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        fraction = (columns - prev_day) / (next_day - prev_day)
+    interpolated = np.where(has_next, prev_views + (next_views - prev_views) * fraction, prev_views)
+    interpolated[known] = grid[known]
+    interpolated[~has_prev] = np.nan
+    
+    return interpolated
 
 def create_training_features(df):
     """Create ML training dataset with log-space multipliers"""
     
-    # Group by video and interpolate snapshots
-    video_data = []
-    processed_count = 0
-    valid_count = 0
+    # One stable sort by video then day; duplicate days keep their first snapshot
+    df = df.sort_values(['video_id', 'days_since_published'], kind='stable')
+    df = df.drop_duplicates(['video_id', 'days_since_published'], keep='first')
     
-    for video_id, group in df.groupby('video_id'):
-        processed_count += 1
-        
-        # Get basic video info
-        video_info = group.iloc[0][['video_id', 'title', 'published_at', 'topic_cluster_id', 
-                                   'format_type', 'channel_id', 'day_of_week', 'hour_of_day', 
-                                   'title_word_count', 'channel_avg_views']].to_dict()
-        
-        # Check if we have early and late snapshots
-        days_available = set(group['days_since_published'].values)
-        has_early = any(d <= 3 for d in days_available)
-        has_late = any(d >= 20 for d in days_available)
-        
-        if not (has_early and has_late):
-            continue
-            
-        # Interpolate snapshots
-        interpolated = interpolate_snapshots(group[['days_since_published', 'view_count']])
-        
-        # Extract key day snapshots (use closest available if exact day missing)
-        day_views = {}
-        for target_day in [1, 3, 7, 14, 30]:
-            # Find closest day within ±2 days
-            available_days = interpolated['days_since_published'].values
-            closest_day = min(available_days, key=lambda x: abs(x - target_day))
-            
-            if abs(closest_day - target_day) <= 2:  # Within 2 days tolerance
-                day_data = interpolated[interpolated['days_since_published'] == closest_day]
-                if not day_data.empty:
-                    day_views[f'day_{target_day}_views'] = day_data['view_count'].iloc[0]
+    video_codes, video_ids = pd.factorize(df['video_id'], sort=True)
+    n_videos = len(video_ids)
+    days = df['days_since_published'].to_numpy(dtype=np.int64)
+    views = df['view_count'].to_numpy(dtype=float)
+    
+    min_day = np.full(n_videos, np.iinfo(np.int64).max)
+    max_day = np.full(n_videos, np.iinfo(np.int64).min)
+    np.minimum.at(min_day, video_codes, days)
+    np.maximum.at(max_day, video_codes, days)
+    
+    # Check if we have early and late snapshots
+    eligible = (min_day <= 3) & (max_day >= 20)
+    
+    # Interpolate snapshots for every video in one pass
+    grid = interpolate_snapshots(days, views, video_codes, n_videos)
+    grid_end = np.minimum(max_day, MAX_GRID_DAY)
+    
+    # Extract key day snapshots: the nearest grid day within ±2 days
+    rows = np.arange(n_videos)
+    day_views = {}
+    for target_day in TARGET_DAYS:
+        closest_day = np.clip(target_day, min_day, np.maximum(grid_end, min_day))
+        in_range = (np.abs(closest_day - target_day) <= DAY_TOLERANCE) & (min_day <= MAX_GRID_DAY)
+        day_views[target_day] = np.where(in_range, grid[rows, np.clip(closest_day, 0, MAX_GRID_DAY)], np.nan)
+    
+    # Only include videos with day 1 and day 30 data
+    valid = eligible & ~np.isnan(day_views[1]) & ~np.isnan(day_views[30])
+    
+    first_rows = np.flatnonzero(np.r_[True, video_codes[1:] != video_codes[:-1]])
+    training_df = df.iloc[first_rows[valid]][VIDEO_INFO_COLUMNS].reset_index(drop=True)
+    
+    for target_day in TARGET_DAYS:
+        training_df[f'day_{target_day}_views'] = day_views[target_day][valid]
+    
+    # Calculate log-space multipliers
+    baseline = training_df['channel_avg_views'].to_numpy(dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for day in TARGET_DAYS:
+            day_values = training_df[f'day_{day}_views'].to_numpy()
+            usable = (baseline > 0) & (day_values > 0)
+            training_df[f'day_{day}_log_multiplier'] = np.where(usable, np.log(day_values) - np.log(baseline), np.nan)
+            training_df[f'day_{day}_performance_ratio'] = np.where(usable, day_values / baseline, np.nan)
         
-        # Only include videos with day 1 and day 30 data
-        if 'day_1_views' in day_views and 'day_30_views' in day_views:
-            video_info.update(day_views)
-            
-            # Calculate log-space multipliers
-            baseline = video_info['channel_avg_views']
-            if baseline > 0:
-                for day in [1, 3, 7, 14, 30]:
-                    views_key = f'day_{day}_views'
-                    if views_key in video_info and video_info[views_key] > 0:
-                        log_multiplier = np.log(video_info[views_key]) - np.log(baseline)
-                        video_info[f'day_{day}_log_multiplier'] = log_multiplier
-                        video_info[f'day_{day}_performance_ratio'] = video_info[views_key] / baseline
-            
-            # Calculate velocity features
-            if 'day_3_views' in day_views and 'day_7_views' in day_views:
-                if day_views['day_3_views'] > 0:
-                    video_info['view_velocity_3_7'] = (day_views['day_7_views'] - day_views['day_3_views']) / day_views['day_3_views']
-            
-            video_data.append(video_info)
-            valid_count += 1
-    
-    training_df = pd.DataFrame(video_data)
-    print(f"Processed {processed_count} videos → {valid_count} valid training examples")
+        # Calculate velocity features
+        day_3, day_7 = training_df['day_3_views'].to_numpy(), training_df['day_7_views'].to_numpy()
+        training_df['view_velocity_3_7'] = np.where(day_3 > 0, (day_7 - day_3) / day_3, np.nan)
+    
+    print(f"Processed {n_videos} videos → {len(training_df)} valid training examples")
     
     return training_df
 
@@ -232,7 +245,7 @@ def main():
     
     # Fetch raw data
     print("📊 Fetching training data from database...")
-    raw_df = fetch_training_data(limit=5000)
+    raw_df = fetch_training_data(limit=50000)
     
     # Create features
     print("⚙️ Creating training features...")
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+ML Training Data Store
+Columnar on-disk store for the view-snapshot training data exported to
+data/ml_training_batch_*.json.
+
+Each appended batch becomes a chunk directory holding one .npy file per
+column. Numeric columns are stored typed; string columns are stored as int32
+codes into a per-column dictionary shared by all chunks (-1 marks null), so
+a column loads as a pandas Categorical without re-hashing every string.
+schema.json pins column types and lists chunks, so every script reads the
+same dataset with the same dtypes. Reads can select a column subset and
+memory-map the .npy files.
+
+Layout:
+    data/ml_training_store/
+        schema.json
+        dict_<column>.json
+        chunk_0001/<column>.npy
+        ...
+
+Usage:
+    from ml_dataset_store import load_training_frame
+
+    df = load_training_frame(columns=['video_id', 'days_since_published', 'view_count'])
+
+    python scripts/ml_dataset_store.py import     # import data/ml_training_batch_*.json
+    python scripts/ml_dataset_store.py info
+"""
+
+import glob
+import json
+import os
+import re
+import shutil
+import sys
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_STORE_PATH = 'data/ml_training_store'
+DEFAULT_BATCH_PATTERN = 'data/ml_training_batch_*.json'
+SCHEMA_FILE = 'schema.json'
+SCHEMA_VERSION = 1
+
+# Columns written by ml_data_export*.js; others are typed the first time they appear
+TRAINING_SCHEMA = {
+    'video_id': 'string',
+    'title': 'string',
+    'channel_name': 'string',
+    'channel_id': 'string',
+    'published_at': 'string',
+    'format_type': 'string',
+    'topic_cluster_id': 'float32',
+    'topic_domain': 'string',
+    'subscriber_count': 'float64',
+    'channel_video_count': 'float64',
+    'title_length': 'float32',
+    'title_word_count': 'float32',
+    'day_of_week': 'float32',
+    'hour_of_day': 'float32',
+    'days_since_published': 'float32',
+    'view_count': 'float64',
+    'snapshot_date': 'string',
+}
+
+
+class TrainingDataStore:
+    """Append-only columnar store of training records"""
+
+    def __init__(self, path=DEFAULT_STORE_PATH, schema=None):
+        self.path = path
+        self.schema_path = os.path.join(path, SCHEMA_FILE)
+        self._dictionaries = {}
+
+        if os.path.exists(self.schema_path):
+            with open(self.schema_path, 'r') as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {
+                'version': SCHEMA_VERSION,
+                'columns': dict(schema if schema is not None else TRAINING_SCHEMA),
+                'chunks': [],
+                'next_chunk': 1
+            }
+
+    # Metadata
+
+    @property
+    def columns(self):
+        return dict(self.manifest['columns'])
+
+    @property
+    def chunks(self):
+        return list(self.manifest['chunks'])
+
+    def __len__(self):
+        return sum(chunk['rows'] for chunk in self.manifest['chunks'])
+
+    def sources(self):
+        """Source names of every imported batch, including ones folded in by compact()"""
+        names = set()
+        for chunk in self.manifest['chunks']:
+            if chunk.get('source'):
+                names.add(chunk['source'])
+            names.update(chunk.get('sources', []))
+        return names
+
+    # Writing
+
+    def append(self, records, source=None):
+        """Append a batch (list of dicts or DataFrame) as a new chunk; returns rows written"""
+        df = records if isinstance(records, pd.DataFrame) else pd.DataFrame(records)
+        if len(df) == 0:
+            return 0
+
+        os.makedirs(self.path, exist_ok=True)
+        columns = self.manifest['columns']
+        for name in df.columns:
+            if name not in columns:
+                columns[name] = _infer_type(df[name])
+
+        chunk_id = self._next_chunk_id()
+        tmp_dir = os.path.join(self.path, f".{chunk_id}.tmp")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        for name, kind in columns.items():
+            values = df[name] if name in df.columns else pd.Series([None] * len(df), index=df.index)
+            if kind == 'string':
+                array = self._encode(name, values)
+            else:
+                array = pd.to_numeric(values, errors='coerce').to_numpy(dtype=kind)
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), array)
+
+        # Dictionaries first, then the chunk, then the manifest that points at it
+        for name in list(self._dictionaries):
+            self._save_dictionary(name)
+        os.replace(tmp_dir, os.path.join(self.path, chunk_id))
+
+        self.manifest['chunks'].append({'id': chunk_id, 'rows': len(df), 'source': source})
+        self._save_manifest()
+        return len(df)
+
+    def compact(self):
+        """Rewrite all chunks as one, so reads can memory-map without concatenating"""
+        if len(self.manifest['chunks']) <= 1:
+            return
+
+        final_id = self._next_chunk_id()
+        tmp_dir = os.path.join(self.path, f".{final_id}.tmp")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        for name in self.manifest['columns']:
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), self.read_column(name, mmap=True))
+
+        old_chunks = self.manifest['chunks']
+        os.replace(tmp_dir, os.path.join(self.path, final_id))
+        self.manifest['chunks'] = [{
+            'id': final_id,
+            'rows': sum(chunk['rows'] for chunk in old_chunks),
+            'source': None,
+            'sources': [chunk['source'] for chunk in old_chunks if chunk.get('source')]
+        }]
+        self._save_manifest()
+        for chunk in old_chunks:
+            shutil.rmtree(os.path.join(self.path, chunk['id']), ignore_errors=True)
+
+    def remove_chunks(self, chunk_ids):
+        """Drop chunks, e.g. ones appended by a write that never finished"""
+        chunk_ids = set(chunk_ids)
+        if not chunk_ids:
+            return
+        self.manifest['chunks'] = [chunk for chunk in self.manifest['chunks'] if chunk['id'] not in chunk_ids]
+        self._save_manifest()
+        for chunk_id in chunk_ids:
+            shutil.rmtree(os.path.join(self.path, chunk_id), ignore_errors=True)
+
+    # Reading
+
+    def read_column(self, name, mmap=True, chunk_ids=None):
+        """Raw column array (codes for string columns) across chunks"""
+        kind = self.manifest['columns'][name]
+        dtype = np.int32 if kind == 'string' else np.dtype(kind)
+        parts = []
+        for chunk in self.manifest['chunks']:
+            if chunk_ids is not None and chunk['id'] not in chunk_ids:
+                continue
+            path = os.path.join(self.path, chunk['id'], f"{name}.npy")
+            if os.path.exists(path):
+                parts.append(np.load(path, mmap_mode='r' if mmap else None))
+            else:
+                # Column added after this chunk was written
+                parts.append(np.full(chunk['rows'], -1 if kind == 'string' else np.nan, dtype=dtype))
+
+        if not parts:
+            return np.empty(0, dtype=dtype)
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate(parts)
+
+    def read(self, columns=None, mmap=True, categorical=True, chunk_ids=None):
+        """DataFrame of the selected columns; strings come back as Categoricals"""
+        names = list(self.manifest['columns']) if columns is None else list(columns)
+        missing = [name for name in names if name not in self.manifest['columns']]
+        if missing:
+            raise KeyError(f"Columns not in store schema: {missing}")
+
+        data = {}
+        for name in names:
+            array = self.read_column(name, mmap=mmap, chunk_ids=chunk_ids)
+            if self.manifest['columns'][name] == 'string':
+                dictionary = self._dictionary(name)
+                values = pd.Categorical.from_codes(np.asarray(array), categories=pd.Index(dictionary['values'], dtype=object))
+                data[name] = values if categorical else np.asarray(values, dtype=object)
+            else:
+                data[name] = array
+        return pd.DataFrame(data, copy=False)
+
+    def iter_chunks(self, columns=None, categorical=True):
+        """Yield (chunk metadata, DataFrame) one chunk at a time"""
+        for chunk in self.manifest['chunks']:
+            yield chunk, self.read(columns, categorical=categorical, chunk_ids={chunk['id']})
+
+    # Internals
+
+    def _next_chunk_id(self):
+        number = self.manifest.get('next_chunk', len(self.manifest['chunks']) + 1)
+        self.manifest['next_chunk'] = number + 1
+        return f"chunk_{number:04d}"
+
+    def _dictionary(self, name):
+        if name not in self._dictionaries:
+            path = os.path.join(self.path, f"dict_{_safe_name(name)}.json")
+            values = []
+            if os.path.exists(path):
+                with open(path, 'r') as f:
+                    values = json.load(f)
+            self._dictionaries[name] = {
+                'values': values,
+                'index': {value: i for i, value in enumerate(values)},
+                'dirty': False
+            }
+        return self._dictionaries[name]
+
+    def _encode(self, name, values):
+        dictionary = self._dictionary(name)
+        index = dictionary['index']
+
+        strings = values.map(_to_string, na_action='ignore')
+        uniques = pd.unique(strings.dropna())
+        for value in uniques:
+            if value not in index:
+                index[value] = len(dictionary['values'])
+                dictionary['values'].append(value)
+                dictionary['dirty'] = True
+
+        codes = strings.map(index)
+        return codes.fillna(-1).to_numpy(dtype=np.int32)
+
+    def _save_dictionary(self, name):
+        dictionary = self._dictionaries[name]
+        if not dictionary['dirty']:
+            return
+        path = os.path.join(self.path, f"dict_{_safe_name(name)}.json")
+        _write_json(path, dictionary['values'])
+        dictionary['dirty'] = False
+
+    def _save_manifest(self):
+        _write_json(self.schema_path, self.manifest)
+
+
+def _to_string(value):
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, sort_keys=True)
+    return str(value)
+
+
+def _infer_type(series):
+    non_null = series.dropna()
+    if len(non_null) and pd.to_numeric(non_null, errors='coerce').notna().all():
+        return 'float64'
+    return 'string'
+
+
+def _safe_name(name):
+    return re.sub(r'[^A-Za-z0-9_]', '_', name)
+
+
+def _write_json(path, payload):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
+
+
+def _batch_number(path):
+    match = re.search(r'(\d+)\.json$', path)
+    return int(match.group(1)) if match else 0
+
+
+def import_json_batches(pattern=DEFAULT_BATCH_PATTERN, store=None):
+    """Append any batch files the store hasn't imported yet; returns rows added"""
+    if store is None:
+        store = TrainingDataStore()
+    imported = store.sources()
+    added = 0
+
+    for batch_file in sorted(glob.glob(pattern), key=_batch_number):
+        source = os.path.basename(batch_file)
+        if source in imported:
+            continue
+        with open(batch_file, 'r') as f:
+            batch_data = json.load(f)
+        rows = store.append(batch_data, source=source)
+        added += rows
+        print(f"   ✅ Imported {source}: {rows:,} records")
+
+    return added
+
+
+def load_training_frame(columns=None, path=DEFAULT_STORE_PATH, pattern=DEFAULT_BATCH_PATTERN, categorical=False):
+    """
+    Training snapshots as a DataFrame, importing new JSON batches first.
+    
+    Strings come back as plain object columns, a drop-in for the DataFrame
+    built from the JSON records; pass categorical=True to keep them encoded.
+    """
+    store = TrainingDataStore(path)
+    import_json_batches(pattern, store)
+    return store.read(columns, categorical=categorical)
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else 'info'
+    store = TrainingDataStore()
+
+    if command == 'import':
+        added = import_json_batches(store=store)
+        print(f"📦 Imported {added:,} records into {store.path}")
+    elif command == 'compact':
+        store.compact()
+        print(f"📦 Compacted {store.path} into one chunk")
+
+    print(f"📊 {store.path}: {len(store):,} records in {len(store.chunks)} chunks")
+    for name, kind in store.columns.items():
+        print(f"   {name:<24} {kind}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+ML Performance Envelope - Batch Inference
+Serves the p10/p50/p90 quantile models trained by ml_performance_envelope_training.py.
+
+All three boosters are loaded once through the model registry, always from
+one training run: the newest version registered for every quantile, so a
+run that has saved p50 but not yet p10/p90 is never mixed with an older
+one. A batch of videos is expanded across every target day into a single
+float32 feature matrix, each booster scores it in one call, and the result
+comes back as an (n_videos, n_days, 3) float32 array with p10 <= p50 <= p90
+on every row.
+
+Usage:
+    from ml_envelope_inference import get_envelope_predictor
+
+    envelopes = get_envelope_predictor().predict(videos, days=range(0, 91))
+    p10, p50, p90 = envelopes[0].T
+"""
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+from ml_model_registry import get_registry
+
+QUANTILES = ('p10', 'p50', 'p90')
+MODEL_KIND = 'xgboost_envelope_{}'
+
+DEFAULT_DAYS = np.arange(0, 366)
+DEFAULT_SUBSCRIBER_COUNT = 10000
+DEFAULT_TITLE_WORD_COUNT = 8
+
+# Features that depend on the video alone; days_* columns are added per target day
+STATIC_FEATURES = [
+    'subscriber_count', 'channel_tier_encoded', 'topic_cluster_id', 'title_word_count',
+    'day_of_week', 'hour_of_day', 'is_weekend', 'is_prime_time'
+]
+
+
+class EnvelopePredictor:
+    """p10/p50/p90 envelope models scored together over a videos x days grid"""
+
+    def __init__(self, models, metadata, version=None, model_ids=None):
+        self.models = models
+        self.metadata = metadata
+        self.version = version
+        self.model_ids = model_ids or {quantile: metadata[quantile].get('model_id') for quantile in QUANTILES}
+
+        # One shared column layout; each model reads its own features from it
+        columns = []
+        for quantile in QUANTILES:
+            for feature in metadata[quantile]['features']:
+                if feature not in columns:
+                    columns.append(feature)
+        self.columns = columns
+        self.column_index = {name: i for i, name in enumerate(columns)}
+        self.model_columns = {
+            quantile: [self.column_index[f] for f in metadata[quantile]['features']]
+            for quantile in QUANTILES
+        }
+
+    @classmethod
+    def load(cls, model_dir="models"):
+        registry = get_registry(model_dir)
+        version = latest_envelope_version(registry)
+        if version is None:
+            raise FileNotFoundError(f"No envelope model version with all of {', '.join(QUANTILES)} in {model_dir}")
+        models, metadata, model_ids = {}, {}, envelope_model_ids(version)
+        for quantile in QUANTILES:
+            handle = registry.get(model_ids[quantile])
+            models[quantile], metadata[quantile] = handle.model, handle.metadata
+        return cls(models, metadata, version, model_ids)
+
+    def video_features(self, videos):
+        """(n_videos, n_static) float32 matrix of per-video features"""
+        df = videos if isinstance(videos, pd.DataFrame) else pd.DataFrame(list(videos))
+        n = len(df)
+
+        def column(name, default):
+            if name not in df:
+                return np.full(n, default, dtype=np.float32)
+            return pd.to_numeric(df[name], errors='coerce').fillna(default).to_numpy(dtype=np.float32)
+
+        if 'title_word_count' in df:
+            word_count = column('title_word_count', DEFAULT_TITLE_WORD_COUNT)
+        elif 'title' in df:
+            word_count = df['title'].str.split().str.len().fillna(DEFAULT_TITLE_WORD_COUNT).to_numpy(dtype=np.float32)
+        else:
+            word_count = np.full(n, DEFAULT_TITLE_WORD_COUNT, dtype=np.float32)
+
+        if 'published_at' in df and not ('day_of_week' in df and 'hour_of_day' in df):
+            published = pd.to_datetime(df['published_at'], errors='coerce', utc=True)
+            day_of_week = published.dt.dayofweek.fillna(0).to_numpy(dtype=np.float32)
+            hour_of_day = published.dt.hour.fillna(0).to_numpy(dtype=np.float32)
+        else:
+            day_of_week = column('day_of_week', 0)
+            hour_of_day = column('hour_of_day', 0)
+
+        static = {
+            'subscriber_count': column('subscriber_count', DEFAULT_SUBSCRIBER_COUNT),
+            # Training encoded each tier in isolation, which always yields 0
+            'channel_tier_encoded': np.zeros(n, dtype=np.float32),
+            'topic_cluster_id': column('topic_cluster_id', 0),
+            'title_word_count': word_count,
+            'day_of_week': day_of_week,
+            'hour_of_day': hour_of_day,
+            'is_weekend': np.isin(day_of_week, (5, 6)).astype(np.float32),
+            'is_prime_time': ((hour_of_day >= 12) & (hour_of_day <= 18)).astype(np.float32)
+        }
+
+        formats = df['format_type'].to_numpy(dtype=object) if 'format_type' in df else np.full(n, None, dtype=object)
+        features = np.zeros((n, len(self.columns)), dtype=np.float32)
+        for name, i in self.column_index.items():
+            if name in static:
+                features[:, i] = static[name]
+            elif name.startswith('format_'):
+                features[:, i] = formats == name[len('format_'):]
+        return features
+
+    def build_features(self, videos, days=DEFAULT_DAYS):
+        """(n_videos * n_days, n_features) matrix, video-major"""
+        days = np.asarray(days, dtype=np.float32)
+        static = self.video_features(videos)
+        n_videos, n_days = len(static), len(days)
+
+        grid = np.repeat(static, n_days, axis=0)
+        day_column = np.tile(days, n_videos)
+        if 'days_since_published' in self.column_index:
+            grid[:, self.column_index['days_since_published']] = day_column
+        if 'days_normalized' in self.column_index:
+            grid[:, self.column_index['days_normalized']] = day_column / 365.0
+        return grid
+
+    def predict(self, videos, days=DEFAULT_DAYS):
+        """(n_videos, n_days, 3) float32 envelopes ordered p10, p50, p90"""
+        days = np.asarray(days)
+        grid = self.build_features(videos, days)
+        n_days = len(days)
+        n_videos = len(grid) // n_days if n_days else 0
+
+        envelopes = np.empty((len(grid), len(QUANTILES)), dtype=np.float32)
+        for q, quantile in enumerate(QUANTILES):
+            features = pd.DataFrame(grid[:, self.model_columns[quantile]],
+                                    columns=self.metadata[quantile]['features'])
+            envelopes[:, q] = self.models[quantile].predict(features)
+
+        # Independently trained quantiles can cross; sorting restores p10 <= p50 <= p90
+        envelopes.sort(axis=1)
+        np.maximum(envelopes, 0, out=envelopes)
+        return envelopes.reshape(n_videos, n_days, len(QUANTILES))
+
+    def predict_one(self, video, days=DEFAULT_DAYS):
+        """(n_days, 3) float32 envelope for a single video"""
+        return self.predict([video], days)[0]
+
+
+def latest_envelope_version(registry):
+    """Newest version registered for every quantile, or None"""
+    versions = None
+    for quantile in QUANTILES:
+        found = {entry['version'] for entry in registry.list(MODEL_KIND.format(quantile))}
+        versions = found if versions is None else versions & found
+    return max(versions) if versions else None
+
+
+def envelope_model_ids(version):
+    return {quantile: f"{MODEL_KIND.format(quantile)}_{version}" for quantile in QUANTILES}
+
+
+_predictors = {}
+
+
+def get_envelope_predictor(model_dir="models"):
+    """Process-wide predictor, reloaded when a complete newer set of quantile models is registered"""
+    version = latest_envelope_version(get_registry(model_dir))
+    predictor = _predictors.get(model_dir)
+    if predictor is None or (version is not None and predictor.model_ids != envelope_model_ids(version)):
+        predictor = _predictors[model_dir] = EnvelopePredictor.load(model_dir)
+    return predictor
+
+
+def main():
+    predictor = get_envelope_predictor()
+    print(f"📦 Loaded envelope models ({predictor.version}) with {len(predictor.columns)} features", file=sys.stderr)
+
+    video = {'subscriber_count': 100000, 'topic_cluster_id': 0, 'title_word_count': 8,
+             'format_type': 'tutorial', 'published_at': '2025-01-01T15:00:00Z'}
+    envelope = predictor.predict_one(video, days=[1, 7, 30, 90, 365])
+    for day, (p10, p50, p90) in zip([1, 7, 30, 90, 365], envelope):
+        print(f"   Day {day:>3}: p10={p10:,.0f}  p50={p50:,.0f}  p90={p90:,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,12 +13,13 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_absolute_error, r2_score
 from sklearn.preprocessing import LabelEncoder
 import xgboost as xgb
-import glob
 import pickle
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+from ml_dataset_store import load_training_frame
+
 class MLEnvelopeTrainer:
     def __init__(self):
         self.models = {}
@@ -29,20 +30,10 @@ class MLEnvelopeTrainer:
         """Load the real 671K dataset from batch files"""
         print("🔄 Loading real ML training dataset...")
         
-        # Load all batch files
-        batch_files = sorted(glob.glob('data/ml_training_batch_*.json'))
-        all_records = []
-        
-        for i, batch_file in enumerate(batch_files, 1):
-            print(f"📂 Loading batch {i}/{len(batch_files)}: {batch_file}")
-            with open(batch_file, 'r') as f:
-                batch_data = json.load(f)
-                all_records.extend(batch_data)
-        
-        print(f"📊 Loaded {len(all_records):,} total records")
+        # Load all batches from the columnar store (new JSON batches are imported first)
+        df = load_training_frame()
         
-        # Convert to DataFrame
-        df = pd.DataFrame(all_records)
+        print(f"📊 Loaded {len(df):,} total records")
         
         # Data cleaning and feature engineering
         print("🛠️ Cleaning and engineering features...")
@@ -5,7 +5,6 @@ ML Growth Rate Backfill System
 Instead of predicting absolute views, predict daily growth rates for smooth curves
 """
 
-import json
 import pandas as pd
 import numpy as np
 import pickle
@@ -18,6 +17,9 @@ from sklearn.metrics import r2_score, mean_absolute_error
 import warnings
 warnings.filterwarnings('ignore')
 
+from growth_rate_dataset import build_backfill_growth_samples
+from ml_dataset_store import load_training_frame
+
 class GrowthRateMLBackfiller:
     def __init__(self):
         self.growth_model = None
@@ -28,17 +30,8 @@ class GrowthRateMLBackfiller:
         """Load training data and calculate growth rates"""
         print("📊 Loading training data for growth rate modeling...")
         
-        # Load all batches
-        all_data = []
-        for i in range(1, 15):
-            try:
-                with open(f'data/ml_training_batch_{i}.json', 'r') as f:
-                    batch_data = json.load(f)
-                    all_data.extend(batch_data)
-            except FileNotFoundError:
-                continue
-        
-        df = pd.DataFrame(all_data)
+        # Load all batches from the columnar store (new JSON batches are imported first)
+        df = load_training_frame()
         
         # Convert types
         numeric_columns = ['subscriber_count', 'channel_video_count', 'view_count', 
@@ -58,63 +51,8 @@ class GrowthRateMLBackfiller:
         """Convert view snapshots to growth rate training data"""
         print("🔄 Preparing growth rate training dataset...")
         
-        growth_data = []
-        
-        # Process each video
-        for video_id in df['video_id'].unique():
-            video_data = df[df['video_id'] == video_id].sort_values('days_since_published')
-            
-            if len(video_data) < 2:  # Need at least 2 points for growth rate
-                continue
-            
-            # Get video metadata
-            video_info = video_data.iloc[0].to_dict()
-            
-            # Calculate growth rates between consecutive snapshots
-            for i in range(len(video_data) - 1):
-                current_row = video_data.iloc[i]
-                next_row = video_data.iloc[i + 1]
-                
-                current_day = current_row['days_since_published']
-                next_day = next_row['days_since_published']
-                current_views = current_row['view_count']
-                next_views = next_row['view_count']
-                
-                # Skip if days are the same or views decreased (data errors)
-                if next_day <= current_day or next_views <= current_views:
-                    continue
-                
-                # Calculate daily growth rate
-                days_diff = next_day - current_day
-                growth_ratio = next_views / current_views
-                daily_growth_rate = growth_ratio ** (1.0 / days_diff) - 1.0  # Daily percentage growth
-                
-                # Skip extreme outliers
-                if daily_growth_rate < -0.5 or daily_growth_rate > 2.0:  # -50% to +200% daily growth
-                    continue
-                
-                # Create training sample
-                growth_sample = {
-                    'video_id': video_id,
-                    'channel_name': video_info['channel_name'],
-                    'current_day': current_day,
-                    'current_views': current_views,
-                    'days_since_start': current_day,
-                    'log_current_views': np.log1p(current_views),
-                    'subscriber_count': video_info['subscriber_count'],
-                    'channel_video_count': video_info.get('channel_video_count', 500),
-                    'title_length': video_info['title_length'],
-                    'title_word_count': video_info['title_word_count'],
-                    'format_type': video_info.get('format_type', 'unknown'),
-                    'topic_domain': video_info.get('topic_domain', 'unknown'),
-                    'day_of_week': video_info['day_of_week'],
-                    'hour_of_day': video_info['hour_of_day'],
-                    'daily_growth_rate': daily_growth_rate
-                }
-                
-                growth_data.append(growth_sample)
-        
-        growth_df = pd.DataFrame(growth_data)
+        # One sort by (video, day); consecutive pairs and outlier filters are column-wise
+        growth_df = build_backfill_growth_samples(df)
         
         print(f"✅ Created {len(growth_df):,} growth rate samples from {growth_df['video_id'].nunique():,} videos")
         print(f"   Growth rate range: {growth_df['daily_growth_rate'].min():.1%} to {growth_df['daily_growth_rate'].max():.1%}")
@@ -19,6 +19,8 @@ from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+from ml_dataset_store import load_training_frame
+
 class HistoricalBackfillTrainer:
     def __init__(self):
         self.model = None
@@ -30,39 +32,10 @@ class HistoricalBackfillTrainer:
         """Load the 671K view snapshots dataset"""
         print("📊 Loading 671K view snapshots dataset...")
         
-        # Load all batch files
-        all_data = []
-        batch_files = [
-            'data/ml_training_batch_1.json',
-            'data/ml_training_batch_2.json', 
-            'data/ml_training_batch_3.json',
-            'data/ml_training_batch_4.json',
-            'data/ml_training_batch_5.json',
-            'data/ml_training_batch_6.json',
-            'data/ml_training_batch_7.json',
-            'data/ml_training_batch_8.json',
-            'data/ml_training_batch_9.json',
-            'data/ml_training_batch_10.json',
-            'data/ml_training_batch_11.json',
-            'data/ml_training_batch_12.json',
-            'data/ml_training_batch_13.json',
-            'data/ml_training_batch_14.json'
-        ]
-        
-        for batch_file in batch_files:
-            try:
-                print(f"   Loading {batch_file}...")
-                with open(batch_file, 'r') as f:
-                    batch_data = json.load(f)
-                all_data.extend(batch_data)
-            except FileNotFoundError:
-                print(f"   ⚠️ Batch file not found: {batch_file}")
-                continue
-        
-        print(f"✅ Loaded {len(all_data):,} view snapshot records")
+        # Load all batches from the columnar store (new JSON batches are imported first)
+        df = load_training_frame()
         
-        # Convert to DataFrame
-        df = pd.DataFrame(all_data)
+        print(f"✅ Loaded {len(df):,} view snapshot records")
         
         # Convert numeric columns
         numeric_columns = [
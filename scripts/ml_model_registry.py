@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+ML Model Registry
+Indexes the artifacts in models/ so scripts stop re-listing and sorting the
+directory to find the latest model.
+
+Artifacts are named {kind}_{YYYYmmdd_HHMMSS}.{ext}, with metadata next to them
+in {kind}_{YYYYmmdd_HHMMSS}_metadata.json. The registry keeps a manifest
+(models/manifest.json) of kind, version, artifact, feature list and metrics,
+always pairs a model with its own metadata, and caches loaded models per
+process. XGBoost native files (.ubj) are preferred over pickles.
+
+Usage:
+    from ml_model_registry import load_latest_model
+
+    model, metadata = load_latest_model('xgboost_performance_predictor')
+
+    python scripts/ml_model_registry.py          # rebuild and print the manifest
+"""
+
+import json
+import os
+import pickle
+import re
+import sys
+import threading
+
+MANIFEST_FILE = 'manifest.json'
+METADATA_SUFFIX = '_metadata.json'
+
+# Preferred first: the native XGBoost format loads faster and doesn't execute code
+ARTIFACT_FORMATS = [
+    ('.ubj', 'xgboost'),
+    ('.joblib', 'joblib'),
+    ('.pkl', 'pickle'),
+]
+
+MODEL_ID_PATTERN = re.compile(r'^(?P<kind>[a-z0-9_]+?)_(?P<version>\d{8}_\d{6})$')
+
+
+class ModelHandle:
+    """A registered model; the artifact is only read on first access to .model"""
+
+    def __init__(self, registry, entry):
+        self.registry = registry
+        self.entry = entry
+
+    @property
+    def model_id(self):
+        return self.entry['model_id']
+
+    @property
+    def metadata(self):
+        return self.registry.load_metadata(self.model_id)
+
+    @property
+    def model(self):
+        return self.registry.load_artifact(self.model_id)
+
+
+class ModelRegistry:
+    """Manifest-backed index of models/ with a per-process model cache"""
+
+    def __init__(self, model_dir="models"):
+        self.model_dir = model_dir
+        self.manifest_path = os.path.join(model_dir, MANIFEST_FILE)
+        self.entries = {}
+        self._dir_mtime = None
+        self._models = {}
+        self._metadata = {}
+        self._lock = threading.RLock()
+
+    # Index
+
+    def refresh(self, force=False):
+        """Re-index models/ if it changed since the last scan"""
+        if not os.path.exists(self.model_dir):
+            raise FileNotFoundError("Models directory not found")
+
+        dir_mtime = os.stat(self.model_dir).st_mtime
+        with self._lock:
+            if not force and dir_mtime == self._dir_mtime:
+                return self.entries
+
+            previous = self.entries or self._read_manifest()
+            files = {entry.name: entry.stat().st_mtime for entry in os.scandir(self.model_dir) if entry.is_file()}
+
+            entries = {}
+            for model_id, artifact, fmt in self._find_artifacts(files):
+                match = MODEL_ID_PATTERN.match(model_id)
+                metadata_file = model_id + METADATA_SUFFIX
+                metadata_mtime = files.get(metadata_file)
+
+                cached = previous.get(model_id)
+                if (cached and cached.get('artifact') == artifact
+                        and cached.get('metadata_mtime') == metadata_mtime):
+                    entries[model_id] = cached
+                    continue
+
+                metadata = self._read_json(metadata_file) if metadata_mtime else {}
+                entries[model_id] = {
+                    'model_id': model_id,
+                    'kind': match.group('kind'),
+                    'version': match.group('version'),
+                    'artifact': artifact,
+                    'format': fmt,
+                    'metadata_file': metadata_file if metadata_mtime else None,
+                    'metadata_mtime': metadata_mtime,
+                    'model_type': metadata.get('model_type'),
+                    'target': metadata.get('target'),
+                    'features': metadata.get('features', []),
+                    'metrics': metadata.get('performance', {})
+                }
+
+            self.entries = entries
+            self._dir_mtime = dir_mtime
+            if entries != previous:
+                self._write_manifest()
+            return entries
+
+    def list(self, kind=None):
+        """Registered models, oldest first"""
+        self.refresh()
+        entries = [e for e in self.entries.values() if kind is None or e['kind'] == kind]
+        return sorted(entries, key=lambda e: (e['kind'], e['version']))
+
+    def latest(self, kind):
+        """Handle for the newest model of a kind, or None"""
+        entries = self.list(kind)
+        return ModelHandle(self, entries[-1]) if entries else None
+
+    def get(self, model_id):
+        self.refresh()
+        if model_id not in self.entries:
+            raise KeyError(f"Model {model_id} not found in {self.model_dir}")
+        return ModelHandle(self, self.entries[model_id])
+
+    # Loading
+
+    def load_metadata(self, model_id):
+        with self._lock:
+            if model_id not in self._metadata:
+                entry = self.get(model_id).entry
+                metadata_file = entry['metadata_file']
+                self._metadata[model_id] = self._read_json(metadata_file) if metadata_file else {}
+            return self._metadata[model_id]
+
+    def load_artifact(self, model_id):
+        with self._lock:
+            if model_id not in self._models:
+                entry = self.get(model_id).entry
+                self._models[model_id] = self._load(entry)
+            return self._models[model_id]
+
+    def load_latest(self, kind):
+        """(model, metadata) for the newest model of a kind"""
+        handle = self.latest(kind)
+        if handle is None:
+            raise FileNotFoundError(f"No trained {kind} model found")
+        return handle.model, handle.metadata
+
+    def evict(self, model_id=None):
+        """Drop cached models (all of them when model_id is None)"""
+        with self._lock:
+            if model_id is None:
+                self._models.clear()
+                self._metadata.clear()
+            else:
+                self._models.pop(model_id, None)
+                self._metadata.pop(model_id, None)
+
+    # Saving
+
+    def save_model(self, model, metadata):
+        """Write a model in the best available format plus its metadata"""
+        model_id = metadata['model_id']
+        os.makedirs(self.model_dir, exist_ok=True)
+
+        if hasattr(model, 'save_model') and hasattr(model, 'get_booster'):
+            model_path = os.path.join(self.model_dir, f"{model_id}.ubj")
+            model.save_model(model_path)
+        else:
+            model_path = os.path.join(self.model_dir, f"{model_id}.pkl")
+            with open(model_path, 'wb') as f:
+                pickle.dump(model, f)
+
+        metadata_path = os.path.join(self.model_dir, model_id + METADATA_SUFFIX)
+        with open(metadata_path, 'w') as f:
+            json.dump(metadata, f, indent=2)
+
+        self.refresh(force=True)
+        return model_path, metadata_path
+
+    # Internals
+
+    def _find_artifacts(self, files):
+        best = {}
+        for name in files:
+            if name.endswith(METADATA_SUFFIX) or name == MANIFEST_FILE:
+                continue
+            for rank, (ext, fmt) in enumerate(ARTIFACT_FORMATS):
+                if not name.endswith(ext):
+                    continue
+                model_id = name[:-len(ext)]
+                if MODEL_ID_PATTERN.match(model_id) and (model_id not in best or rank < best[model_id][0]):
+                    best[model_id] = (rank, name, fmt)
+                break
+        return [(model_id, name, fmt) for model_id, (_, name, fmt) in best.items()]
+
+    def _load(self, entry):
+        path = os.path.join(self.model_dir, entry['artifact'])
+        fmt = entry['format']
+
+        if fmt == 'xgboost':
+            import xgboost as xgb
+            model = xgb.XGBRegressor()
+            model.load_model(path)
+            return model
+        if fmt == 'joblib':
+            import joblib
+            # Memory-map large numpy arrays instead of copying them in
+            return joblib.load(path, mmap_mode='r')
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+    def _read_json(self, name):
+        with open(os.path.join(self.model_dir, name), 'r') as f:
+            return json.load(f)
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path, 'r') as f:
+                return {e['model_id']: e for e in json.load(f).get('models', [])}
+        except (OSError, ValueError, KeyError):
+            return {}
+
+    def _write_manifest(self):
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'models': sorted(self.entries.values(), key=lambda e: e['model_id'])}, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+        # Writing the manifest touched the directory
+        self._dir_mtime = os.stat(self.model_dir).st_mtime
+
+
+_registries = {}
+
+
+def get_registry(model_dir="models"):
+    """Process-wide registry per models directory"""
+    key = os.path.abspath(model_dir)
+    if key not in _registries:
+        _registries[key] = ModelRegistry(model_dir)
+    return _registries[key]
+
+
+def load_latest_model(kind, model_dir="models"):
+    """(model, metadata) for the newest model of a kind, cached across calls"""
+    return get_registry(model_dir).load_latest(kind)
+
+
+def main():
+    model_dir = sys.argv[1] if len(sys.argv) > 1 else "models"
+    registry = get_registry(model_dir)
+    registry.refresh(force=True)
+
+    print(f"📚 {len(registry.entries)} models in {model_dir}")
+    for entry in registry.list():
+        print(f"   {entry['kind']:<40} {entry['version']}  {entry['format']:<8} {len(entry['features'])} features")
+
+
+if __name__ == "__main__":
+    main()
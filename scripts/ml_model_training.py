@@ -6,15 +6,44 @@ Train XGBoost model to predict Day 30 performance using early signals
 
 import pandas as pd
 import numpy as np
-import json
-import pickle
+import argparse
 from datetime import datetime
-import xgboost as xgb
 from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 import shap
 import os
 
+from ml_training_harness import fit_model, parameter_grid, sample_parameters, save_winner, search
+
+# XGBoost parameters optimized for small dataset
+BASE_PARAMS = {
+    'objective': 'reg:squarederror',
+    'max_depth': 3,  # Shallow trees to avoid overfitting
+    'learning_rate': 0.1,
+    'n_estimators': 100,
+    'subsample': 0.8,
+    'colsample_bytree': 0.8,
+    'random_state': 42,
+    'early_stopping_rounds': 20
+}
+
+# Cross-validated by search_parameters before the final fit with --search grid
+PARAM_GRID = {
+    'max_depth': [2, 3, 4, 6],
+    'learning_rate': [0.05, 0.1],
+    'subsample': [0.8, 1.0],
+    'min_child_weight': [1, 5]
+}
+
+PARAM_SPACE = {
+    'max_depth': (2, 8),
+    'learning_rate': (0.01, 0.3, 'log'),
+    'subsample': (0.5, 1.0),
+    'colsample_bytree': (0.5, 1.0),
+    'min_child_weight': (1, 10),
+    'reg_lambda': (0.1, 10.0, 'log')
+}
+
 def load_training_data(file_path="data/ml_training_dataset_fixed.csv"):
     """Load the prepared training dataset"""
     if not os.path.exists(file_path):
@@ -60,36 +89,32 @@ def prepare_features_and_target(df):
     
     return X, y, feature_cols_encoded
 
-def train_xgboost_model(X, y):
-    """Train XGBoost model with cross-validation"""
-    
+def split_train_test(X, y):
+    """Hold out 20% for evaluation; searches only ever see the training rows"""
     # Split data temporally (older videos for training, newer for validation)
     # Since we have limited data, use 80/20 split
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42
-    )
+    return train_test_split(X, y, test_size=0.2, random_state=42)
+
+def search_parameters(X, y, mode='grid', n_iter=20, n_folds=5, n_workers=None):
+    """Cross-validate candidate parameters on the training split across a process pool"""
     
-    print(f"📊 Training on {len(X_train)} examples, testing on {len(X_test)}")
+    if mode == 'grid':
+        candidates = parameter_grid(BASE_PARAMS, PARAM_GRID)
+    else:
+        candidates = sample_parameters(BASE_PARAMS, PARAM_SPACE, n_iter=n_iter)
     
-    # XGBoost parameters optimized for small dataset
-    params = {
-        'objective': 'reg:squarederror',
-        'max_depth': 3,  # Shallow trees to avoid overfitting
-        'learning_rate': 0.1,
-        'n_estimators': 100,
-        'subsample': 0.8,
-        'colsample_bytree': 0.8,
-        'random_state': 42,
-        'early_stopping_rounds': 20
-    }
+    X_train, _, y_train, _ = split_train_test(X, y)
+    return search(X_train, y_train, candidates, n_folds=n_folds, n_workers=n_workers)
+
+def train_xgboost_model(X, y, params=None):
+    """Train XGBoost model, with searched parameters when given"""
+    
+    X_train, X_test, y_train, y_test = split_train_test(X, y)
+    
+    print(f"📊 Training on {len(X_train)} examples, testing on {len(X_test)}")
     
     # Train model
-    model = xgb.XGBRegressor(**params)
-    model.fit(
-        X_train, y_train,
-        eval_set=[(X_test, y_test)],
-        verbose=False
-    )
+    model = fit_model(X_train, y_train, params or BASE_PARAMS, eval_set=[(X_test, y_test)])
     
     # Predictions
     y_pred_train = model.predict(X_train)
@@ -154,19 +179,12 @@ def generate_shap_analysis(model, X, feature_names, max_examples=20):
     
     return shap_values, importance_df
 
-def save_model_and_artifacts(model, results, feature_names, shap_importance, model_dir="models"):
+def save_model_and_artifacts(model, results, feature_names, shap_importance, model_dir="models", search_results=None):
     """Save trained model and analysis artifacts"""
     
-    os.makedirs(model_dir, exist_ok=True)
-    
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     model_id = f"xgboost_performance_predictor_{timestamp}"
     
-    # Save model
-    model_path = f"{model_dir}/{model_id}.pkl"
-    with open(model_path, 'wb') as f:
-        pickle.dump(model, f)
-    
     # Save metadata
     metadata = {
         'model_id': model_id,
@@ -178,9 +196,8 @@ def save_model_and_artifacts(model, results, feature_names, shap_importance, mod
         'feature_importance': shap_importance.to_dict('records')
     }
     
-    metadata_path = f"{model_dir}/{model_id}_metadata.json"
-    with open(metadata_path, 'w') as f:
-        json.dump(metadata, f, indent=2)
+    # Native XGBoost format when possible, registered alongside its metadata and search summary
+    model_path, metadata_path = save_winner(model, metadata, search_results, model_dir=model_dir)
     
     print(f"💾 Saved model: {model_path}")
     print(f"📋 Saved metadata: {metadata_path}")
@@ -209,6 +226,14 @@ def test_predictions(model, X_test, y_test, feature_names):
 
 def main():
     """Main training pipeline"""
+    parser = argparse.ArgumentParser(description="Train the Day 30 performance predictor")
+    parser.add_argument('--search', choices=['grid', 'random', 'none'], default='none',
+                        help="Hyperparameter search run before the final fit")
+    parser.add_argument('--n-iter', type=int, default=20, help="Candidates for random search")
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=None, help="Search processes (default: all cores)")
+    args = parser.parse_args()
+    
     print("🚀 Starting ML model training...")
     
     # Load data
@@ -223,9 +248,16 @@ def main():
         print("⚠️ Not enough training examples for reliable model")
         return
     
+    # Search hyperparameters (folds are checkpointed, so a rerun resumes)
+    search_results = None
+    if args.search != 'none':
+        print(f"🔎 Running {args.search} search with {args.folds}-fold CV...")
+        search_results = search_parameters(X, y, args.search, args.n_iter, args.folds, args.workers)
+    
     # Train model
     print("🎓 Training XGBoost model...")
-    model, results, splits = train_xgboost_model(X, y)
+    params = search_results[0]['params'] if search_results else None
+    model, results, splits = train_xgboost_model(X, y, params)
     X_train, X_test, y_train, y_test = splits
     
     # SHAP analysis
@@ -234,7 +266,7 @@ def main():
     # Save model
     print("💾 Saving model and artifacts...")
     model_id, model_path, metadata_path = save_model_and_artifacts(
-        model, results, feature_names, importance_df
+        model, results, feature_names, importance_df, search_results=search_results
     )
     
     # Test predictions
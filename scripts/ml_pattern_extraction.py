@@ -7,35 +7,24 @@ Generate actionable insights from trained XGBoost model using SHAP analysis
 import pandas as pd
 import numpy as np
 import json
-import pickle
 from datetime import datetime
 import xgboost as xgb
 import shap
-import os
 from collections import defaultdict
 
+from ml_model_registry import get_registry
+
 def load_model_and_data():
     """Load the trained model and training dataset"""
     
     # Find the latest model
-    model_dir = "models"
-    model_files = [f for f in os.listdir(model_dir) if f.endswith('.pkl') and 'xgboost_performance_predictor' in f]
-    if not model_files:
+    handle = get_registry("models").latest('xgboost_performance_predictor')
+    if handle is None:
         raise FileNotFoundError("No trained XGBoost model found")
     
-    latest_model = sorted(model_files)[-1]
-    model_path = f"{model_dir}/{latest_model}"
-    
-    print(f"📦 Loading model: {latest_model}")
-    
-    # Load model
-    with open(model_path, 'rb') as f:
-        model = pickle.load(f)
+    print(f"📦 Loading model: {handle.entry['artifact']}")
     
-    # Load metadata
-    metadata_path = model_path.replace('.pkl', '_metadata.json')
-    with open(metadata_path, 'r') as f:
-        metadata = json.load(f)
+    model, metadata = handle.model, handle.metadata
     
     # Load training data
     df = pd.read_csv("data/ml_training_dataset_fixed.csv")
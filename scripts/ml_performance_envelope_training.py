@@ -5,21 +5,37 @@ Train ML model on 698K+ view snapshots to predict performance envelopes
 """
 
 import os
+import argparse
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime
 import json
-import pickle
 
-import xgboost as xgb
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 from sklearn.preprocessing import LabelEncoder
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
+from ml_training_harness import fit_model, parameter_grid, save_winner, search
+
+BASE_PARAMS = {
+    'n_estimators': 200,
+    'max_depth': 10,
+    'learning_rate': 0.1,
+    'subsample': 0.8,
+    'colsample_bytree': 0.8,
+    'random_state': 42
+}
+
+PARAM_GRID = {
+    'max_depth': [6, 10],
+    'learning_rate': [0.05, 0.1],
+    'min_child_weight': [1, 5]
+}
+
 # Load environment
 load_dotenv()
 
@@ -249,8 +265,8 @@ def create_performance_envelope_targets(df):
     
     return envelope_df
 
-def train_envelope_model(df, envelope_targets):
-    """Train XGBoost model to predict performance envelopes"""
+def train_envelope_model(df, envelope_targets, search_mode='none'):
+    """Train XGBoost model to predict performance envelopes, optionally after a grid search"""
     
     print("🤖 Training performance envelope ML model...")
     
@@ -320,18 +336,12 @@ def train_envelope_model(df, envelope_targets):
             features_df, target, test_size=0.2, random_state=42
         )
         
-        # Train XGBoost model
-        model = xgb.XGBRegressor(
-            n_estimators=200,
-            max_depth=10,
-            learning_rate=0.1,
-            subsample=0.8,
-            colsample_bytree=0.8,
-            random_state=42,
-            n_jobs=-1
-        )
-        
-        model.fit(X_train, y_train)
+        # With --search grid, cross-validate the grid for this quantile and fit the winner
+        search_results = None
+        if search_mode == 'grid':
+            search_results = search(X_train, y_train, parameter_grid(BASE_PARAMS, PARAM_GRID))
+        model = fit_model(X_train, y_train, search_results[0]['params'] if search_results else BASE_PARAMS,
+                          n_jobs=-1)
         
         # Evaluate
         train_pred = model.predict(X_train)
@@ -351,7 +361,8 @@ def train_envelope_model(df, envelope_targets):
             'train_mae': train_mae,
             'test_mae': test_mae,
             'train_r2': train_r2,
-            'test_r2': test_r2
+            'test_r2': test_r2,
+            'search_results': search_results
         }
     
     return models
@@ -364,14 +375,11 @@ def save_models(models):
     os.makedirs(model_dir, exist_ok=True)
     
     for model_name, model_data in models.items():
-        # Save model
-        model_path = f"{model_dir}/xgboost_envelope_{model_name}_{timestamp}.pkl"
-        with open(model_path, 'wb') as f:
-            pickle.dump(model_data['model'], f)
+        # Named by quantile (xgboost_envelope_p10_...) so ml_envelope_inference finds them
+        model_id = f"xgboost_envelope_{model_name.replace('_model', '')}_{timestamp}"
         
-        # Save metadata
         metadata = {
-            'model_id': f"xgboost_envelope_{model_name}_{timestamp}",
+            'model_id': model_id,
             'created_at': timestamp,
             'model_type': 'xgboost_performance_envelope',
             'target': model_name,
@@ -386,15 +394,20 @@ def save_models(models):
             'description': f"Performance envelope {model_name} trained on 698K+ view snapshots"
         }
         
-        metadata_path = f"{model_dir}/xgboost_envelope_{model_name}_{timestamp}_metadata.json"
-        with open(metadata_path, 'w') as f:
-            json.dump(metadata, f, indent=2)
+        # Save model (native XGBoost format) and metadata with its search summary
+        model_path, metadata_path = save_winner(model_data['model'], metadata, model_data['search_results'],
+                                                model_dir=model_dir)
         
         print(f"💾 Saved {model_name}: {model_path}")
 
 def main():
     """Main training pipeline"""
     
+    parser = argparse.ArgumentParser(description="Train the performance envelope models")
+    parser.add_argument('--search', choices=['grid', 'none'], default='none',
+                        help="Hyperparameter search run before each final fit")
+    args = parser.parse_args()
+    
     print("🚀 Performance Envelope ML Training Pipeline")
     print("=" * 50)
     
@@ -410,7 +423,7 @@ def main():
     envelope_targets = create_performance_envelope_targets(df_enhanced)
     
     # Step 4: Train models
-    models = train_envelope_model(df_enhanced, envelope_targets)
+    models = train_envelope_model(df_enhanced, envelope_targets, args.search)
     
     # Step 5: Save models
     save_models(models)
@@ -2,181 +2,205 @@
 """
 ML Performance Prediction - Standalone Prediction Script
 Called by the Next.js API to make actual XGBoost predictions
+
+Reads one JSON request from stdin, or a JSON array of requests to score
+them as a batch with a single model.predict call.
 """
 
 import json
 import sys
-import pickle
 import pandas as pd
 import numpy as np
-import os
 from datetime import datetime
 
+from ml_model_registry import get_registry
+
 def load_latest_model():
-    """Load the latest trained XGBoost model"""
-    
-    model_dir = "models"
-    if not os.path.exists(model_dir):
-        raise FileNotFoundError("Models directory not found")
-    
-    # Find latest model files
-    model_files = [f for f in os.listdir(model_dir) if f.endswith('.pkl') and 'xgboost_performance_predictor' in f]
-    metadata_files = [f for f in os.listdir(model_dir) if f.endswith('_metadata.json')]
-    
-    if not model_files or not metadata_files:
-        raise FileNotFoundError("No trained model found")
+    """Load the latest trained XGBoost model together with its own metadata"""
     
-    latest_model_file = sorted(model_files)[-1]
-    latest_metadata_file = sorted(metadata_files)[-1]
+    return get_registry("models").load_latest('xgboost_performance_predictor')
+
+ALL_FORMATS = [
+    'case_study', 'compilation', 'explainer', 'listicle', 'live_stream',
+    'news_analysis', 'personal_story', 'product_focus', 'shorts',
+    'tutorial', 'update', 'vlog'
+]
+
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+def publish_day_and_hour(publish_times):
+    """
+    Day of week and hour of each publish time, read in its own offset.
+    
+    Each value is parsed on its own exactly as a single request would be, so
+    one batch can mix formats and offsets; missing or unparseable times fall
+    back to now. Repeated values are parsed once.
+    """
+    
+    now = pd.Timestamp.now()
+    parsed = {}
+    days = np.empty(len(publish_times), dtype=np.int64)
+    hours = np.empty(len(publish_times), dtype=np.int64)
+    
+    for i, value in enumerate(publish_times):
+        key = value if isinstance(value, str) else repr(value)
+        if key not in parsed:
+            try:
+                publish_dt = pd.to_datetime(value) if value else now
+            except (ValueError, TypeError, OverflowError):
+                publish_dt = now
+            if not isinstance(publish_dt, pd.Timestamp) or pd.isna(publish_dt):
+                publish_dt = now
+            parsed[key] = (publish_dt.dayofweek, publish_dt.hour)
+        days[i], hours[i] = parsed[key]
+    
+    return days, hours
+
+def prepare_features_batch(requests, metadata):
+    """Prepare features for many requests in one column-wise pass"""
     
-    # Load model
-    model_path = os.path.join(model_dir, latest_model_file)
-    with open(model_path, 'rb') as f:
-        model = pickle.load(f)
+    requests = list(requests)
+    feature_names = metadata['features']
+    if not requests:
+        return pd.DataFrame(columns=feature_names, dtype=float)
     
-    # Load metadata
-    metadata_path = os.path.join(model_dir, latest_metadata_file)
-    with open(metadata_path, 'r') as f:
-        metadata = json.load(f)
+    def column(key, default):
+        return [default if r.get(key) is None else r.get(key) for r in requests]
     
-    return model, metadata
-
-def prepare_features(request_data, metadata):
-    """Prepare features for the XGBoost model"""
+    publish_days, publish_hours = publish_day_and_hour(column('planned_publish_time', None))
     
-    # Extract basic information
-    title = request_data.get('title', '')
-    topic_cluster_id = request_data.get('topic_cluster_id', 0)
-    format_type = request_data.get('format_type', 'tutorial')
-    planned_publish_time = request_data.get('planned_publish_time')
-    
-    # Parse publish time
-    if planned_publish_time:
-        try:
-            publish_dt = pd.to_datetime(planned_publish_time)
-        except:
-            publish_dt = pd.Timestamp.now()
-    else:
-        publish_dt = pd.Timestamp.now()
+    titles = pd.Series(column('title', ''), dtype=object).astype(str)
+    formats = pd.Series(column('format_type', 'tutorial'), dtype=object)
     
     # Calculate basic features
     features = {
-        'topic_cluster_id': int(topic_cluster_id),
-        'day_of_week': publish_dt.dayofweek,
-        'hour_of_day': publish_dt.hour,
-        'title_word_count': len(str(title).split()),
-        'day_1_log_multiplier': request_data.get('day_1_log_multiplier', 0.0),
-        'day_7_log_multiplier': request_data.get('day_7_log_multiplier', 0.0),
-        'view_velocity_3_7': request_data.get('view_velocity_3_7', 0.0)
+        'topic_cluster_id': np.asarray(column('topic_cluster_id', 0), dtype=np.int64),
+        'day_of_week': publish_days,
+        'hour_of_day': publish_hours,
+        'title_word_count': titles.str.split().str.len().to_numpy(),
+        'day_1_log_multiplier': np.asarray(column('day_1_log_multiplier', 0.0), dtype=np.float64),
+        'day_7_log_multiplier': np.asarray(column('day_7_log_multiplier', 0.0), dtype=np.float64),
+        'view_velocity_3_7': np.asarray(column('view_velocity_3_7', 0.0), dtype=np.float64)
     }
     
     # One-hot encode format type
-    all_formats = [
-        'case_study', 'compilation', 'explainer', 'listicle', 'live_stream',
-        'news_analysis', 'personal_story', 'product_focus', 'shorts', 
-        'tutorial', 'update', 'vlog'
-    ]
-    
-    for fmt in all_formats:
-        features[f'format_{fmt}'] = 1 if format_type == fmt else 0
-    
-    # Create DataFrame with correct column order
-    feature_names = metadata['features']
-    feature_data = {}
-    
-    for feature_name in feature_names:
-        if feature_name in features:
-            feature_data[feature_name] = features[feature_name]
-        else:
-            # Default values for missing features
-            feature_data[feature_name] = 0
+    for fmt in ALL_FORMATS:
+        features[f'format_{fmt}'] = (formats == fmt).to_numpy().astype(np.int64)
     
-    df = pd.DataFrame([feature_data])
+    # Build columns in the model's order; default values for missing features
+    zeros = np.zeros(len(requests), dtype=np.int64)
+    return pd.DataFrame({name: features.get(name, zeros) for name in feature_names},
+                        columns=feature_names)
+
+def prepare_features(request_data, metadata):
+    """Prepare features for the XGBoost model"""
     
-    return df[feature_names]  # Ensure correct column order
+    return prepare_features_batch([request_data], metadata)
 
-def make_prediction(model, features_df, metadata):
-    """Make prediction using the XGBoost model"""
+def describe_factor(feature_name, value):
+    """Human-readable description of one feature value"""
+    
+    if 'log_multiplier' in feature_name:
+        if value != 0:
+            return f"{np.exp(value):.2f}x baseline"
+        return "No early data"
+    elif 'format_' in feature_name and value == 1:
+        return feature_name.replace('format_', '').replace('_', ' ').title()
+    elif feature_name == 'title_word_count':
+        return f"{int(value)} words"
+    elif feature_name == 'day_of_week':
+        return DAY_NAMES[int(value)]
+    elif feature_name == 'hour_of_day':
+        return f"{int(value):02d}:00"
+    return str(value)
+
+def make_predictions_batch(model, features_df, metadata):
+    """Score every row with a single model.predict call"""
     
     try:
-        # Make prediction
-        prediction = model.predict(features_df)[0]
+        if len(features_df) == 0:
+            return []
+        
+        # Make predictions
+        predictions = np.asarray(model.predict(features_df), dtype=np.float64)
         
-        # Calculate confidence interval using model's standard deviation
+        # Calculate confidence intervals using model's standard deviation
         # Use the training performance as a proxy for uncertainty
         train_rmse = metadata['performance'].get('train_rmse', 0.2)
         std_dev = train_rmse
         
-        confidence_interval = [
-            prediction - std_dev,
-            prediction + std_dev
-        ]
-        
         # Convert log multipliers to actual multipliers
-        predicted_multiplier = np.exp(prediction)
-        confidence_multipliers = [np.exp(ci) for ci in confidence_interval]
+        predicted_multipliers = np.exp(predictions)
+        lower_multipliers = np.exp(predictions - std_dev)
+        upper_multipliers = np.exp(predictions + std_dev)
         
-        # Get feature importance (from metadata)
+        # Find top contributing factors, one feature column at a time
         feature_importance = metadata.get('feature_importance', [])
-        
-        # Find top contributing factors for this prediction
-        feature_values = features_df.iloc[0].to_dict()
-        top_factors = []
+        n_rows = len(features_df)
+        row_factors = [[] for _ in range(n_rows)]
         
         for feat_info in feature_importance[:5]:  # Top 5 features
             feature_name = feat_info['feature']
             importance = feat_info['importance']
-            value = feature_values.get(feature_name, 0)
+            if importance <= 0.01:
+                continue
             
-            # Create human-readable factor descriptions
-            if 'log_multiplier' in feature_name:
-                if value != 0:
-                    factor_value = f"{np.exp(value):.2f}x baseline"
-                else:
-                    factor_value = "No early data"
-            elif 'format_' in feature_name and value == 1:
-                factor_value = feature_name.replace('format_', '').replace('_', ' ').title()
-            elif feature_name == 'title_word_count':
-                factor_value = f"{int(value)} words"
-            elif feature_name == 'day_of_week':
-                days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-                factor_value = days[int(value)]
-            elif feature_name == 'hour_of_day':
-                factor_value = f"{int(value):02d}:00"
+            if feature_name in features_df.columns:
+                values = features_df[feature_name].to_numpy()
             else:
-                factor_value = str(value)
+                values = np.zeros(n_rows)
             
             # Only include factors that are actually contributing
-            if (importance > 0.01 and 
-                ((feature_name.startswith('format_') and value == 1) or 
-                 not feature_name.startswith('format_') and value != 0)):
-                
-                top_factors.append({
-                    'feature': feature_name.replace('_', ' ').title(),
+            if feature_name.startswith('format_'):
+                contributing = values == 1
+            else:
+                contributing = values != 0
+            
+            label = feature_name.replace('_', ' ').title()
+            for i in np.flatnonzero(contributing):
+                row_factors[i].append({
+                    'feature': label,
                     'importance': float(importance),
-                    'value': factor_value
+                    'value': describe_factor(feature_name, values[i])
                 })
         
-        # Ensure we have at least some factors
-        if not top_factors:
-            top_factors = [
-                {'feature': 'Topic Cluster', 'importance': 0.1, 'value': str(int(feature_values.get('topic_cluster_id', 0)))},
-                {'feature': 'Title Length', 'importance': 0.05, 'value': f"{int(feature_values.get('title_word_count', 0))} words"}
-            ]
+        topic_ids = _column_or_zeros(features_df, 'topic_cluster_id')
+        word_counts = _column_or_zeros(features_df, 'title_word_count')
         
-        result = {
-            'predicted_multiplier': float(predicted_multiplier),
-            'log_multiplier': float(prediction),
-            'confidence_interval': [float(ci) for ci in confidence_multipliers],
-            'factors': top_factors[:3],  # Top 3 factors
-            'model_version': metadata['model_id']
-        }
+        results = []
+        for i in range(n_rows):
+            top_factors = row_factors[i]
+            
+            # Ensure we have at least some factors
+            if not top_factors:
+                top_factors = [
+                    {'feature': 'Topic Cluster', 'importance': 0.1, 'value': str(int(topic_ids[i]))},
+                    {'feature': 'Title Length', 'importance': 0.05, 'value': f"{int(word_counts[i])} words"}
+                ]
+            
+            results.append({
+                'predicted_multiplier': float(predicted_multipliers[i]),
+                'log_multiplier': float(predictions[i]),
+                'confidence_interval': [float(lower_multipliers[i]), float(upper_multipliers[i])],
+                'factors': top_factors[:3],  # Top 3 factors
+                'model_version': metadata['model_id']
+            })
         
-        return result
+        return results
     
     except Exception as e:
         raise Exception(f"Prediction failed: {str(e)}")
 
+def _column_or_zeros(features_df, name):
+    if name in features_df.columns:
+        return features_df[name].to_numpy()
+    return np.zeros(len(features_df))
+
+def make_prediction(model, features_df, metadata):
+    """Make prediction using the XGBoost model"""
+    
+    return make_predictions_batch(model, features_df.iloc[:1], metadata)[0]
+
 def main():
     """Main prediction function - called from Node.js API"""
     
@@ -191,11 +215,16 @@ def main():
         # Load model
         model, metadata = load_latest_model()
         
-        # Prepare features
-        features_df = prepare_features(request_data, metadata)
-        
-        # Make prediction
-        result = make_prediction(model, features_df, metadata)
+        # A JSON array is scored as one batch and answered with an array
+        if isinstance(request_data, list):
+            features_df = prepare_features_batch(request_data, metadata)
+            result = make_predictions_batch(model, features_df, metadata)
+        else:
+            # Prepare features
+            features_df = prepare_features(request_data, metadata)
+            
+            # Make prediction
+            result = make_prediction(model, features_df, metadata)
         
         # Return result as JSON
         print(json.dumps(result))
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+ML Performance Prediction - Persistent Prediction Server
+Loads the XGBoost model once and answers newline-delimited JSON requests,
+instead of paying for a fresh interpreter, imports and pickle load per call.
+
+Usage:
+    python scripts/ml_prediction_server.py                          # NDJSON over stdin/stdout
+    python scripts/ml_prediction_server.py --socket /tmp/ml.sock    # NDJSON over a Unix socket
+    python scripts/ml_prediction_server.py --socket /tmp/ml.sock --probe
+
+Each request is one JSON object per line, with the same fields ml_predict.py
+reads from stdin plus an optional "id" echoed back in the response:
+    {"id": 1, "title": "...", "topic_cluster_id": 12, "format_type": "tutorial"}
+    {"id": 2, "type": "health"}
+    {"id": 3, "type": "reload"}
+    {"id": 4, "type": "predict_batch", "requests": [{...}, {...}]}
+
+The server hot-reloads when a newer xgboost_performance_predictor model is
+registered in models/ (see ml_model_registry.py).
+"""
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+
+from ml_model_registry import get_registry
+from ml_predict import prepare_features, make_prediction, prepare_features_batch, make_predictions_batch
+
+MODEL_KIND = 'xgboost_performance_predictor'
+RELOAD_CHECK_INTERVAL = 5.0  # seconds between models/ directory scans
+
+
+def log(message):
+    """Log to stderr; stdout carries the protocol in stdin mode"""
+    print(message, file=sys.stderr, flush=True)
+
+
+class ModelHolder:
+    """Keeps the current model and metadata, swapping them when a newer model lands"""
+
+    def __init__(self, model_dir="models", check_interval=RELOAD_CHECK_INTERVAL):
+        self.registry = get_registry(model_dir)
+        self.check_interval = check_interval
+        self.model = None
+        self.metadata = None
+        self.model_id = None
+        self.loaded_at = None
+        self.last_check = 0.0
+        self.reloads = 0
+        self.lock = threading.Lock()
+
+    def load(self, handle):
+        model, metadata = handle.model, handle.metadata
+
+        with self.lock:
+            previous = self.model_id
+            self.model, self.metadata, self.model_id = model, metadata, handle.model_id
+            self.loaded_at = time.time()
+            self.reloads += 1
+
+        if previous:
+            self.registry.evict(previous)
+        log(f"📦 Loaded model {handle.model_id}")
+
+    def ensure_current(self, force=False):
+        """Reload if a newer model is registered; checks are rate-limited"""
+        now = time.time()
+        if not force and self.model is not None and now - self.last_check < self.check_interval:
+            return
+        self.last_check = now
+
+        handle = self.registry.latest(MODEL_KIND)
+        if handle is None:
+            raise FileNotFoundError("No trained model found")
+        # A model whose metadata hasn't been written yet isn't ready to serve
+        if handle.model_id != self.model_id and (handle.entry['metadata_file'] or self.model is None):
+            try:
+                self.load(handle)
+            except Exception as e:
+                # A half-written model must not take down a healthy server
+                if self.model is None:
+                    raise
+                self.registry.evict(handle.model_id)
+                log(f"⚠️ Failed to load {handle.model_id}, keeping {self.model_id}: {e}")
+
+    def snapshot(self):
+        with self.lock:
+            return self.model, self.metadata
+
+
+class PredictionService:
+    """Turns request dicts into response dicts"""
+
+    def __init__(self, holder):
+        self.holder = holder
+        self.started_at = time.time()
+        self.requests_served = 0
+        self.errors = 0
+
+    def handle(self, request):
+        request_id = request.get('id')
+        request_type = request.get('type', 'predict')
+
+        try:
+            if request_type == 'health':
+                response = self.health()
+            elif request_type == 'reload':
+                self.holder.ensure_current(force=True)
+                response = self.health()
+            elif request_type == 'predict_batch':
+                self.holder.ensure_current()
+                model, metadata = self.holder.snapshot()
+                batch = request.get('requests', [])
+                features_df = prepare_features_batch(batch, metadata)
+                response = {'predictions': make_predictions_batch(model, features_df, metadata)}
+                self.requests_served += len(batch)
+            else:
+                self.holder.ensure_current()
+                model, metadata = self.holder.snapshot()
+                features_df = prepare_features(request, metadata)
+                response = make_prediction(model, features_df, metadata)
+                self.requests_served += 1
+        except Exception as e:
+            self.errors += 1
+            response = {
+                'error': str(e),
+                'predicted_multiplier': 1.0,  # Fallback to baseline
+                'log_multiplier': 0.0,
+                'confidence_interval': [0.8, 1.2],
+                'factors': [
+                    {'feature': 'Error', 'importance': 1.0, 'value': 'Using fallback prediction'}
+                ],
+                'model_version': 'fallback'
+            }
+
+        if request_id is not None:
+            response['id'] = request_id
+        return response
+
+    def handle_line(self, line):
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            return {'error': f"Invalid JSON: {e}"}
+        return self.handle(request)
+
+    def health(self):
+        model, metadata = self.holder.snapshot()
+        return {
+            'status': 'ok' if model is not None else 'no_model',
+            'model_version': metadata.get('model_id') if metadata else None,
+            'loaded_at': self.holder.loaded_at,
+            'uptime_seconds': round(time.time() - self.started_at, 1),
+            'requests_served': self.requests_served,
+            'errors': self.errors,
+            'reloads': self.holder.reloads
+        }
+
+
+def serve_stdio(service):
+    """Answer one JSON line on stdout for every JSON line on stdin"""
+    log("🚀 Prediction server ready on stdin/stdout")
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        sys.stdout.write(json.dumps(service.handle_line(line)) + '\n')
+        sys.stdout.flush()
+
+
+def serve_socket(service, socket_path):
+    """Serve NDJSON over a Unix socket, one thread per connection"""
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for raw in self.rfile:
+                if not raw.strip():
+                    continue
+                response = service.handle_line(raw.decode('utf-8'))
+                self.wfile.write((json.dumps(response) + '\n').encode('utf-8'))
+                self.wfile.flush()
+
+    class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+
+    with Server(socket_path, Handler) as server:
+        log(f"🚀 Prediction server listening on {socket_path}")
+        try:
+            server.serve_forever()
+        finally:
+            os.unlink(socket_path)
+
+
+def probe(socket_path, timeout=2.0):
+    """Health probe for a running socket server; exit code 0 when healthy"""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(timeout)
+            client.connect(socket_path)
+            client.sendall(b'{"type": "health"}\n')
+            response = json.loads(client.makefile('r').readline())
+    except Exception as e:
+        print(json.dumps({'status': 'unreachable', 'error': str(e)}))
+        return 1
+
+    print(json.dumps(response))
+    return 0 if response.get('status') == 'ok' else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Persistent ML prediction server")
+    parser.add_argument('--socket', help="Unix socket path (default: stdin/stdout)")
+    parser.add_argument('--model-dir', default="models")
+    parser.add_argument('--probe', action='store_true', help="Query a running server's health and exit")
+    args = parser.parse_args()
+
+    if args.probe:
+        if not args.socket:
+            parser.error("--probe requires --socket")
+        sys.exit(probe(args.socket))
+
+    holder = ModelHolder(args.model_dir)
+    holder.ensure_current(force=True)
+    service = PredictionService(holder)
+
+    if args.socket:
+        serve_socket(service, args.socket)
+    else:
+        serve_stdio(service)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,40 +6,20 @@ Use ML model to generate synthetic recent baselines for channels with sparse dat
 
 import json
 import sys
-import pickle
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import os
+
+from ml_model_registry import get_registry
 
 def load_ml_model():
-    """Load the trained XGBoost baseline model"""
-    
-    model_dir = "models"
-    if not os.path.exists(model_dir):
-        raise FileNotFoundError("Models directory not found")
-    
-    # Find latest BASELINE model files (not performance predictor)
-    model_files = [f for f in os.listdir(model_dir) if f.endswith('.pkl') and 'xgboost_baseline_predictor' in f]
-    metadata_files = [f for f in os.listdir(model_dir) if f.endswith('_metadata.json') and 'baseline_predictor' in f]
+    """Load the trained XGBoost baseline model (not the performance predictor)"""
     
-    if not model_files or not metadata_files:
+    handle = get_registry("models").latest('xgboost_baseline_predictor')
+    if handle is None:
         raise FileNotFoundError("No trained baseline model found - run ml_baseline_model_training.py first")
     
-    latest_model_file = sorted(model_files)[-1]
-    latest_metadata_file = sorted(metadata_files)[-1]
-    
-    # Load model
-    model_path = os.path.join(model_dir, latest_model_file)
-    with open(model_path, 'rb') as f:
-        model = pickle.load(f)
-    
-    # Load metadata
-    metadata_path = os.path.join(model_dir, latest_metadata_file)
-    with open(metadata_path, 'r') as f:
-        metadata = json.load(f)
-    
-    return model, metadata
+    return handle.model, handle.metadata
 
 def get_channel_characteristics(channel_data):
     """Extract channel characteristics for ML prediction"""
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+ML Training Harness
+Shared k-fold cross-validation and hyperparameter search for the XGBoost
+trainers (performance predictor, channel baseline, performance envelope).
+
+The feature matrix and target are copied once into shared memory and every
+worker in the process pool attaches to them by name, so a search over many
+configurations never pickles the data per task. Each (configuration, fold)
+result is checkpointed to disk as soon as it finishes; rerunning the same
+search on the same data skips every fold already scored, so an interrupted
+search resumes where it stopped. The winner is written straight into the
+models directory through the model registry, with the search summary in its
+metadata.
+
+Usage:
+    from ml_training_harness import parameter_grid, search, fit_model, save_winner
+
+    ranked = search(X_train, y_train, parameter_grid(BASE_PARAMS, PARAM_GRID))
+    model = fit_model(X_train, y_train, ranked[0]['params'])
+    save_winner(model, {'model_id': ..., 'features': ...}, ranked)
+"""
+
+import hashlib
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import xgboost as xgb
+
+from ml_model_registry import get_registry
+
+DEFAULT_CHECKPOINT_DIR = 'models/search_checkpoints'
+DEFAULT_FOLDS = 5
+DEFAULT_SEED = 42
+
+# Lower is better for errors, higher for R²
+METRICS = {'mae': 1, 'rmse': 1, 'r2': -1}
+
+
+class SharedMatrix:
+    """A numpy array copied into named shared memory so pool workers can attach without pickling it"""
+
+    def __init__(self, array):
+        array = np.ascontiguousarray(array)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        self.array = np.ndarray(array.shape, dtype=array.dtype, buffer=self.shm.buf)
+        self.array[...] = array
+
+    @property
+    def spec(self):
+        return (self.shm.name, self.array.shape, self.array.dtype.str)
+
+    @staticmethod
+    def attach(spec):
+        """(SharedMemory, ndarray view) for a spec produced in the parent process"""
+        name, shape, dtype = spec
+        shm = shared_memory.SharedMemory(name=name)
+        return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+    def close(self):
+        del self.array
+        self.shm.close()
+        self.shm.unlink()
+
+
+class FoldCheckpoints:
+    """One JSON file per finished (configuration, fold), grouped by data fingerprint"""
+
+    def __init__(self, directory, fingerprint):
+        self.directory = os.path.join(directory, fingerprint)
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key, fold):
+        return os.path.join(self.directory, f"{key}_fold{fold}.json")
+
+    def get(self, key, fold):
+        path = self._path(key, fold)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            # A fold interrupted mid-write is simply rerun
+            return None
+
+    def put(self, key, fold, result):
+        path = self._path(key, fold)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(result, f)
+        os.replace(tmp_path, path)
+
+
+# Candidates
+
+def parameter_grid(base_params, grid):
+    """Every combination of the grid values, each merged over base_params"""
+    names = sorted(grid)
+    return [dict(base_params, **dict(zip(names, values)))
+            for values in itertools.product(*(grid[name] for name in names))]
+
+
+def sample_parameters(base_params, space, n_iter=20, seed=DEFAULT_SEED):
+    """
+    Random search candidates. Each space entry is either a list of choices,
+    a (low, high) range sampled uniformly (integers if both ends are ints),
+    or (low, high, 'log') sampled log-uniformly.
+    """
+    rng = np.random.default_rng(seed)
+    candidates = []
+    for _ in range(n_iter):
+        params = dict(base_params)
+        for name in sorted(space):
+            spec = space[name]
+            if isinstance(spec, list):
+                params[name] = spec[rng.integers(len(spec))]
+            elif len(spec) == 3 and spec[2] == 'log':
+                params[name] = float(np.exp(rng.uniform(np.log(spec[0]), np.log(spec[1]))))
+            elif isinstance(spec[0], int) and isinstance(spec[1], int):
+                params[name] = int(rng.integers(spec[0], spec[1] + 1))
+            else:
+                params[name] = float(rng.uniform(spec[0], spec[1]))
+        candidates.append(params)
+    return candidates
+
+
+def config_key(params):
+    return hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()[:12]
+
+
+def data_fingerprint(X, y, n_folds, seed):
+    """Checkpoints are only reused for the same data split the same way"""
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(f"{X.shape}|{X.dtype}|{n_folds}|{seed}".encode())
+    digest.update(memoryview(X).cast('B'))
+    digest.update(memoryview(y).cast('B'))
+    return digest.hexdigest()
+
+
+# Folds and fitting
+
+def kfold_indices(n_rows, n_folds=DEFAULT_FOLDS, seed=DEFAULT_SEED):
+    """Shuffled k-fold (train, valid) index pairs, identical in every process"""
+    order = np.random.default_rng(seed).permutation(n_rows)
+    folds = np.array_split(order, n_folds)
+    return [(np.concatenate(folds[:k] + folds[k + 1:]), folds[k]) for k in range(n_folds)]
+
+
+def regression_metrics(y_true, y_pred):
+    y_true = np.asarray(y_true, dtype=float)
+    errors = y_true - np.asarray(y_pred, dtype=float)
+    total = np.sum((y_true - y_true.mean()) ** 2)
+    return {
+        'mae': float(np.mean(np.abs(errors))),
+        'rmse': float(np.sqrt(np.mean(errors ** 2))),
+        'r2': float(1 - np.sum(errors ** 2) / total) if total > 0 else 0.0
+    }
+
+
+def fit_model(X, y, params, eval_set=None, n_jobs=None):
+    """XGBRegressor fitted with params; early stopping needs an eval_set, so it is dropped without one"""
+    params = dict(params)
+    if eval_set is None:
+        params.pop('early_stopping_rounds', None)
+    if n_jobs is not None:
+        params['n_jobs'] = n_jobs
+
+    model = xgb.XGBRegressor(**params)
+    model.fit(X, y, eval_set=eval_set, verbose=False)
+    return model
+
+
+def _score_fold(X, y, params, fold, n_folds, seed, n_jobs):
+    train_idx, valid_idx = kfold_indices(len(y), n_folds, seed)[fold]
+    start = time.perf_counter()
+
+    X_valid, y_valid = X[valid_idx], y[valid_idx]
+    model = fit_model(X[train_idx], y[train_idx], params, eval_set=[(X_valid, y_valid)], n_jobs=n_jobs)
+
+    result = regression_metrics(y_valid, model.predict(X_valid))
+    result['best_iteration'] = getattr(model, 'best_iteration', None)
+    result['n_valid'] = len(valid_idx)
+    result['seconds'] = round(time.perf_counter() - start, 3)
+    return result
+
+
+# Pool workers attach to the parent's shared arrays once, in the initializer
+_worker = {}
+
+
+def _init_worker(x_spec, y_spec, n_folds, seed, n_jobs):
+    x_shm, X = SharedMatrix.attach(x_spec)
+    y_shm, y = SharedMatrix.attach(y_spec)
+    _worker.update(shm=(x_shm, y_shm), X=X, y=y, n_folds=n_folds, seed=seed, n_jobs=n_jobs)
+
+
+def _run_task(task):
+    key, params, fold = task
+    result = _score_fold(_worker['X'], _worker['y'], params, fold,
+                         _worker['n_folds'], _worker['seed'], _worker['n_jobs'])
+    return key, fold, result
+
+
+# Search
+
+def search(X, y, candidates, n_folds=DEFAULT_FOLDS, metric='mae', n_workers=None,
+           checkpoint_dir=DEFAULT_CHECKPOINT_DIR, seed=DEFAULT_SEED):
+    """
+    Cross-validate every candidate parameter set and return them ranked best
+    first as dicts of params, per-fold results and mean/std of each metric.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric {metric!r}; expected one of {sorted(METRICS)}")
+
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    y = np.ascontiguousarray(y, dtype=np.float64)
+    n_workers = n_workers or os.cpu_count() or 1
+    n_jobs = max(1, (os.cpu_count() or 1) // n_workers)
+
+    configs = {}
+    for params in candidates:
+        configs.setdefault(config_key(params), params)
+
+    checkpoints = FoldCheckpoints(checkpoint_dir, data_fingerprint(X, y, n_folds, seed))
+    scores = {key: {} for key in configs}
+    tasks = []
+    for key, params in configs.items():
+        for fold in range(n_folds):
+            result = checkpoints.get(key, fold)
+            if result is None:
+                tasks.append((key, params, fold))
+            else:
+                scores[key][fold] = result
+
+    total = len(configs) * n_folds
+    print(f"🔎 Search: {len(configs)} configurations x {n_folds} folds on {len(y):,} rows")
+    if total > len(tasks):
+        print(f"   ♻️ Resuming: {total - len(tasks)}/{total} folds already checkpointed")
+
+    def record(key, fold, result):
+        checkpoints.put(key, fold, result)
+        scores[key][fold] = result
+        done = sum(len(folds) for folds in scores.values())
+        print(f"   ✅ {key} fold {fold}: {metric}={result[metric]:.4f} ({done}/{total})")
+
+    if tasks and n_workers == 1:
+        for key, params, fold in tasks:
+            record(key, fold, _score_fold(X, y, params, fold, n_folds, seed, n_jobs))
+    elif tasks:
+        shared_X, shared_y = SharedMatrix(X), SharedMatrix(y)
+        try:
+            with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                     initargs=(shared_X.spec, shared_y.spec, n_folds, seed, n_jobs)) as pool:
+                futures = [pool.submit(_run_task, task) for task in tasks]
+                for future in as_completed(futures):
+                    record(*future.result())
+        finally:
+            shared_X.close()
+            shared_y.close()
+
+    ranked = []
+    for key, params in configs.items():
+        folds = [scores[key][fold] for fold in range(n_folds)]
+        entry = {'key': key, 'params': params, 'folds': folds}
+        for name in METRICS:
+            values = np.array([fold[name] for fold in folds])
+            entry[f'mean_{name}'] = float(values.mean())
+            entry[f'std_{name}'] = float(values.std())
+        iterations = [fold['best_iteration'] for fold in folds if fold.get('best_iteration') is not None]
+        entry['best_iteration'] = int(np.mean(iterations)) if iterations else None
+        ranked.append(entry)
+
+    ranked.sort(key=lambda entry: METRICS[metric] * entry[f'mean_{metric}'])
+    best = ranked[0]
+    print(f"🏆 Best {metric}: {best[f'mean_{metric}']:.4f} ± {best[f'std_{metric}']:.4f} ({best['key']})")
+    return ranked
+
+
+def search_summary(ranked, metric='mae', top=5):
+    """Compact description of a search for model metadata"""
+    return {
+        'metric': metric,
+        'n_configurations': len(ranked),
+        'n_folds': len(ranked[0]['folds']) if ranked else 0,
+        'best_params': ranked[0]['params'] if ranked else None,
+        'top': [{key: entry[key] for key in entry if key != 'folds'} for entry in ranked[:top]]
+    }
+
+
+def save_winner(model, metadata, ranked=None, metric='mae', model_dir="models"):
+    """Register the winning model and its metadata (plus the search summary) in model_dir"""
+    metadata = dict(metadata)
+    if ranked:
+        metadata['search'] = search_summary(ranked, metric)
+    return get_registry(model_dir).save_model(model, metadata)
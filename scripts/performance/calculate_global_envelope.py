@@ -9,7 +9,8 @@ Key Features:
 - Filters out YouTube Shorts (≤121 seconds)
 - Applies tier-based weighting to correct selection bias
 - Uses temporal weighting (18-month half-life)
-- Calculates percentiles with square root snapshot frequency weighting
+- Calculates weighted percentiles (temporal x tier x square root snapshot frequency)
+  for every day in one vectorized pass
 - Outputs curves for Days 0-730 with appropriate interpolation
 """
 
@@ -24,6 +25,8 @@ from typing import Dict, List, Tuple, Optional
 import re
 from dotenv import load_dotenv
 
+from weighted_percentiles import PERCENTILES, weighted_percentiles
+
 # Load environment variables
 load_dotenv()
 
@@ -182,37 +185,25 @@ def calculate_global_percentiles(df: pd.DataFrame, tier_weights: Dict[int, float
     # Calculate final combined weight
     df['final_weight'] = df['temporal_weight'] * df['tier_weight'] * df['video_weight']
     
-    percentiles_data = []
-    
-    for day in range(0, 731):  # Days 0-730
-        day_data = df[df['days_since_published'] == day].copy()
-        
-        if len(day_data) < 30:  # Minimum threshold for reliable percentiles
-            continue
-        
-        # Calculate weighted percentiles
-        views = day_data['view_count'].values
-        weights = day_data['final_weight'].values
-        
-        # Normalize weights
-        weights = weights / weights.sum()
-        
-        # Calculate percentiles using weighted quantiles
-        percentiles = {}
-        for p, label in [(10, 'p10'), (25, 'p25'), (50, 'p50'), (75, 'p75'), (90, 'p90'), (95, 'p95')]:
-            percentiles[label] = np.percentile(views, p)  # Simple percentile for now
-        
-        percentiles_data.append({
-            'day_since_published': day,
-            'sample_count': len(day_data),
-            'total_weight': weights.sum(),
-            **percentiles
-        })
-        
-        if day % 30 == 0:  # Progress update every 30 days
-            print(f"  Day {day}: {len(day_data)} videos, p50={percentiles['p50']:,.0f} views")
+    # One pass over every day and percentile (sorted once by day, then views)
+    in_range = (df['days_since_published'] >= 0) & (df['days_since_published'] <= 730)
+    days, counts, totals, values = weighted_percentiles(
+        df.loc[in_range, 'days_since_published'].to_numpy(),
+        df.loc[in_range, 'view_count'].to_numpy(dtype=float),
+        df.loc[in_range, 'final_weight'].to_numpy(dtype=float),
+        min_samples=30  # Minimum threshold for reliable percentiles
+    )
+    
+    result_df = pd.DataFrame({
+        'day_since_published': days.astype(int),
+        'sample_count': counts,
+        'total_weight': totals,
+        **{f'p{p}_views': values[:, i] for i, p in enumerate(PERCENTILES)}
+    })
+    
+    for _, row in result_df[result_df['day_since_published'] % 30 == 0].iterrows():  # Progress every 30 days
+        print(f"  Day {int(row['day_since_published'])}: {int(row['sample_count'])} videos, p50={row['p50_views']:,.0f} views")
     
-    result_df = pd.DataFrame(percentiles_data)
     print(f"Generated percentiles for {len(result_df)} days")
     
     return result_df
@@ -4,13 +4,19 @@ Efficient calculation of performance curves using SQL filtering
 """
 
 import os
+import sys
 import matplotlib.pyplot as plt
 import numpy as np
+import pandas as pd
 from supabase import create_client, Client
 from dotenv import load_dotenv
 from scipy.ndimage import gaussian_filter1d
 from datetime import datetime
-from collections import defaultdict
+
+from weighted_percentiles import PERCENTILES, weighted_percentiles
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import snapshot_cache
 
 # Load environment variables
 load_dotenv()
@@ -30,138 +36,38 @@ def get_view_tracking_stats():
     print(f"   Total tracked videos: {stats.count:,}")
 
 def fetch_non_short_snapshots():
-    """Fetch all snapshots for non-Short videos using SQL"""
-    print("\n🚀 Fetching snapshots for non-Short videos...")
+    """Snapshots (day, views) for non-Short videos from the local snapshot cache"""
+    print("\n🚀 Loading snapshots for non-Short videos...")
     
-    # Get snapshots with video metadata in one query
-    # This query filters Shorts using SQL pattern matching
-    all_snapshots = []
-    offset = 0
-    batch_size = 1000
+    # Pull anything created since the last run, then read the whole table from disk
+    snapshot_cache.sync(supabase=supabase)
+    df = snapshot_cache.load_snapshots(columns=['days_since_published', 'view_count', 'duration_seconds'])
     
-    while True:
-        print(f"   Processing batch starting at offset {offset}...")
-        
-        # Query snapshots with video metadata using join syntax
-        try:
-            result = supabase.table('view_snapshots')\
-                .select('days_since_published, view_count, video_id')\
-                .gte('days_since_published', 0)\
-                .lte('days_since_published', 365)\
-                .range(offset, offset + batch_size - 1)\
-                .execute()
-                
-            if not result.data:
-                break
-                
-            # Get video durations for this batch
-            video_ids = list(set([r['video_id'] for r in result.data]))
-            
-            # Fetch videos in chunks
-            videos_data = []
-            for i in range(0, len(video_ids), 100):
-                chunk = video_ids[i:i+100]
-                videos = supabase.table('videos')\
-                    .select('id, duration')\
-                    .in_('id', chunk)\
-                    .not_.is_('duration', 'null')\
-                    .neq('duration', '')\
-                    .execute()
-                videos_data.extend(videos.data)
-            
-            # Create lookup
-            duration_lookup = {v['id']: v['duration'] for v in videos_data}
-            
-            # Process snapshots
-            for row in result.data:
-                if row['video_id'] in duration_lookup:
-                    duration = duration_lookup[row['video_id']]
-                    row['videos'] = {'duration': duration}
-                else:
-                    continue
-        except Exception as e:
-            print(f"Error fetching batch: {e}")
-            break
-        
-        if not result.data:
-            break
-            
-        # Filter Shorts in Python (simpler than complex SQL)
-        for row in result.data:
-            duration = row['videos']['duration']
-            
-            # Parse duration - looking for > 121 seconds
-            if 'PT' in duration:
-                # Extract seconds from various formats
-                total_seconds = 0
-                
-                # Hours
-                if 'H' in duration:
-                    hours = int(duration.split('H')[0].split('PT')[-1])
-                    total_seconds += hours * 3600
-                    
-                # Minutes
-                if 'M' in duration:
-                    if 'H' in duration:
-                        minutes = int(duration.split('M')[0].split('H')[1])
-                    else:
-                        minutes = int(duration.split('M')[0].split('PT')[-1])
-                    total_seconds += minutes * 60
-                    
-                # Seconds
-                if 'S' in duration:
-                    if 'M' in duration:
-                        seconds = int(duration.split('S')[0].split('M')[1])
-                    elif 'H' in duration:
-                        # Edge case: PT1H30S
-                        seconds = int(duration.split('S')[0].split('H')[1])
-                    else:
-                        seconds = int(duration.split('S')[0].split('PT')[-1])
-                    total_seconds += seconds
-                
-                # Keep if > 121 seconds (not a Short)
-                if total_seconds > 121:
-                    all_snapshots.append({
-                        'day': row['days_since_published'],
-                        'views': row['view_count']
-                    })
-        
-        offset += batch_size
-        print(f"   Processed {offset} records, found {len(all_snapshots)} non-Short snapshots...")
-        
-        if len(result.data) < batch_size:
-            break
+    # Keep days 0-365 of videos over 121 seconds (not Shorts)
+    days = df['days_since_published'].to_numpy()
+    keep = snapshot_cache.long_form(df) & (days >= 0) & (days <= 365)
+    snapshots = pd.DataFrame({'day': days[keep].astype(int), 'views': df['view_count'].to_numpy()[keep]})
     
-    return all_snapshots
+    print(f"   Loaded {len(df):,} snapshots, found {len(snapshots):,} non-Short snapshots")
+    return snapshots
 
 def calculate_curves_from_snapshots(snapshots):
     """Calculate percentile curves from snapshot data"""
     print(f"\n📈 Calculating curves from {len(snapshots):,} snapshots...")
     
-    # Group by day
-    views_by_day = defaultdict(list)
-    
-    for snap in snapshots:
-        if snap['views'] and snap['views'] > 0:
-            views_by_day[snap['day']].append(snap['views'])
-    
-    print(f"   Days with data: {len(views_by_day)}")
-    
-    # Calculate percentiles
-    percentile_data = []
-    for day in sorted(views_by_day.keys()):
-        views = views_by_day[day]
-        if len(views) >= 10:  # Need minimum samples
-            percentile_data.append({
-                'day': day,
-                'count': len(views),
-                'p10': np.percentile(views, 10),
-                'p25': np.percentile(views, 25),
-                'p50': np.percentile(views, 50),
-                'p75': np.percentile(views, 75),
-                'p90': np.percentile(views, 90),
-                'p95': np.percentile(views, 95)
-            })
+    # Percentiles for every day in one pass
+    days = snapshots['day'].to_numpy()
+    views = snapshots['views'].fillna(0).to_numpy(dtype=float)
+    positive = views > 0
+    
+    print(f"   Days with data: {len(np.unique(days[positive]))}")
+    
+    # Need minimum samples
+    day_values, counts, _, values = weighted_percentiles(days[positive], views[positive], min_samples=10)
+    percentile_data = [
+        {'day': day, 'count': int(count), **{f'p{p}': value for p, value in zip(PERCENTILES, row)}}
+        for day, count, row in zip(day_values.tolist(), counts, values.tolist())
+    ]
     
     print(f"   Calculated percentiles for {len(percentile_data)} days")
     
@@ -336,7 +242,7 @@ def main():
     # Fetch snapshots
     snapshots = fetch_non_short_snapshots()
     
-    if not snapshots:
+    if len(snapshots) == 0:
         print("❌ No snapshots found!")
         return
     
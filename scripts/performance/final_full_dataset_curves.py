@@ -11,7 +11,9 @@ from supabase import create_client, Client
 from dotenv import load_dotenv
 from scipy.ndimage import gaussian_filter1d
 from datetime import datetime
-from collections import defaultdict
+
+from quantile_sketch import DailyQuantileSketch
+from weighted_percentiles import PERCENTILES
 
 # Load environment variables
 load_dotenv()
@@ -114,9 +116,9 @@ def fetch_all_non_short_snapshots():
     
     print(f"   Found {len(non_short_ids):,} non-Short videos")
     
-    # Step 2: Get snapshots for non-Short videos
+    # Step 2: Stream snapshots for non-Short videos into per-day sketches
     print("\n   Step 2: Fetching snapshots for non-Short videos...")
-    all_snapshots = []
+    all_snapshots = DailyQuantileSketch()
     
     # Process in chunks to avoid query limits
     chunk_size = 100
@@ -130,7 +132,8 @@ def fetch_all_non_short_snapshots():
             .lte('days_since_published', 365)\
             .execute()
         
-        all_snapshots.extend(snapshots.data)
+        all_snapshots.add([row['days_since_published'] for row in snapshots.data],
+                          [row['view_count'] or 0 for row in snapshots.data])
         
         if i % 1000 == 0:
             print(f"   Progress: {i}/{len(non_short_ids)} videos processed ({len(all_snapshots):,} snapshots)...")
@@ -139,34 +142,21 @@ def fetch_all_non_short_snapshots():
     return all_snapshots
 
 def calculate_percentiles(snapshots):
-    """Calculate percentiles from snapshot data"""
+    """Calculate percentiles from the per-day snapshot sketches"""
     print("\n📈 Calculating percentiles from full dataset...")
     
-    # Group by day
-    views_by_day = defaultdict(list)
-    
-    for snap in snapshots:
-        if snap['view_count'] and snap['view_count'] > 0:
-            views_by_day[snap['days_since_published']].append(snap['view_count'])
+    # Zero-view snapshots are left out, as before
+    positive_counts = snapshots.counts[:, 1:].sum(axis=1)
     
-    print(f"   Days with data: {len(views_by_day)}")
-    print(f"   Total data points: {sum(len(v) for v in views_by_day.values()):,}")
+    print(f"   Days with data: {int((positive_counts > 0).sum())}")
+    print(f"   Total data points: {int(positive_counts.sum()):,}")
     
-    # Calculate percentiles
-    percentile_data = []
-    for day in range(366):
-        if day in views_by_day and len(views_by_day[day]) >= 10:
-            views = views_by_day[day]
-            percentile_data.append({
-                'day': day,
-                'count': len(views),
-                'p10': np.percentile(views, 10),
-                'p25': np.percentile(views, 25),
-                'p50': np.percentile(views, 50),
-                'p75': np.percentile(views, 75),
-                'p90': np.percentile(views, 90),
-                'p95': np.percentile(views, 95)
-            })
+    # Calculate percentiles (within the sketch's relative accuracy)
+    days, counts, values = snapshots.quantiles(min_samples=10, days=range(366), include_zeros=False)
+    percentile_data = [
+        {'day': day, 'count': int(count), **{f'p{p}': value for p, value in zip(PERCENTILES, row)}}
+        for day, count, row in zip(days.tolist(), counts, values.tolist())
+    ]
     
     print(f"   Calculated percentiles for {len(percentile_data)} days")
     
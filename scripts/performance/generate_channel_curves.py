@@ -5,12 +5,16 @@ This creates channel-specific envelopes for more accurate performance analysis
 """
 
 import os
+import sys
 import numpy as np
 from supabase import create_client, Client
 from dotenv import load_dotenv
 from datetime import datetime
 from scipy.ndimage import gaussian_filter1d
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import snapshot_cache
+
 # Load environment variables
 load_dotenv()
 
@@ -66,6 +70,13 @@ ready_channels = [
 
 print(f"Found {len(ready_channels)} channels ready for individual curves")
 
+# Non-Short snapshots with a view count, from the local snapshot cache
+print("\n📥 Loading snapshots...")
+snapshot_cache.sync(supabase=supabase)
+snapshots = snapshot_cache.load_snapshots(columns=['channel_id', 'days_since_published', 'view_count', 'duration_seconds'])
+snapshots = snapshots[snapshot_cache.long_form(snapshots) & snapshots['view_count'].notna().to_numpy()]
+print(f"   {len(snapshots):,} non-Short snapshots")
+
 # Create channel_performance_envelopes table using MCP
 print("\n🏗️ Setting up channel curves table...")
 print("✅ Using existing table or MCP tools for table creation")
@@ -90,43 +101,26 @@ for channel in ready_channels:
     channel_stats = {}
     total_processed = 0
     
+    # View counts for this channel by day
+    channel_snapshots = snapshots[(snapshots['channel_id'] == channel_id).to_numpy()]
+    views_by_day = {int(day): group.to_numpy() for day, group in channel_snapshots.groupby('days_since_published')['view_count']}
+    
     for day in key_days:
-        # Get view counts for this channel and day
-        query_sql = f"""
-        SELECT vs.view_count
-        FROM view_snapshots vs
-        JOIN videos v ON vs.video_id = v.id
-        WHERE v.channel_id = '{channel_id}'
-            AND vs.days_since_published = {day}
-            AND v.duration IS NOT NULL
-            AND v.duration != ''
-            AND (v.duration LIKE '%H%' OR 
-                 (v.duration LIKE '%M%' AND v.duration LIKE 'PT%') OR
-                 (v.duration LIKE 'PT%S' AND v.duration NOT LIKE '%M%' AND 
-                  LENGTH(REPLACE(REPLACE(v.duration, 'PT', ''), 'S', '')) > 2))
-            AND vs.view_count IS NOT NULL
-        """
-        
-        try:
-            day_result = supabase.rpc('execute_sql', {'query': query_sql}).execute()
-            if day_result.data:
-                views = [row['view_count'] for row in day_result.data]
-                total_processed += len(views)
-                
-                if len(views) >= 5:  # Minimum for reliable percentiles
-                    views_array = np.array(views)
-                    channel_stats[day] = {
-                        'p10': int(np.percentile(views_array, 10)),
-                        'p25': int(np.percentile(views_array, 25)),
-                        'p50': int(np.percentile(views_array, 50)),
-                        'p75': int(np.percentile(views_array, 75)),
-                        'p90': int(np.percentile(views_array, 90)),
-                        'p95': int(np.percentile(views_array, 95)),
-                        'count': len(views)
-                    }
-        except Exception as e:
-            print(f"   Error processing day {day}: {e}")
+        views = views_by_day.get(day)
+        if views is None:
             continue
+        total_processed += len(views)
+        
+        if len(views) >= 5:  # Minimum for reliable percentiles
+            channel_stats[day] = {
+                'p10': int(np.percentile(views, 10)),
+                'p25': int(np.percentile(views, 25)),
+                'p50': int(np.percentile(views, 50)),
+                'p75': int(np.percentile(views, 75)),
+                'p90': int(np.percentile(views, 90)),
+                'p95': int(np.percentile(views, 95)),
+                'count': len(views)
+            }
     
     if len(channel_stats) < 10:
         print(f"   ❌ Insufficient data points ({len(channel_stats)}), skipping")
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Per-Day Quantile Sketch
+
+Mergeable, fixed-size summary of view counts for every day since publish
+(0-3650), so envelope scripts can stream snapshots page by page instead of
+holding every view count in Python lists.
+
+Each day keeps a histogram over logarithmic buckets: a positive view count x
+falls in bucket ceil(log_gamma(x)) with gamma = (1 + a) / (1 - a), and every
+quantile read back is within relative error a of the exact order statistic
+(a = relative_accuracy, 1% by default). Zero views get their own bucket.
+Memory depends only on the day range and accuracy, not on the snapshot count.
+Two sketches merge by adding their histograms, so pages or day ranges can be
+sketched by separate workers and combined, and the state saves to .npz so a
+later refresh can resume from it.
+
+Usage:
+    from quantile_sketch import DailyQuantileSketch
+
+    sketch = DailyQuantileSketch()
+    for page in pages:
+        sketch.add(page_days, page_views)
+    days, counts, values = sketch.quantiles(min_samples=10)
+    sketch.save('data/envelope_sketch.npz')
+"""
+
+import json
+import os
+
+import numpy as np
+
+from weighted_percentiles import PERCENTILES
+
+DEFAULT_MAX_DAY = 3650
+DEFAULT_RELATIVE_ACCURACY = 0.01
+DEFAULT_MAX_VALUE = 1e12
+
+
+class DailyQuantileSketch:
+    """Log-bucketed view count histograms for days 0..max_day"""
+
+    def __init__(self, max_day=DEFAULT_MAX_DAY, relative_accuracy=DEFAULT_RELATIVE_ACCURACY,
+                 max_value=DEFAULT_MAX_VALUE, metadata=None):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+
+        self.max_day = int(max_day)
+        self.relative_accuracy = float(relative_accuracy)
+        self.max_value = float(max_value)
+        self.metadata = dict(metadata or {})
+        # Named arrays saved alongside the histograms (e.g. the curves derived from them)
+        self.extras = {}
+
+        self.gamma = (1 + self.relative_accuracy) / (1 - self.relative_accuracy)
+        self.log_gamma = np.log(self.gamma)
+        # Column 0 counts zeros; column i + 1 is bucket i, covering (gamma^(i-1), gamma^i]
+        self.n_buckets = int(np.ceil(np.log(self.max_value) / self.log_gamma)) + 2
+        self.counts = np.zeros((self.max_day + 1, self.n_buckets), dtype=np.int64)
+
+    def __len__(self):
+        return int(self.counts.sum())
+
+    @property
+    def day_counts(self):
+        return self.counts.sum(axis=1)
+
+    # Building
+
+    def add(self, days, values):
+        """Add snapshots; days outside 0..max_day and negative or missing values are skipped. Returns rows added."""
+        days = np.asarray(days, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        keep = (days >= 0) & (days <= self.max_day) & (values >= 0) & np.isfinite(values)
+        if not keep.any():
+            return 0
+
+        days = days[keep].astype(np.int64)
+        columns = self._bucket(values[keep])
+        cells, cell_counts = np.unique(days * self.n_buckets + columns, return_counts=True)
+        self.counts.reshape(-1)[cells] += cell_counts
+        return int(keep.sum())
+
+    def merge(self, other):
+        """Fold another sketch with the same layout into this one"""
+        if (other.max_day, other.n_buckets, other.relative_accuracy) != (self.max_day, self.n_buckets, self.relative_accuracy):
+            raise ValueError("Cannot merge sketches with different day range or accuracy")
+        self.counts += other.counts
+        return self
+
+    def copy(self):
+        clone = DailyQuantileSketch(self.max_day, self.relative_accuracy, self.max_value, self.metadata)
+        clone.counts = self.counts.copy()
+        clone.extras = {name: array.copy() for name, array in self.extras.items()}
+        return clone
+
+    # Reading
+
+    def quantiles(self, percentiles=PERCENTILES, min_samples=1, days=None, include_zeros=True):
+        """
+        (days, counts, values) for days with at least min_samples snapshots;
+        values has shape (n_days, len(percentiles)) and approximates the
+        order statistic at rank floor(p / 100 * (n - 1)) of each day.
+        """
+        first = 0 if include_zeros else 1
+        day_counts = self.counts[:, first:].sum(axis=1)
+        selected = np.flatnonzero(day_counts >= max(min_samples, 1))
+        if days is not None:
+            selected = np.intersect1d(selected, np.asarray(days, dtype=np.int64))
+
+        counts = day_counts[selected]
+        cumulative = np.cumsum(self.counts[selected, first:], axis=1)
+        fractions = np.asarray(percentiles, dtype=np.float64) / 100.0
+
+        values = np.empty((len(selected), len(fractions)))
+        for j, fraction in enumerate(fractions):
+            ranks = np.floor(fraction * (counts - 1))
+            columns = np.argmax(cumulative > ranks[:, None], axis=1) + first
+            values[:, j] = self._representative(columns)
+        return selected, counts, values
+
+    # Serialization
+
+    def save(self, path):
+        """Write the sketch (only non-empty buckets), its metadata and extras as a compressed .npz"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        rows, columns = np.nonzero(self.counts)
+        tmp_path = path + '.tmp.npz'
+        np.savez_compressed(
+            tmp_path,
+            rows=rows.astype(np.int32),
+            columns=columns.astype(np.int32),
+            counts=self.counts[rows, columns],
+            params=np.array([self.max_day, self.relative_accuracy, self.max_value]),
+            metadata=np.array(json.dumps(self.metadata)),
+            **{f'extra_{name}': array for name, array in self.extras.items()}
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as state:
+            max_day, relative_accuracy, max_value = state['params']
+            sketch = cls(int(max_day), float(relative_accuracy), float(max_value),
+                         json.loads(str(state['metadata'])))
+            sketch.counts[state['rows'], state['columns']] = state['counts']
+            sketch.extras = {name[len('extra_'):]: state[name] for name in state.files if name.startswith('extra_')}
+        return sketch
+
+    # Internals
+
+    def _bucket(self, values):
+        columns = np.zeros(len(values), dtype=np.int64)
+        positive = values > 0
+        index = np.ceil(np.log(np.minimum(values[positive], self.max_value)) / self.log_gamma)
+        # Views are whole numbers, so anything in (0, 1] shares bucket 0
+        columns[positive] = np.maximum(index, 0).astype(np.int64) + 1
+        return columns
+
+    def _representative(self, columns):
+        # Midpoint (in relative terms) of bucket (gamma^(i-1), gamma^i]
+        values = 2 * self.gamma ** (columns - 1.0) / (self.gamma + 1)
+        return np.where(columns == 0, 0.0, values)
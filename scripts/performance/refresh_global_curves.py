@@ -1,187 +1,293 @@
 #!/usr/bin/env python3
 """
 Refresh global performance curves with all new data
-One-time full update, then we'll move to weekly/incremental
+
+The full refresh sketches every non-Short snapshot for days 0-3650 and
+rewrites every curve row. Its per-day sketches, raw and smoothed curves and a
+created_at watermark are saved to data/envelope_sketch.npz. Later runs are
+incremental by default: only snapshots created after the watermark are
+fetched and folded into the sketches, percentiles are re-read for the days
+they touched, smoothing is recomputed only around those days, and only rows
+that moved by more than --tolerance are written back.
+
+Usage:
+    python scripts/performance/refresh_global_curves.py               # incremental (full on first run)
+    python scripts/performance/refresh_global_curves.py --full
+    python scripts/performance/refresh_global_curves.py --tolerance 0.01
 """
 
 import os
+import sys
+import argparse
 import numpy as np
 from supabase import create_client, Client
 from dotenv import load_dotenv
 from datetime import datetime
+from typing import Optional
 from scipy.ndimage import gaussian_filter1d
 
-# Load environment variables
-load_dotenv()
-
-# Initialize Supabase client
-url = os.getenv("NEXT_PUBLIC_SUPABASE_URL")
-key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-supabase: Client = create_client(url, key)
-
-print("🔄 Refreshing Global Performance Curves")
-print("=" * 60)
-
-# Check current state
-current_stats = supabase.table('performance_envelopes')\
-    .select('updated_at')\
-    .order('updated_at', desc=True)\
-    .limit(1)\
-    .execute()
-
-print(f"Last update: {current_stats.data[0]['updated_at'] if current_stats.data else 'Never'}")
-
-# Get total snapshot count
-count_result = supabase.table('view_snapshots')\
-    .select('*', count='exact', head=True)\
-    .execute()
-
-total_snapshots = count_result.count
-print(f"Total snapshots to process: {total_snapshots:,}")
-
-# Process in daily batches
-print("\n📊 Calculating new percentiles...")
-daily_stats = {}
-processed = 0
-
-for day in range(0, 3651):  # 10 years
-    # Get all view counts for this day (excluding Shorts)
-    batch_data = []
-    offset = 0
-    batch_size = 1000
-    
-    while True:
-        batch = supabase.table('view_snapshots')\
-            .select('view_count, videos!inner(duration)')\
-            .eq('days_since_published', day)\
-            .range(offset, offset + batch_size - 1)\
+from quantile_sketch import DailyQuantileSketch
+from weighted_percentiles import PERCENTILES
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from supabase_reader import latest_value, read_pages
+
+SKETCH_PATH = 'data/envelope_sketch.npz'
+MAX_DAY = 3650
+MIN_SAMPLES = 10  # Minimum samples for percentiles
+WORKERS = 8  # Concurrent key ranges
+DEFAULT_TOLERANCE = 0.005  # Relative change before a row is rewritten
+METRICS = [f'p{p}' for p in PERCENTILES]
+
+# Graduated smoothing over the days that have data, by position: (start, end, sigma, min days needed)
+SMOOTHING_SEGMENTS = [
+    (0, 8, 0.5, 8),      # Light smoothing for early days
+    (8, 31, 1.0, 31),
+    (31, 91, 2.0, 91),
+    (91, 365, 3.0, 365),
+    (365, None, 5.0, 365),
+]
+
+_supabase: Optional[Client] = None
+
+def supabase_client():
+    """Supabase client, created on first use so the curve math imports without credentials"""
+    global _supabase
+    if _supabase is None:
+        load_dotenv()
+        _supabase = create_client(os.getenv("NEXT_PUBLIC_SUPABASE_URL"), os.getenv("SUPABASE_SERVICE_ROLE_KEY"))
+    return _supabase
+
+def is_long_video(dur):
+    """Quick check for >121 seconds"""
+    if 'H' in dur or ('M' in dur and 'PT' in dur):
+        return True
+    if 'PT' in dur and 'S' in dur and not 'M' in dur:
+        try:
+            return int(dur.split('S')[0].split('PT')[-1]) > 121
+        except:
+            pass
+    return False
+
+def parse_timestamp(value):
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+def non_short_rows(rows):
+    """Rows whose video is not a Short and that have a view count"""
+    return [row for row in rows
+            if row.get('videos') and row['videos'].get('duration')
+            and is_long_video(row['videos']['duration']) and row['view_count'] is not None]
+
+# Fetching
+
+def sketch_snapshots(sketch, watermark=None):
+    """
+    Sketch non-Short snapshots created after watermark (all of them when
+    None) up to the newest created_at, read concurrently by keyset; returns
+    that newest created_at as the next watermark.
+    """
+    supabase = supabase_client()
+    newest = latest_value(supabase, 'view_snapshots', 'created_at')
+    if newest is None or (watermark is not None and parse_timestamp(newest) <= watermark):
+        return watermark
+
+    def snapshot_filter(query):
+        query = query.gte('days_since_published', 0)\
+            .lte('days_since_published', MAX_DAY)\
+            .lte('created_at', newest)
+        return query if watermark is None else query.gt('created_at', watermark.isoformat())
+
+    fetched = 0
+    pages = read_pages(supabase, 'view_snapshots', 'days_since_published, view_count, videos!inner(duration)',
+                       filters=snapshot_filter, workers=WORKERS)
+    for page in pages:
+        rows = non_short_rows(page)
+        sketch.add([row['days_since_published'] for row in rows], [row['view_count'] for row in rows])
+
+        fetched += len(page)
+        if fetched % 100000 < len(page):
+            print(f"   Fetched {fetched:,} snapshots ({len(sketch):,} non-Short sketched)...")
+
+    print(f"   Fetched {fetched:,} snapshots ({len(sketch):,} non-Short sketched)")
+    return parse_timestamp(newest)
+
+# Curves
+
+def smoothing_windows(n_days):
+    """Segments (start, end, sigma) that apply to a curve with n_days of data"""
+    return [(start, n_days if end is None else end, sigma)
+            for start, end, sigma, needed in SMOOTHING_SEGMENTS if n_days > needed]
+
+def smooth_curves(raw, smoothed=None, changed=None):
+    """
+    Graduated smoothing of the raw (n_days, metrics) table. With changed
+    positions, only outputs within the filter radius of a change are
+    recomputed, from just enough input to give the same result as a full pass.
+    """
+    if smoothed is None or changed is None:
+        smoothed = raw.copy()
+        changed = np.arange(len(raw))
+    else:
+        # Positions outside every segment are left unsmoothed
+        smoothed = smoothed.copy()
+        smoothed[changed] = raw[changed]
+
+    for start, end, sigma in smoothing_windows(len(raw)):
+        in_segment = changed[(changed >= start) & (changed < end)]
+        if not len(in_segment):
+            continue
+
+        radius = int(4.0 * sigma + 0.5)  # gaussian_filter1d's default truncate
+        lo, hi = max(start, in_segment.min() - radius), min(end, in_segment.max() + radius + 1)
+        window_lo, window_hi = max(start, lo - radius), min(end, hi + radius)
+
+        window = gaussian_filter1d(raw[window_lo:window_hi], sigma=sigma, axis=0)
+        smoothed[lo:hi] = window[lo - window_lo:hi - window_lo]
+
+    return smoothed
+
+def read_raw_curves(sketch, days=None):
+    """Per-day percentiles (whole views) and sample counts for days with enough data"""
+    stat_days, counts, values = sketch.quantiles(min_samples=MIN_SAMPLES, days=days)
+    return stat_days, counts, np.floor(values)
+
+# State
+
+def full_refresh():
+    print("\n📊 Calculating new percentiles (full refresh)...")
+    sketch = DailyQuantileSketch(max_day=MAX_DAY)
+    watermark = sketch_snapshots(sketch) or datetime.now().astimezone()
+
+    days, counts, raw = read_raw_curves(sketch)
+    smoothed = smooth_curves(raw)
+    rows = np.arange(len(days))
+
+    sketch.extras = {'days': days, 'counts': counts, 'raw': raw, 'smoothed': smoothed, 'written': smoothed.copy()}
+    return sketch, watermark, rows
+
+def incremental_refresh(sketch, tolerance):
+    watermark = parse_timestamp(sketch.metadata['watermark'])
+    print(f"\n📊 Folding in snapshots created after {watermark.isoformat()}...")
+
+    delta = DailyQuantileSketch(max_day=sketch.max_day, relative_accuracy=sketch.relative_accuracy,
+                                max_value=sketch.max_value)
+    latest = sketch_snapshots(delta, watermark)
+    changed_days = np.flatnonzero(delta.day_counts)
+    print(f"   {len(delta):,} new non-Short snapshots across {len(changed_days)} days")
+
+    if not len(changed_days):
+        return sketch, latest, np.empty(0, dtype=np.int64)
+
+    sketch.merge(delta)
+    state = sketch.extras
+    new_days, new_counts, new_raw = read_raw_curves(sketch, days=changed_days)
+
+    if np.isin(new_days, state['days']).all():
+        # Same days have data, so positions (and smoothing segments) are unchanged
+        positions = np.searchsorted(state['days'], new_days)
+        raw = state['raw'].copy()
+        raw[positions] = new_raw
+        counts = state['counts'].copy()
+        counts[positions] = new_counts
+        smoothed = smooth_curves(raw, state['smoothed'], positions)
+        days, written = state['days'], state['written'].copy()
+    else:
+        # A day crossed the sample threshold, shifting every later position: smooth everything again
+        print("   New days reached the sample threshold; re-smoothing the full curve")
+        days, counts, raw = read_raw_curves(sketch)
+        smoothed = smooth_curves(raw)
+        written = np.full_like(smoothed, np.nan)
+        known = np.isin(days, state['days'])
+        written[known] = state['written'][np.searchsorted(state['days'], days[known])]
+
+    # Only rows that moved past the tolerance since they were last written
+    with np.errstate(divide='ignore', invalid='ignore'):
+        moved = np.abs(smoothed - written) / np.maximum(np.abs(written), 1)
+    rows = np.flatnonzero(~(moved <= tolerance).all(axis=1))
+    written[rows] = smoothed[rows]
+
+    sketch.extras = {'days': days, 'counts': counts, 'raw': raw, 'smoothed': smoothed, 'written': written}
+    return sketch, latest, rows
+
+def write_rows(sketch, rows):
+    """Upsert the given curve positions into performance_envelopes"""
+    state = sketch.extras
+    current_time = datetime.now().isoformat()
+    updates = []
+
+    for i in rows:
+        update = {'day_since_published': int(state['days'][i])}
+        for j, metric in enumerate(METRICS):
+            update[f'{metric}_views'] = int(state['smoothed'][i, j])
+        update['sample_count'] = int(state['counts'][i])
+        update['updated_at'] = current_time
+        updates.append(update)
+
+    # Upsert in batches
+    batch_size = 100
+    for i in range(0, len(updates), batch_size):
+        batch = updates[i:i + batch_size]
+        supabase_client().table('performance_envelopes')\
+            .upsert(batch)\
             .execute()
-        
-        if not batch.data:
-            break
-            
-        # Filter for non-Shorts
-        for row in batch.data:
-            if row.get('videos') and row['videos'].get('duration'):
-                dur = row['videos']['duration']
-                # Quick check for >121 seconds
-                is_long = False
-                if 'H' in dur or ('M' in dur and 'PT' in dur):
-                    is_long = True
-                elif 'PT' in dur and 'S' in dur and not 'M' in dur:
-                    try:
-                        secs = int(dur.split('S')[0].split('PT')[-1])
-                        if secs > 121:
-                            is_long = True
-                    except:
-                        pass
-                
-                if is_long and row['view_count'] is not None:
-                    batch_data.append(row['view_count'])
-        
-        offset += batch_size
-        if len(batch.data) < batch_size:
-            break
-    
-    processed += len(batch_data)
-    
-    if len(batch_data) >= 10:  # Minimum samples for percentiles
-        views = np.array(batch_data)
-        daily_stats[day] = {
-            'p10': int(np.percentile(views, 10)),
-            'p25': int(np.percentile(views, 25)),
-            'p50': int(np.percentile(views, 50)),
-            'p75': int(np.percentile(views, 75)),
-            'p90': int(np.percentile(views, 90)),
-            'p95': int(np.percentile(views, 95)),
-            'count': len(batch_data)
-        }
-    
-    # Progress update
-    if day % 100 == 0:
-        print(f"   Day {day}: {processed:,} snapshots processed")
-
-print(f"\nTotal non-Short snapshots processed: {processed:,}")
-print(f"Days with sufficient data: {len(daily_stats)}")
-
-# Apply smoothing
-print("\n📈 Applying smoothing to curves...")
-days = sorted(daily_stats.keys())
-metrics = ['p10', 'p25', 'p50', 'p75', 'p90', 'p95']
-
-for metric in metrics:
-    values = [daily_stats[d][metric] for d in days]
-    
-    # Graduated smoothing
-    smooth_values = np.array(values, dtype=float)
-    
-    # Light smoothing for early days
-    if len(smooth_values) > 8:
-        smooth_values[:8] = gaussian_filter1d(smooth_values[:8], sigma=0.5)
-    if len(smooth_values) > 31:
-        smooth_values[8:31] = gaussian_filter1d(smooth_values[8:31], sigma=1.0)
-    if len(smooth_values) > 91:
-        smooth_values[31:91] = gaussian_filter1d(smooth_values[31:91], sigma=2.0)
-    if len(smooth_values) > 365:
-        smooth_values[91:365] = gaussian_filter1d(smooth_values[91:365], sigma=3.0)
-    if len(smooth_values) > 365:
-        smooth_values[365:] = gaussian_filter1d(smooth_values[365:], sigma=5.0)
-    
-    # Update values
-    for i, day in enumerate(days):
-        daily_stats[day][metric] = int(smooth_values[i])
-
-# Update database
-print("\n💾 Updating performance_envelopes table...")
-updates = []
-current_time = datetime.now().isoformat()
-
-for day in range(0, 3651):
-    if day in daily_stats:
-        updates.append({
-            'day_since_published': day,
-            'p10_views': daily_stats[day]['p10'],
-            'p25_views': daily_stats[day]['p25'],
-            'p50_views': daily_stats[day]['p50'],
-            'p75_views': daily_stats[day]['p75'],
-            'p90_views': daily_stats[day]['p90'],
-            'p95_views': daily_stats[day]['p95'],
-            'sample_count': daily_stats[day]['count'],
-            'updated_at': current_time
-        })
-
-# Upsert in batches
-batch_size = 100
-for i in range(0, len(updates), batch_size):
-    batch = updates[i:i + batch_size]
-    supabase.table('performance_envelopes')\
-        .upsert(batch)\
+        print(f"   Updated days {i} to {min(i + batch_size, len(updates))}")
+
+    return len(updates)
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh global performance curves")
+    parser.add_argument('--full', action='store_true', help="Recompute every day from scratch")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Relative change in any percentile before a row is rewritten")
+    parser.add_argument('--state', default=SKETCH_PATH, help="Saved sketch state")
+    args = parser.parse_args()
+
+    print("🔄 Refreshing Global Performance Curves")
+    print("=" * 60)
+
+    # Check current state
+    current_stats = supabase_client().table('performance_envelopes')\
+        .select('updated_at')\
+        .order('updated_at', desc=True)\
+        .limit(1)\
         .execute()
-    print(f"   Updated days {i} to {min(i + batch_size, len(updates))}")
-
-# Summary
-print("\n✅ Update Complete!")
-print(f"   Days updated: {len(updates)}")
-print(f"   Total samples: {processed:,}")
-print(f"   New median growth curve:")
-print(f"     Day 1:    {daily_stats.get(1, {}).get('p50', 'N/A'):,} views")
-print(f"     Day 7:    {daily_stats.get(7, {}).get('p50', 'N/A'):,} views")
-print(f"     Day 30:   {daily_stats.get(30, {}).get('p50', 'N/A'):,} views")
-print(f"     Day 365:  {daily_stats.get(365, {}).get('p50', 'N/A'):,} views")
-print(f"     Day 1825: {daily_stats.get(1825, {}).get('p50', 'N/A'):,} views")
-
-# Compare to old values
-old_curves = supabase.table('performance_envelopes')\
-    .select('day_since_published, p50_views')\
-    .in_('day_since_published', [1, 7, 30, 365, 1825])\
-    .execute()
-
-if old_curves.data:
-    print("\n   Changes from previous curves:")
-    for old in old_curves.data:
-        day = old['day_since_published']
-        if day in daily_stats:
-            old_val = old['p50_views']
-            new_val = daily_stats[day]['p50']
-            change = ((new_val - old_val) / old_val) * 100 if old_val > 0 else 0
-            print(f"     Day {day}: {change:+.1f}% change")
\ No newline at end of file
+
+    print(f"Last update: {current_stats.data[0]['updated_at'] if current_stats.data else 'Never'}")
+
+    sketch = None
+    if not args.full and os.path.exists(args.state):
+        sketch = DailyQuantileSketch.load(args.state)
+        if 'watermark' not in sketch.metadata or 'written' not in sketch.extras:
+            print(f"⚠️ {args.state} has no refresh state; running a full refresh")
+            sketch = None
+
+    if sketch is None:
+        sketch, watermark, rows = full_refresh()
+    else:
+        sketch, watermark, rows = incremental_refresh(sketch, args.tolerance)
+
+    state = sketch.extras
+    print(f"\nTotal non-Short snapshots sketched: {len(sketch):,}")
+    print(f"Days with sufficient data: {len(state['days'])}")
+
+    # Update database
+    print(f"\n💾 Updating performance_envelopes table ({len(rows)} rows changed)...")
+    written = write_rows(sketch, rows)
+
+    # Saved last, so an interrupted run re-fetches from the previous watermark
+    sketch.metadata['watermark'] = watermark.isoformat()
+    sketch.metadata['updated_at'] = datetime.now().isoformat()
+    sketch.save(args.state)
+    print(f"   Saved sketch state to {args.state}")
+
+    # Summary
+    p50 = {int(day): int(value) for day, value in zip(state['days'], state['smoothed'][:, METRICS.index('p50')])}
+    print("\n✅ Update Complete!")
+    print(f"   Days updated: {written}")
+    print(f"   Watermark: {watermark.isoformat()}")
+    print(f"   New median growth curve:")
+    for day in [1, 7, 30, 365, 1825]:
+        print(f"     Day {day}: {p50[day]:,} views" if day in p50 else f"     Day {day}: N/A")
+
+if __name__ == "__main__":
+    main()
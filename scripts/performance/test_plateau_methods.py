@@ -5,6 +5,7 @@ Tests multiple approaches with varied channel samples from our database.
 """
 
 import os
+import sys
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
@@ -16,6 +17,9 @@ from typing import Dict, List, Tuple, Any
 import warnings
 warnings.filterwarnings('ignore')
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import snapshot_cache
+
 # Load environment variables
 load_dotenv()
 
@@ -31,6 +35,7 @@ class PlateauTester:
     def __init__(self):
         self.global_curve = self._load_global_curve()
         self.global_plateau = self.global_curve[365]
+        self.videos = self._load_videos()
         self.test_channels = self._select_test_channels()
         self.results = {}
         
@@ -47,18 +52,28 @@ class PlateauTester:
         print(f"   Global plateau (day 365): {curve[365]:,} views")
         return curve
     
+    def _load_videos(self) -> pd.DataFrame:
+        """Latest cached snapshot of every video with 100+ views"""
+        print("📥 Loading videos from the snapshot cache...")
+        snapshot_cache.sync(supabase=supabase)
+        snapshots = snapshot_cache.load_snapshots(
+            columns=['video_id', 'channel_name', 'published_at', 'days_since_published', 'view_count'],
+            categorical=False
+        )
+        
+        latest = snapshots.sort_values('days_since_published').drop_duplicates('video_id', keep='last')
+        videos = latest.rename(columns={'video_id': 'id'})[['id', 'channel_name', 'view_count', 'published_at']]
+        videos = videos[videos['view_count'].notna() & (videos['view_count'] >= 100)].reset_index(drop=True)
+        
+        print(f"   {len(videos):,} videos with 100+ views")
+        return videos
+    
     def _select_test_channels(self) -> List[str]:
         """Select diverse channels for testing"""
         print("🎯 Selecting test channels...")
         
         # Get channel distribution
-        result = supabase.table('videos')\
-            .select('channel_name, view_count')\
-            .not_.is_('view_count', 'null')\
-            .gte('view_count', 100)\
-            .execute()
-        
-        df = pd.DataFrame(result.data)
+        df = self.videos[['channel_name', 'view_count']]
         channel_stats = df.groupby('channel_name').agg({
             'view_count': ['count', 'median', 'std', 'min', 'max']
         }).round(0)
@@ -88,14 +103,7 @@ class PlateauTester:
     
     def get_channel_videos(self, channel_name: str) -> pd.DataFrame:
         """Get video data for a channel"""
-        result = supabase.table('videos')\
-            .select('id, title, view_count, published_at')\
-            .eq('channel_name', channel_name)\
-            .not_.is_('view_count', 'null')\
-            .gte('view_count', 100)\
-            .execute()
-        
-        df = pd.DataFrame(result.data)
+        df = self.videos[self.videos['channel_name'] == channel_name].copy()
         if len(df) == 0:
             return df
             
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Weighted Percentile Engine
+
+Computes per-day weighted percentiles of view counts for every day and every
+percentile in one vectorized pass, for the global envelope and curve scripts.
+
+Snapshots are sorted once by (day, views). Each snapshot is placed at the
+midpoint of its weight on the cumulative-weight axis, C_i - w_i / 2, and
+within a day those midpoints are rescaled so the smallest view count sits at
+0 and the largest at 1. Targets for all (day, percentile) pairs are located
+on the global midpoint array with a single searchsorted and linearly
+interpolated. With equal weights this reproduces np.percentile (linear)
+exactly, so unweighted callers get the same curves as before.
+
+Usage:
+    from weighted_percentiles import PERCENTILES, weighted_percentiles
+
+    days, counts, totals, values = weighted_percentiles(df['day'], df['views'], df['weight'])
+    p50 = values[:, PERCENTILES.index(50)]
+"""
+
+import numpy as np
+
+PERCENTILES = (10, 25, 50, 75, 90, 95)
+
+
+def weighted_percentiles(days, values, weights=None, percentiles=PERCENTILES, min_samples=1):
+    """
+    Weighted percentiles of values grouped by day.
+
+    Returns (days, counts, total_weights, quantiles) where quantiles has
+    shape (n_days, len(percentiles)). Days with fewer than min_samples
+    snapshots are dropped.
+    """
+    days = np.asarray(days)
+    values = np.asarray(values, dtype=np.float64)
+    weights = np.ones(len(values)) if weights is None else np.asarray(weights, dtype=np.float64)
+    if not (len(days) == len(values) == len(weights)):
+        raise ValueError("days, values and weights must have the same length")
+    if np.any(weights < 0):
+        raise ValueError("weights must be non-negative")
+
+    fractions = np.asarray(percentiles, dtype=np.float64) / 100.0
+    if len(values) == 0:
+        empty = np.empty(0)
+        return days[:0], empty.astype(np.int64), empty, np.empty((0, len(fractions)))
+
+    order = np.lexsort((values, days))
+    days, values, weights = days[order], values[order], weights[order]
+
+    starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+    ends = np.r_[starts[1:], len(days)]
+    counts = ends - starts
+
+    # Midpoints are non-decreasing across the whole sorted array, so one searchsorted serves every day
+    cumulative = np.cumsum(weights)
+    midpoints = cumulative - weights / 2
+    totals = cumulative[ends - 1] - (cumulative[starts] - weights[starts])
+    low = midpoints[starts]
+    span = midpoints[ends - 1] - low
+
+    keep = counts >= min_samples
+    starts, ends, counts, totals, low, span = (a[keep] for a in (starts, ends, counts, totals, low, span))
+
+    # Last snapshot at or below each target, kept within its own day
+    targets = low[:, None] + fractions[None, :] * span[:, None]
+    lower = np.searchsorted(midpoints, targets, side='right') - 1
+    lower = np.clip(lower, starts[:, None], ends[:, None] - 1)
+    upper = np.minimum(lower + 1, ends[:, None] - 1)
+
+    step = midpoints[upper] - midpoints[lower]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fraction = np.where(step > 0, (targets - midpoints[lower]) / step, 0.0)
+    fraction = np.clip(fraction, 0.0, 1.0)
+
+    quantiles = values[lower] + fraction * (values[upper] - values[lower])
+    return days[starts], counts, totals, quantiles
@@ -5,13 +5,17 @@ Include snapshots beyond 365 days but normalize to 0-365 range
 """
 
 import os
+import sys
 import matplotlib.pyplot as plt
 import numpy as np
 from supabase import create_client, Client
 from dotenv import load_dotenv
 from scipy.ndimage import gaussian_filter1d
 from datetime import datetime
-from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'performance'))
+from quantile_sketch import DailyQuantileSketch
+from weighted_percentiles import PERCENTILES
 
 # Load environment variables
 load_dotenv()
@@ -27,7 +31,8 @@ print("=" * 60)
 # Get ALL snapshots regardless of days_since_published
 print("\n📊 Fetching ALL view snapshots...")
 
-all_snapshots = []
+# Per-day sketches instead of a list of every snapshot; memory stays flat as the table grows
+all_snapshots = DailyQuantileSketch(max_day=365)
 offset = 0
 batch_size = 1000
 total_processed = 0
@@ -43,6 +48,8 @@ while True:
         break
     
     # Process each snapshot
+    page_days = []
+    page_views = []
     for row in result.data:
         if row.get('videos') and row['videos'].get('duration') and row['view_count']:
             dur = row['videos']['duration']
@@ -71,12 +78,10 @@ while True:
             
             if is_long_video:
                 # Normalize days to 0-365 range
-                days = min(row['days_since_published'], 365)
-                all_snapshots.append({
-                    'day': days,
-                    'views': row['view_count']
-                })
+                page_days.append(min(row['days_since_published'], 365))
+                page_views.append(row['view_count'])
     
+    all_snapshots.add(page_days, page_views)
     total_processed += len(result.data)
     offset += batch_size
     
@@ -90,31 +95,20 @@ print(f"\n✅ Total non-Short snapshots: {len(all_snapshots):,}")
 
 # Calculate percentiles
 print("\n📈 Calculating percentiles from FULL dataset...")
-views_by_day = defaultdict(list)
-
-for snap in all_snapshots:
-    views_by_day[snap['day']].append(snap['views'])
+day_counts = all_snapshots.day_counts
 
 # Show data volume
 print(f"   Total data points by day:")
 for day in [0, 1, 7, 30, 90, 180, 365]:
-    if day in views_by_day:
-        print(f"   Day {day}: {len(views_by_day[day]):,} snapshots")
-
-percentile_data = []
-for day in range(366):
-    if day in views_by_day and len(views_by_day[day]) >= 10:
-        views = views_by_day[day]
-        percentile_data.append({
-            'day': day,
-            'count': len(views),
-            'p10': np.percentile(views, 10),
-            'p25': np.percentile(views, 25),
-            'p50': np.percentile(views, 50),
-            'p75': np.percentile(views, 75),
-            'p90': np.percentile(views, 90),
-            'p95': np.percentile(views, 95)
-        })
+    if day_counts[day]:
+        print(f"   Day {day}: {day_counts[day]:,} snapshots")
+
+# Percentiles within the sketch's relative accuracy
+sketch_days, sketch_counts, sketch_values = all_snapshots.quantiles(min_samples=10)
+percentile_data = [
+    {'day': day, 'count': int(count), **{f'p{p}': value for p, value in zip(PERCENTILES, row)}}
+    for day, count, row in zip(sketch_days.tolist(), sketch_counts, sketch_values.tolist())
+]
 
 print(f"\n   Days with sufficient data: {len(percentile_data)}")
 
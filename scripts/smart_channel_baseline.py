@@ -7,12 +7,12 @@ Uses ML model to predict better baselines when early tracking data is sparse
 import os
 import matplotlib.pyplot as plt
 import numpy as np
-import json
-import pickle
 import pandas as pd
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
+from ml_model_registry import get_registry
+
 # Load environment variables
 load_dotenv()
 
@@ -24,31 +24,7 @@ supabase: Client = create_client(url, key)
 def load_ml_baseline_model():
     """Load the ML baseline prediction model"""
     try:
-        model_dir = "models"
-        if not os.path.exists(model_dir):
-            return None, None
-        
-        # Find latest baseline model files
-        model_files = [f for f in os.listdir(model_dir) if f.endswith('.pkl') and 'baseline_predictor' in f]
-        metadata_files = [f for f in os.listdir(model_dir) if f.endswith('_metadata.json') and 'baseline_predictor' in f]
-        
-        if not model_files or not metadata_files:
-            return None, None
-        
-        latest_model_file = sorted(model_files)[-1]
-        latest_metadata_file = sorted(metadata_files)[-1]
-        
-        # Load model
-        model_path = os.path.join(model_dir, latest_model_file)
-        with open(model_path, 'rb') as f:
-            model = pickle.load(f)
-        
-        # Load metadata
-        metadata_path = os.path.join(model_dir, latest_metadata_file)
-        with open(metadata_path, 'r') as f:
-            metadata = json.load(f)
-        
-        return model, metadata
+        return get_registry("models").load_latest('xgboost_baseline_predictor')
     except Exception as e:
         print(f"⚠️  Could not load ML model: {e}")
         return None, None
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+View Snapshot Cache
+Local columnar copy of the view_snapshots table, joined with the video
+attributes the analysis scripts filter and group on, so they can load the
+whole table from disk instead of paging through Supabase on every run.
+
+Rows are kept in a TrainingDataStore (one .npy per column, string columns
+dictionary-encoded), so a load memory-maps the columns and takes well under a
+second. Sync is incremental: it notes the newest created_at in the table as
+its cutoff, reads every snapshot created after the last sync's cutoff up to
+this one with the keyset reader, looks up their videos' attributes, and
+appends every CHUNK_ROWS rows as a chunk labelled with the cutoff. The
+cutoff becomes the watermark in sync.json only once the read completes;
+chunks from a sync that never finished are dropped before the next one
+starts over. Many small chunks are compacted into one.
+
+Video attributes are captured when a snapshot is first cached; run
+`rebuild` to pick up durations, channels or titles that changed later.
+Snapshots cached before an attribute column was added read it as missing
+until the next rebuild.
+
+Layout:
+    data/snapshot_cache/
+        schema.json
+        sync.json
+        dict_<column>.json
+        chunk_0001/<column>.npy
+        ...
+
+Usage:
+    from snapshot_cache import load_snapshots
+
+    df = load_snapshots(columns=['days_since_published', 'view_count', 'duration_seconds'])
+
+    python scripts/snapshot_cache.py sync       # fetch snapshots created since the last sync
+    python scripts/snapshot_cache.py rebuild    # drop the cache and fetch everything again
+    python scripts/snapshot_cache.py compact    # merge all chunks into one
+    python scripts/snapshot_cache.py info
+"""
+
+import json
+import os
+import shutil
+import sys
+
+import numpy as np
+import pandas as pd
+
+from ml_dataset_store import TrainingDataStore
+from supabase_reader import WORKERS, execute_with_retry, latest_value, read_pages
+
+DEFAULT_CACHE_PATH = 'data/snapshot_cache'
+SYNC_FILE = 'sync.json'
+CHUNK_ROWS = 200000
+MAX_CHUNKS = 16  # Compact once more chunks than this have been appended
+SHORT_MAX_SECONDS = 121
+
+SNAPSHOT_SCHEMA = {
+    'video_id': 'string',
+    'snapshot_date': 'string',
+    'days_since_published': 'float32',
+    'view_count': 'float64',
+    'created_at': 'int64',  # Microseconds since epoch (UTC); the sync watermark
+    'duration_seconds': 'float32',  # NaN when the video has no duration
+    'is_short': 'bool',
+    'channel_id': 'string',
+    'channel_name': 'string',
+    'published_at': 'string',
+    'title': 'string',
+}
+
+SNAPSHOT_COLUMNS = 'video_id, snapshot_date, days_since_published, view_count, created_at'
+VIDEO_COLUMNS = 'id, duration, is_short, channel_id, channel_name, published_at, title'
+
+
+def open_cache(path=DEFAULT_CACHE_PATH):
+    store = TrainingDataStore(path, schema=SNAPSHOT_SCHEMA)
+    # Older caches gain new columns; their chunks read them as missing
+    for name, kind in SNAPSHOT_SCHEMA.items():
+        store.manifest['columns'].setdefault(name, kind)
+    return store
+
+
+def cache_watermark(store):
+    """created_at cutoff (microseconds) of the last completed sync, or None for an empty cache"""
+    sync_path = os.path.join(store.path, SYNC_FILE)
+    if os.path.exists(sync_path):
+        with open(sync_path, 'r') as f:
+            return json.load(f)['watermark']
+    if len(store) == 0:
+        return None
+    # Caches written before sync.json existed
+    return int(store.read_column('created_at').max())
+
+
+def save_watermark(store, watermark):
+    os.makedirs(store.path, exist_ok=True)
+    sync_path = os.path.join(store.path, SYNC_FILE)
+    tmp_path = sync_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'watermark': int(watermark), 'synced_at': pd.Timestamp.now(tz='UTC').isoformat()}, f)
+    os.replace(tmp_path, sync_path)
+
+
+def discard_unfinished(store, watermark):
+    """Remove chunks appended by a sync whose cutoff was never committed"""
+    unfinished = [chunk['id'] for chunk in store.chunks
+                  if (chunk.get('source') or '').startswith('sync:')
+                  and (watermark is None or int(chunk['source'][len('sync:'):]) > watermark)]
+    if unfinished:
+        print(f"   Dropping {len(unfinished)} chunks from an unfinished sync")
+        store.remove_chunks(unfinished)
+
+
+def to_microseconds(timestamps):
+    return pd.to_datetime(pd.Series(timestamps), utc=True, format='ISO8601').dt.as_unit('us').astype('int64')
+
+
+def to_isoformat(microseconds):
+    return pd.Timestamp(microseconds, unit='us', tz='UTC').isoformat()
+
+
+def duration_seconds(durations):
+    """ISO 8601 durations (PT1H2M3S) as seconds; NaN when missing or unparseable"""
+    fields = pd.Series(durations, dtype=object).str.extract(r'^PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?$').astype(float)
+    seconds = fields[0].fillna(0) * 3600 + fields[1].fillna(0) * 60 + fields[2].fillna(0)
+    return seconds.where(fields.notna().any(axis=1)).to_numpy()
+
+
+# Fetching
+
+def _supabase_client():
+    from supabase import create_client
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return create_client(os.getenv("NEXT_PUBLIC_SUPABASE_URL"), os.getenv("SUPABASE_SERVICE_ROLE_KEY"))
+
+
+def fetch_video_attributes(supabase, video_ids, known):
+    """Fill known (video_id -> attribute dict) for ids not seen yet this sync"""
+    missing = [video_id for video_id in video_ids if video_id not in known]
+    for i in range(0, len(missing), 100):
+        chunk = missing[i:i + 100]
+        videos = execute_with_retry(lambda: supabase.table('videos').select(VIDEO_COLUMNS).in_('id', chunk))
+        for video in videos.data:
+            known[video['id']] = video
+        for video_id in chunk:
+            known.setdefault(video_id, {})
+
+
+def snapshot_frame(rows, attributes):
+    """Page of snapshot rows joined with video attributes, typed for the cache"""
+    df = pd.DataFrame(rows)
+    df['created_at'] = to_microseconds(df['created_at']).to_numpy()
+
+    videos = [attributes.get(video_id, {}) for video_id in df['video_id']]
+    df['duration_seconds'] = duration_seconds([video.get('duration') for video in videos])
+    flagged = pd.Series([video.get('is_short') for video in videos], dtype=object)
+    # Fall back to the duration rule where the is_short flag isn't set
+    df['is_short'] = np.where(flagged.notna(), flagged.fillna(False).astype(bool),
+                              df['duration_seconds'] <= SHORT_MAX_SECONDS)
+    for name in ('channel_id', 'channel_name', 'published_at', 'title'):
+        df[name] = [video.get(name) for video in videos]
+    return df
+
+
+def sync(path=DEFAULT_CACHE_PATH, supabase=None, chunk_rows=CHUNK_ROWS, workers=WORKERS):
+    """Append snapshots created since the last sync; returns rows added"""
+    store = open_cache(path)
+    supabase = supabase or _supabase_client()
+    watermark = cache_watermark(store)
+    discard_unfinished(store, watermark)
+
+    newest = latest_value(supabase, 'view_snapshots', 'created_at')
+    if newest is None:
+        return 0
+    cutoff = int(to_microseconds([newest])[0])
+    if watermark is not None and cutoff <= watermark:
+        print(f"✅ {path} is up to date (through {to_isoformat(watermark)})")
+        return 0
+
+    start = to_isoformat(watermark) if watermark is not None else 'the beginning'
+    print(f"🔄 Syncing {path} from {start} through {to_isoformat(cutoff)}...")
+
+    def new_snapshots(query):
+        query = query.lte('created_at', to_isoformat(cutoff))
+        return query if watermark is None else query.gt('created_at', to_isoformat(watermark))
+
+    attributes = {}
+    pending = []
+    added = 0
+
+    def flush():
+        nonlocal pending, added
+        added += store.append(pd.concat(pending, ignore_index=True), source=f"sync:{cutoff}")
+        pending = []
+        print(f"   ✅ Cached {added:,} new snapshots")
+
+    for page in read_pages(supabase, 'view_snapshots', SNAPSHOT_COLUMNS, filters=new_snapshots, workers=workers):
+        fetch_video_attributes(supabase, list({row['video_id'] for row in page}), attributes)
+        pending.append(snapshot_frame(page, attributes))
+        if sum(len(df) for df in pending) >= chunk_rows:
+            flush()
+
+    if pending:
+        flush()
+    save_watermark(store, cutoff)
+    if len(store.chunks) > MAX_CHUNKS:
+        store.compact()
+    return added
+
+
+def rebuild(path=DEFAULT_CACHE_PATH, supabase=None):
+    shutil.rmtree(path, ignore_errors=True)
+    return sync(path, supabase)
+
+
+# Loading
+
+def load_snapshots(columns=None, path=DEFAULT_CACHE_PATH, categorical=True):
+    """
+    Cached snapshots as a DataFrame of memory-mapped columns.
+
+    String columns come back as Categoricals (pass categorical=False for
+    plain objects). Run sync() or `snapshot_cache.py sync` to refresh.
+    """
+    store = open_cache(path)
+    if len(store) == 0:
+        raise FileNotFoundError(f"Snapshot cache {path} is empty; run: python scripts/snapshot_cache.py sync")
+    return store.read(columns, categorical=categorical)
+
+
+def long_form(df, min_seconds=SHORT_MAX_SECONDS):
+    """Boolean mask of snapshots whose video is known to be longer than min_seconds"""
+    return (df['duration_seconds'] > min_seconds).to_numpy()
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else 'info'
+
+    if command == 'sync':
+        added = sync()
+        print(f"📦 Added {added:,} snapshots")
+    elif command == 'rebuild':
+        added = rebuild()
+        print(f"📦 Rebuilt cache with {added:,} snapshots")
+    elif command == 'compact':
+        open_cache().compact()
+
+    store = open_cache()
+    watermark = cache_watermark(store)
+    print(f"📊 {store.path}: {len(store):,} snapshots in {len(store.chunks)} chunks")
+    if watermark is not None:
+        print(f"   Synced through {to_isoformat(watermark)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Keyset Supabase Reader
+Reads a whole (filtered) table page by page in key order, for scripts that
+used to page with .range(offset, offset + batch_size - 1).
+
+Each page asks for rows after the last key seen (ORDER BY key LIMIT n), so
+every page is an index seek however deep into the table it is, where an
+OFFSET page re-scans every row before it. Composite keys such as
+(video_id, snapshot_date) use the row comparison written as a PostgREST or
+filter. For concurrency the key space is split into contiguous partitions
+on the first key column, found with one exact count and a single-row probe
+per boundary, and the partitions are read on a bounded thread pool into a
+bounded queue. A page that fails with a transient error (a dropped
+connection, a PostgREST 5xx or a statement timeout) is retried with backoff
+from the same last key, so the read resumes without gaps or duplicates.
+
+Usage:
+    from supabase_reader import read_pages, read_rows, read_batches
+
+    for row in read_rows(supabase, 'videos', 'id, duration', key=('id',)):
+        ...
+
+    days_filter = lambda query: query.gte('days_since_published', 0).lte('days_since_published', 365)
+    for batch in read_batches(supabase, 'view_snapshots', 'days_since_published, view_count',
+                              filters=days_filter, workers=8):
+        sketch.add(batch['days_since_published'], batch['view_count'])
+"""
+
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pandas as pd
+from postgrest.exceptions import APIError
+
+SNAPSHOT_KEY = ('video_id', 'snapshot_date')  # Unique and indexed on view_snapshots
+PAGE_SIZE = 1000
+WORKERS = 4
+MAX_RETRIES = 5
+TRANSIENT_ERRORS = (httpx.TransportError,)  # Timeouts, dropped connections, protocol errors
+# APIError codes worth retrying: statement timeout, deadlock/serialization failures and
+# PostgREST's could-not-connect/pool-timeout errors; SQLSTATE classes 08 (connection)
+# and 53 (insufficient resources), and bare HTTP 5xx statuses from non-JSON responses
+TRANSIENT_API_CODES = {'57014', '40001', '40P01', 'PGRST000', 'PGRST001', 'PGRST002', 'PGRST003'}
+TRANSIENT_SQLSTATE_CLASSES = ('08', '53')
+
+_DONE = object()
+
+
+def is_transient(error):
+    """Whether a failed request is worth retrying"""
+    if isinstance(error, TRANSIENT_ERRORS):
+        return True
+    if isinstance(error, APIError):
+        code = str(error.code or '')
+        return (code in TRANSIENT_API_CODES
+                or (len(code) == 5 and code[:2] in TRANSIENT_SQLSTATE_CLASSES)
+                or (len(code) == 3 and code.startswith('5') and code.isdigit()))
+    return False
+
+
+def execute_with_retry(build_query, max_retries=MAX_RETRIES):
+    """Execute a freshly built query, retrying transient errors with exponential backoff"""
+    for attempt in range(max_retries + 1):
+        try:
+            return build_query().execute()
+        except Exception as e:
+            if attempt == max_retries or not is_transient(e):
+                raise
+            print(f"   ⚠️ Transient error (attempt {attempt + 1}/{max_retries}): {e}")
+            time.sleep(min(2 ** attempt, 30))
+
+
+def latest_value(supabase, table, column, filters=None, max_retries=MAX_RETRIES):
+    """Largest value of column (e.g. the newest created_at), or None for no rows"""
+    result = execute_with_retry(
+        lambda: _filtered(supabase.table(table).select(column), filters)
+        .order(column, desc=True).limit(1),
+        max_retries
+    )
+    return result.data[0][column] if result.data else None
+
+
+def key_partitions(supabase, table, key=SNAPSHOT_KEY, filters=None, workers=WORKERS, max_retries=MAX_RETRIES):
+    """
+    Up to `workers` contiguous [lower, upper) ranges of the first key column
+    holding roughly equal numbers of rows; None means unbounded.
+    """
+    first = key[0]
+    if workers <= 1:
+        return [(None, None)]
+
+    counted = execute_with_retry(
+        lambda: _filtered(supabase.table(table).select(first, count='exact'), filters).limit(1),
+        max_retries
+    )
+    total = counted.count or 0
+
+    boundaries = []
+    for i in range(1, workers):
+        offset = i * total // workers
+        # One row per boundary; these are the only OFFSET reads
+        probe = execute_with_retry(
+            lambda: _filtered(supabase.table(table).select(first), filters)
+            .order(first).range(offset, offset),
+            max_retries
+        )
+        if probe.data and probe.data[0][first] not in boundaries[-1:]:
+            boundaries.append(probe.data[0][first])
+
+    edges = [None] + boundaries + [None]
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def read_pages(supabase, table, columns, key=SNAPSHOT_KEY, filters=None, page_size=PAGE_SIZE,
+               workers=WORKERS, max_retries=MAX_RETRIES):
+    """
+    Yield pages (lists of row dicts) covering every row that passes filters.
+
+    filters is a function applied to each query builder, e.g.
+    lambda query: query.gt('created_at', watermark). Key columns are added
+    to the selection if missing. Pages come in key order within a
+    partition; with several workers, partitions interleave.
+    """
+    key = tuple(key)
+    columns = _with_key(columns, key)
+    partitions = key_partitions(supabase, table, key, filters, workers, max_retries)
+
+    def partition_pages(lower, upper):
+        return _partition_pages(supabase, table, columns, key, lower, upper, filters, page_size, max_retries)
+
+    if len(partitions) == 1:
+        yield from partition_pages(*partitions[0])
+        return
+
+    pages = queue.Queue(maxsize=2 * len(partitions))
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce(lower, upper):
+        try:
+            for page in partition_pages(lower, upper):
+                if not put(page):
+                    return
+            put(_DONE)
+        except Exception as e:
+            put(e)
+
+    with ThreadPoolExecutor(max_workers=len(partitions)) as pool:
+        for lower, upper in partitions:
+            pool.submit(produce, lower, upper)
+        try:
+            running = len(partitions)
+            while running:
+                item = pages.get()
+                if item is _DONE:
+                    running -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally:
+            # Also reached when the caller stops early; workers give up on their next put
+            stop.set()
+
+
+def read_rows(supabase, table, columns, **options):
+    """Yield row dicts one at a time; options as for read_pages"""
+    for page in read_pages(supabase, table, columns, **options):
+        yield from page
+
+
+def read_batches(supabase, table, columns, batch_rows=50000, **options):
+    """Yield {column: NumPy array} record batches of about batch_rows rows"""
+    buffered = []
+    for page in read_pages(supabase, table, columns, **options):
+        buffered.extend(page)
+        if len(buffered) >= batch_rows:
+            yield _record_batch(buffered)
+            buffered = []
+    if buffered:
+        yield _record_batch(buffered)
+
+
+# Internals
+
+def _filtered(query, filters):
+    return filters(query) if filters else query
+
+
+def _with_key(columns, key):
+    # Top-level names only; embedded selects like videos!inner(duration, title) keep their commas
+    selected = {column.strip() for column in re.split(r',(?![^(]*\))', columns)}
+    missing = [column for column in key if column not in selected]
+    return ', '.join([columns] + missing) if missing and '*' not in selected else columns
+
+
+def _literal(value):
+    text = str(value)
+    # Reserved characters in a PostgREST logic tree need the value quoted
+    if any(char in text for char in ',()"') or text != text.strip():
+        return '"' + text.replace('\\', '\\\\').replace('"', '\\"') + '"'
+    return text
+
+
+def _after(query, key, last):
+    """Rows whose key tuple sorts after last"""
+    if len(key) == 1:
+        return query.gt(key[0], last[0])
+    clauses = []
+    for i in range(len(key)):
+        terms = [f"{column}.eq.{_literal(value)}" for column, value in zip(key[:i], last[:i])]
+        terms.append(f"{key[i]}.gt.{_literal(last[i])}")
+        clauses.append(terms[0] if len(terms) == 1 else f"and({','.join(terms)})")
+    return query.or_(','.join(clauses))
+
+
+def _partition_pages(supabase, table, columns, key, lower, upper, filters, page_size, max_retries):
+    last = None
+
+    def build_query():
+        query = _filtered(supabase.table(table).select(columns), filters)
+        if lower is not None:
+            query = query.gte(key[0], lower)
+        if upper is not None:
+            query = query.lt(key[0], upper)
+        if last is not None:
+            query = _after(query, key, last)
+        for column in key:
+            query = query.order(column)
+        return query.limit(page_size)
+
+    while True:
+        rows = execute_with_retry(build_query, max_retries).data
+        # Only an empty page ends the partition: PostgREST caps each response at its
+        # max-rows setting, so a short page doesn't mean the rows ran out
+        if not rows:
+            return
+        yield rows
+        last = tuple(rows[-1][column] for column in key)
+
+
+def _record_batch(rows):
+    frame = pd.DataFrame(rows)
+    return {column: frame[column].to_numpy() for column in frame.columns}
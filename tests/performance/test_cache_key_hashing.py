@@ -0,0 +1,60 @@
+"""
+Micro-benchmark for tool cache-key hashing
+"""
+
+import pytest
+import hashlib
+import json
+import random
+import timeit
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from lib.tools.base_wrapper import create_cache_key
+
+
+def legacy_cache_key(tool_name, params):
+    """The previous JSON + MD5 implementation, kept for comparison"""
+    param_string = json.dumps(params, sort_keys=True)
+    return hashlib.md5(f"{tool_name}:{param_string}".encode()).hexdigest()
+
+
+random.seed(42)
+
+PAYLOADS = {
+    'small_search': {'query': 'woodworking jigs', 'top_k': 20, 'min_score': 0.5},
+    'video_id_list': {'video_ids': [f'vid_{i:08d}xyz' for i in range(200)], 'limit': 50},
+    'embedding_search': {
+        'embedding': [random.random() for _ in range(512)],
+        'top_k': 50,
+        'filter': {'is_short': False, 'channel_ids': ['UC123', 'UC456']}
+    }
+}
+
+
+def _per_call_us(fn, params, number):
+    return timeit.timeit(lambda: fn('search_titles', params), number=number) / number * 1e6
+
+
+@pytest.mark.benchmark
+class TestCacheKeyBenchmark:
+    """Compare canonical hashing against the legacy implementation"""
+    
+    @pytest.mark.parametrize('name', list(PAYLOADS))
+    def test_report(self, name):
+        params = PAYLOADS[name]
+        legacy = min(_per_call_us(legacy_cache_key, params, 2000) for _ in range(3))
+        current = min(_per_call_us(create_cache_key, params, 2000) for _ in range(3))
+        
+        print(f"\n{name}: legacy {legacy:.1f}µs, current {current:.1f}µs ({legacy / current:.1f}x)")
+    
+    def test_embedding_payloads_much_faster(self):
+        """Large float vectors are packed in one call instead of formatted as text"""
+        params = PAYLOADS['embedding_search']
+        legacy = min(_per_call_us(legacy_cache_key, params, 500) for _ in range(3))
+        current = min(_per_call_us(create_cache_key, params, 500) for _ in range(3))
+        
+        assert current * 3 < legacy
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-day quantile sketch
+"""
+
+import pytest
+import numpy as np
+import sys
+import os
+
+# Add scripts/performance to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                                'scripts', 'performance'))
+
+from quantile_sketch import DailyQuantileSketch
+from weighted_percentiles import PERCENTILES
+
+
+@pytest.fixture
+def snapshots():
+    rng = np.random.default_rng(3)
+    n = 50000
+    return rng.integers(0, 400, n), rng.lognormal(8, 2.5, n).round()
+
+
+class TestDailyQuantileSketch:
+    """Test sketch accuracy, merging and persistence"""
+
+    def test_within_relative_accuracy(self, snapshots):
+        """Every percentile is within the configured relative error"""
+        days, views = snapshots
+        sketch = DailyQuantileSketch(relative_accuracy=0.02)
+        sketch.add(days, views)
+
+        out_days, counts, values = sketch.quantiles(min_samples=10)
+        for i in (0, 100, len(out_days) - 1):
+            day_views = views[days == out_days[i]]
+            exact = np.percentile(day_views, PERCENTILES, method='lower')
+            assert counts[i] == len(day_views)
+            np.testing.assert_allclose(values[i], exact, rtol=0.02)
+
+    def test_merge_matches_single_pass(self, snapshots):
+        """Sketching pages separately and merging equals one sketch"""
+        days, views = snapshots
+        whole = DailyQuantileSketch()
+        whole.add(days, views)
+
+        merged = DailyQuantileSketch()
+        for start in range(0, len(days), 7000):
+            page = DailyQuantileSketch()
+            page.add(days[start:start + 7000], views[start:start + 7000])
+            merged.merge(page)
+
+        assert np.array_equal(whole.counts, merged.counts)
+
+    def test_save_and_load(self, snapshots, tmp_path):
+        """State round-trips through .npz with its metadata and extras"""
+        days, views = snapshots
+        sketch = DailyQuantileSketch(metadata={'watermark': '2025-08-01T00:00:00'})
+        sketch.add(days, views)
+        sketch.extras['curve'] = np.arange(5.0)
+
+        path = str(tmp_path / 'sketch.npz')
+        sketch.save(path)
+        loaded = DailyQuantileSketch.load(path)
+
+        assert np.array_equal(loaded.counts, sketch.counts)
+        assert loaded.metadata == {'watermark': '2025-08-01T00:00:00'}
+        assert np.array_equal(loaded.extras['curve'], np.arange(5.0))
+
+    def test_zeros_and_out_of_range(self):
+        """Zero views get their own bucket; days past max_day are skipped"""
+        sketch = DailyQuantileSketch(max_day=10)
+        assert sketch.add([0, 0, 0, 11, -1], [0, 0, 100, 5, 5]) == 3
+
+        _, counts, values = sketch.quantiles(percentiles=(50,))
+        assert counts.tolist() == [3]
+        assert values[0, 0] == 0
+
+        _, counts, values = sketch.quantiles(percentiles=(50,), include_zeros=False)
+        assert counts.tolist() == [1]
+        assert values[0, 0] == pytest.approx(100, rel=0.01)
+
+    def test_rejects_mismatched_merge(self):
+        """Sketches with different layouts cannot be merged"""
+        with pytest.raises(ValueError):
+            DailyQuantileSketch(relative_accuracy=0.01).merge(DailyQuantileSketch(relative_accuracy=0.02))
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental curve smoothing and row selection in refresh_global_curves
+"""
+
+import pytest
+import numpy as np
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+
+# Add scripts/performance to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                                'scripts', 'performance'))
+
+import refresh_global_curves as curves
+from quantile_sketch import DailyQuantileSketch
+
+# Curve lengths on both sides of every segment boundary and "min days needed" threshold
+CURVE_LENGTHS = [5, 8, 9, 30, 31, 32, 90, 91, 92, 364, 365, 366, 400]
+
+WATERMARK = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def changed_positions(n_days, rng):
+    """Single positions at and around every boundary, both ends, and a random spread"""
+    edges = [0, 1, n_days - 2, n_days - 1]
+    for start, end, _, _ in curves.SMOOTHING_SEGMENTS:
+        edges += [start - 1, start, start + 1] + ([end - 1, end] if end is not None else [])
+    edges = sorted({p for p in edges if 0 <= p < n_days})
+    spread = np.sort(rng.choice(n_days, size=max(1, n_days // 10), replace=False))
+    return [np.array([p]) for p in edges] + [spread, np.arange(n_days)]
+
+
+class TestIncrementalSmoothing:
+    """Test that smoothing only around changes equals a full pass"""
+
+    @pytest.mark.parametrize('n_days', CURVE_LENGTHS)
+    def test_matches_full_pass(self, n_days):
+        """Changes at, around and between segment boundaries re-smooth to the full-pass result"""
+        rng = np.random.default_rng(n_days)
+        raw = rng.lognormal(8, 1, (n_days, len(curves.METRICS)))
+        full = curves.smooth_curves(raw)
+
+        for changed in changed_positions(n_days, rng):
+            raw2 = raw.copy()
+            raw2[changed] *= rng.uniform(0.5, 2.0, (len(changed), len(curves.METRICS)))
+
+            np.testing.assert_allclose(curves.smooth_curves(raw2, full, changed), curves.smooth_curves(raw2),
+                                       rtol=1e-12, err_msg=f"changed={changed.tolist()}")
+
+    def test_unchanged_input_is_untouched(self):
+        """No changed positions leaves the previous smoothing as it was"""
+        raw = np.random.default_rng(1).lognormal(8, 1, (120, len(curves.METRICS)))
+        full = curves.smooth_curves(raw)
+
+        assert np.array_equal(curves.smooth_curves(raw, full, np.empty(0, dtype=np.int64)), full)
+
+
+class TestIncrementalRefresh:
+    """Test row selection against a sketch, with fetching replaced by fixed snapshots"""
+
+    @pytest.fixture
+    def fetch(self, monkeypatch):
+        """Queue (days, views) batches for sketch_snapshots to return in order"""
+        batches = []
+
+        def fake_sketch_snapshots(sketch, watermark=None):
+            days, views = batches.pop(0)
+            sketch.add(days, views)
+            return (watermark or WATERMARK) + timedelta(hours=1)
+
+        monkeypatch.setattr(curves, 'sketch_snapshots', fake_sketch_snapshots)
+        return batches
+
+    def snapshots(self, days, per_day, seed):
+        rng = np.random.default_rng(seed)
+        days = np.repeat(np.asarray(days), per_day)
+        return days, rng.lognormal(8, 1.5, len(days)).round() + 1
+
+    def sketch_of(self, snapshots):
+        sketch = DailyQuantileSketch(max_day=curves.MAX_DAY)
+        sketch.add(*snapshots)
+        return sketch
+
+    def refreshed(self, fetch, base, delta, tolerance):
+        fetch.extend([base, delta])
+        sketch, watermark, rows = curves.full_refresh()
+        sketch.metadata['watermark'] = watermark.isoformat()
+        return curves.incremental_refresh(sketch, tolerance)
+
+    def assert_matches_full_refresh(self, sketch):
+        days, counts, raw = curves.read_raw_curves(sketch)
+        state = sketch.extras
+        assert np.array_equal(state['days'], days)
+        assert np.array_equal(state['counts'], counts)
+        np.testing.assert_allclose(state['smoothed'], curves.smooth_curves(raw), rtol=1e-12)
+
+    def test_only_rows_past_tolerance_are_written(self, fetch):
+        """Rows are selected exactly when a percentile moved past the tolerance"""
+        base = self.snapshots(range(0, 120), 50, seed=1)
+        delta = self.snapshots([40], 50, seed=2)
+        previous = curves.smooth_curves(curves.read_raw_curves(self.sketch_of(base))[2])
+
+        for tolerance in (0.0, 0.01, 1e9):
+            sketch, latest, rows = self.refreshed(fetch, base, delta, tolerance)
+            state = sketch.extras
+
+            self.assert_matches_full_refresh(sketch)
+            assert latest > WATERMARK
+
+            moved = np.abs(state['smoothed'] - previous) / np.maximum(np.abs(previous), 1)
+            assert rows.tolist() == np.flatnonzero((moved > tolerance).any(axis=1)).tolist()
+            # Rewritten rows hold the new values; the rest keep what was written before
+            np.testing.assert_array_equal(state['written'][rows], state['smoothed'][rows])
+            untouched = np.setdiff1d(np.arange(len(previous)), rows)
+            np.testing.assert_array_equal(state['written'][untouched], previous[untouched])
+
+        assert 0 < len(self.refreshed(fetch, base, delta, 0.01)[2]) < len(previous)
+
+    def test_day_crossing_sample_threshold_resmooths_everything(self, fetch):
+        """A day reaching MIN_SAMPLES takes the full re-smooth branch"""
+        base_days, base_views = self.snapshots(range(0, 100), 50, seed=3)
+        sparse_days, sparse_views = self.snapshots([150], curves.MIN_SAMPLES - 1, seed=4)
+        base = (np.concatenate([base_days, sparse_days]), np.concatenate([base_views, sparse_views]))
+        delta = self.snapshots([150], 1, seed=5)
+
+        sketch, _, rows = self.refreshed(fetch, base, delta, tolerance=1e9)
+        state = sketch.extras
+
+        self.assert_matches_full_refresh(sketch)
+        assert state['days'][-1] == 150
+        # The new day was never written, so it is always selected whatever the tolerance
+        assert rows.tolist() == [len(state['days']) - 1]
+
+    def test_no_new_snapshots(self, fetch):
+        """An empty delta writes nothing and keeps the saved curves"""
+        base = self.snapshots(range(0, 50), 20, seed=6)
+        sketch, _, rows = self.refreshed(fetch, base, (np.empty(0), np.empty(0)), tolerance=0.0)
+
+        assert len(rows) == 0
+        self.assert_matches_full_refresh(sketch)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for the vectorized weighted percentile engine
+"""
+
+import pytest
+import numpy as np
+import sys
+import os
+
+# Add scripts/performance to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                                'scripts', 'performance'))
+
+from weighted_percentiles import PERCENTILES, weighted_percentiles
+
+
+def reference_percentile(values, weights, percentile):
+    """Per-day loop using the same plotting positions as the engine"""
+    order = np.argsort(values, kind='stable')
+    values, weights = values[order], weights[order]
+    midpoints = np.cumsum(weights) - weights / 2
+    positions = (midpoints - midpoints[0]) / (midpoints[-1] - midpoints[0])
+    return np.interp(percentile / 100, positions, values)
+
+
+class TestWeightedPercentiles:
+    """Test weighted percentile calculation"""
+
+    @pytest.fixture
+    def snapshots(self):
+        rng = np.random.default_rng(7)
+        n = 20000
+        return (
+            rng.integers(0, 120, n),
+            rng.lognormal(8, 2, n).round(),
+            rng.random(n)
+        )
+
+    def test_unit_weights_match_numpy(self, snapshots):
+        """Equal weights reproduce np.percentile for every day"""
+        days, views, _ = snapshots
+        out_days, counts, _, values = weighted_percentiles(days, views)
+
+        for i, day in enumerate(out_days):
+            day_views = views[days == day]
+            assert counts[i] == len(day_views)
+            np.testing.assert_allclose(values[i], np.percentile(day_views, PERCENTILES))
+
+    def test_weighted_matches_per_day_loop(self, snapshots):
+        """Weighted quantiles agree with a per-day reference"""
+        days, views, weights = snapshots
+        out_days, _, totals, values = weighted_percentiles(days, views, weights)
+
+        for i in (0, 50, len(out_days) - 1):
+            mask = days == out_days[i]
+            expected = [reference_percentile(views[mask], weights[mask], p) for p in PERCENTILES]
+            np.testing.assert_allclose(values[i], expected)
+            assert totals[i] == pytest.approx(weights[mask].sum())
+
+    def test_heavy_weight_pulls_median(self):
+        """A heavily weighted snapshot dominates the middle percentiles"""
+        _, _, _, values = weighted_percentiles([0, 0, 0], [10, 20, 1000], [1, 1, 100], percentiles=(50,))
+        assert values[0, 0] > 20
+
+    def test_min_samples_drops_sparse_days(self):
+        """Days below min_samples are left out"""
+        out_days, counts, _, _ = weighted_percentiles([0, 0, 0, 1], [1, 2, 3, 4], min_samples=2)
+        assert out_days.tolist() == [0]
+        assert counts.tolist() == [3]
+
+    def test_rejects_negative_weights(self):
+        """Negative weights are invalid"""
+        with pytest.raises(ValueError):
+            weighted_percentiles([0, 0], [1, 2], [1, -1])
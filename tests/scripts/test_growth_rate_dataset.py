@@ -0,0 +1,143 @@
+"""
+Tests that the column-wise growth-rate builders match the per-video loops they replaced
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add scripts directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'scripts'))
+
+from growth_rate_dataset import (
+    _loop_full_growth_samples, _synthetic_snapshots, build_backfill_growth_samples, build_full_growth_samples,
+    order_snapshots
+)
+
+
+def loop_backfill_growth_samples(df):
+    """GrowthRateMLBackfiller.prepare_growth_rate_dataset before it went column-wise"""
+    samples = []
+    for video_id in df['video_id'].unique():
+        video_data = df[df['video_id'] == video_id].sort_values('days_since_published', kind='stable')
+        if len(video_data) < 2:
+            continue
+        video_info = video_data.iloc[0].to_dict()
+        for i in range(len(video_data) - 1):
+            current_row = video_data.iloc[i]
+            next_row = video_data.iloc[i + 1]
+            current_day = current_row['days_since_published']
+            next_day = next_row['days_since_published']
+            current_views = current_row['view_count']
+            next_views = next_row['view_count']
+            if next_day <= current_day or next_views <= current_views:
+                continue
+            daily_growth_rate = (next_views / current_views) ** (1.0 / (next_day - current_day)) - 1.0
+            if daily_growth_rate < -0.5 or daily_growth_rate > 2.0:
+                continue
+            samples.append({
+                'video_id': video_id,
+                'channel_name': video_info['channel_name'],
+                'current_day': current_day,
+                'current_views': current_views,
+                'days_since_start': current_day,
+                'log_current_views': np.log1p(current_views),
+                'subscriber_count': video_info['subscriber_count'],
+                'channel_video_count': video_info.get('channel_video_count', 500),
+                'title_length': video_info['title_length'],
+                'title_word_count': video_info['title_word_count'],
+                'format_type': video_info.get('format_type', 'unknown'),
+                'topic_domain': video_info.get('topic_domain', 'unknown'),
+                'day_of_week': video_info['day_of_week'],
+                'hour_of_day': video_info['hour_of_day'],
+                'daily_growth_rate': daily_growth_rate
+            })
+    return pd.DataFrame(samples)
+
+
+@pytest.fixture
+def snapshots():
+    """Small shuffled fixture with one video per edge case"""
+    rows = [
+        # Ordinary growth, given out of day order
+        ('steady', 10, 5000), ('steady', 1, 1000), ('steady', 3, 2000), ('steady', 30, 9000),
+        # Only one snapshot: no pairs
+        ('single', 5, 100),
+        # Two snapshots on the same day, then a later one
+        ('tied', 2, 300), ('tied', 2, 400), ('tied', 4, 500),
+        # Views drop, then recover
+        ('drop', 1, 1000), ('drop', 2, 800), ('drop', 3, 1200),
+        # Zero views at the start
+        ('zero', 0, 0), ('zero', 1, 50), ('zero', 2, 90),
+        # +50%/day, then +167%/day (only backfill keeps it), then past both limits
+        ('spike', 1, 100), ('spike', 2, 150), ('spike', 3, 400), ('spike', 4, 4000),
+    ]
+    df = pd.DataFrame(rows, columns=['video_id', 'days_since_published', 'view_count'])
+    df['days_since_published'] = df['days_since_published'].astype(float)
+    df['view_count'] = df['view_count'].astype(float)
+
+    attributes = {
+        'steady': ('Channel A', 12000.0, 42.0, 7.0),
+        'single': ('Channel A', 12000.0, 30.0, 5.0),
+        'tied': ('Channel B', np.nan, np.nan, np.nan),
+        'drop': ('Channel B', np.nan, 61.0, 11.0),
+        'zero': ('Channel C', 0.0, 18.0, 3.0),
+        'spike': ('Channel C', 0.0, 75.0, 14.0),
+    }
+    for i, name in enumerate(['channel_name', 'subscriber_count', 'title_length', 'title_word_count']):
+        df[name] = df['video_id'].map(lambda video_id: attributes[video_id][i])
+    # Subscribers grow between snapshots, so "the video's first snapshot" matters
+    df['subscriber_count'] += df['days_since_published'] * 10
+    df['day_of_week'] = 3.0
+    df['hour_of_day'] = 14.0
+    df['format_type'] = 'tutorial'
+    return df.sample(frac=1.0, random_state=7).reset_index(drop=True)
+
+
+class TestOrderSnapshots:
+    """Test lining each snapshot up with the next one of the same video"""
+
+    def test_next_snapshot_stays_within_video(self, snapshots):
+        """Test that next_day never reaches into another video's snapshots"""
+        ordered = order_snapshots(snapshots)
+
+        for video_id, video in ordered.groupby('video_id', sort=False):
+            assert video['days_since_published'].is_monotonic_increasing
+            assert video['next_day'].iloc[:-1].tolist() == video['days_since_published'].iloc[1:].tolist()
+            assert np.isnan(video['next_day'].iloc[-1])
+            assert (video['video_start'] == video.index[0]).all()
+
+
+class TestFullGrowthSamples:
+    """Test build_full_growth_samples against the per-video loop"""
+
+    def test_matches_loop_on_fixture(self, snapshots):
+        """Test that every edge case yields the same rows in the same order"""
+        vectorized = build_full_growth_samples(snapshots)
+
+        pd.testing.assert_frame_equal(vectorized, _loop_full_growth_samples(snapshots), check_dtype=False)
+        assert set(vectorized['video_id']) == {'steady', 'tied', 'drop', 'zero', 'spike'}
+        assert vectorized['daily_growth_rate'].max() <= 1.0
+
+    def test_matches_loop_on_synthetic_snapshots(self):
+        """Test the benchmark's shuffled synthetic snapshots, including missing subscriber counts"""
+        df = _synthetic_snapshots(300, seed=1)
+
+        pd.testing.assert_frame_equal(build_full_growth_samples(df), _loop_full_growth_samples(df), check_dtype=False)
+
+
+class TestBackfillGrowthSamples:
+    """Test build_backfill_growth_samples against the per-video loop"""
+
+    def test_matches_loop_on_fixture(self, snapshots):
+        """Test that attributes come from each video's first snapshot, with the loop's defaults"""
+        vectorized = build_backfill_growth_samples(snapshots)
+        looped = loop_backfill_growth_samples(snapshots)
+
+        pd.testing.assert_frame_equal(vectorized, looped, check_dtype=False)
+        assert (vectorized['channel_video_count'] == 500).all()
+        assert (vectorized['topic_domain'] == 'unknown').all()
+        assert (vectorized['daily_growth_rate'] > 1.0).any()
@@ -0,0 +1,123 @@
+"""
+Tests for the columnar training data store
+"""
+
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add scripts directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'scripts'))
+
+from ml_dataset_store import TrainingDataStore, import_json_batches, load_training_frame
+
+
+def training_records(video_ids, day):
+    return [{'video_id': video_id, 'title': f"How to build a {video_id}", 'channel_name': 'Workshop',
+             'subscriber_count': 12000, 'days_since_published': day, 'view_count': 1000 * (i + 1),
+             'snapshot_date': '2025-01-01'}
+            for i, video_id in enumerate(video_ids)]
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    return str(tmp_path / 'ml_training_store')
+
+
+class TestTrainingDataStore:
+    """Test writing, reading, appending and compacting chunks"""
+
+    def test_write_and_read(self, store_path):
+        """Test that typed columns and strings (including nulls) round-trip"""
+        store = TrainingDataStore(store_path)
+        records = training_records(['bench', 'stool'], day=3)
+        records[1]['title'] = None
+        store.append(records, source='batch_1')
+
+        df = TrainingDataStore(store_path).read(categorical=False)
+
+        assert len(df) == 2
+        assert df['days_since_published'].dtype == np.float32
+        assert df['view_count'].tolist() == [1000.0, 2000.0]
+        assert df['title'].iloc[0] == 'How to build a bench'
+        assert pd.isna(df['title'].iloc[1])
+        # Columns in the schema but not the batch read as missing
+        assert df['topic_cluster_id'].isna().all()
+
+    def test_append_shares_dictionaries(self, store_path):
+        """Test that later chunks reuse string codes and a reopened store reads every chunk"""
+        store = TrainingDataStore(store_path)
+        store.append(training_records(['bench', 'stool'], day=3), source='batch_1')
+        store.append(training_records(['stool', 'table'], day=10), source='batch_2')
+
+        reopened = TrainingDataStore(store_path)
+        df = reopened.read(['video_id', 'days_since_published'])
+
+        assert len(reopened.chunks) == 2
+        assert df['video_id'].tolist() == ['bench', 'stool', 'stool', 'table']
+        assert list(df['video_id'].cat.categories) == ['bench', 'stool', 'table']
+        assert df['days_since_published'].tolist() == [3, 3, 10, 10]
+        assert [len(chunk_df) for _, chunk_df in reopened.iter_chunks(['video_id'])] == [2, 2]
+
+    def test_new_column_in_later_batch(self, store_path):
+        """Test that a column first seen in a later batch reads as missing for earlier chunks"""
+        store = TrainingDataStore(store_path)
+        store.append(training_records(['bench'], day=3), source='batch_1')
+        records = training_records(['stool'], day=3)
+        records[0]['thumbnail_style'] = 'closeup'
+        store.append(records, source='batch_2')
+
+        df = TrainingDataStore(store_path).read(['video_id', 'thumbnail_style'], categorical=False)
+
+        assert pd.isna(df['thumbnail_style'].iloc[0])
+        assert df['thumbnail_style'].iloc[1] == 'closeup'
+
+    def test_compact(self, store_path):
+        """Test that compacting keeps rows and sources and removes the old chunk directories"""
+        store = TrainingDataStore(store_path)
+        for batch in range(3):
+            store.append(training_records([f'video_{batch}_a', f'video_{batch}_b'], day=batch), source=f'batch_{batch}')
+        before = store.read(categorical=False)
+        old_chunks = [chunk['id'] for chunk in store.chunks]
+
+        store.compact()
+        reopened = TrainingDataStore(store_path)
+
+        assert len(reopened.chunks) == 1
+        assert reopened.sources() == {'batch_0', 'batch_1', 'batch_2'}
+        pd.testing.assert_frame_equal(reopened.read(categorical=False), before)
+        assert not any(os.path.exists(os.path.join(store_path, chunk_id)) for chunk_id in old_chunks)
+
+        reopened.append(training_records(['after_compact'], day=9), source='batch_3')
+        assert TrainingDataStore(store_path).read(['video_id'])['video_id'].tolist()[-1] == 'after_compact'
+
+    def test_read_unknown_column(self, store_path):
+        """Test that asking for a column outside the schema fails"""
+        store = TrainingDataStore(store_path)
+        store.append(training_records(['bench'], day=3))
+
+        with pytest.raises(KeyError):
+            store.read(['not_a_column'])
+
+
+class TestJsonImport:
+    """Test importing data/ml_training_batch_*.json files"""
+
+    def test_imports_each_batch_once(self, tmp_path, store_path):
+        """Test that batches are imported in numeric order and never twice"""
+        for number, video_ids in ((1, ['bench']), (2, ['stool']), (10, ['table'])):
+            with open(tmp_path / f'ml_training_batch_{number}.json', 'w') as f:
+                json.dump(training_records(video_ids, day=number), f)
+        pattern = str(tmp_path / 'ml_training_batch_*.json')
+
+        assert import_json_batches(pattern, TrainingDataStore(store_path)) == 3
+        assert import_json_batches(pattern, TrainingDataStore(store_path)) == 0
+
+        df = load_training_frame(['video_id', 'days_since_published'], path=store_path, pattern=pattern)
+        assert df['video_id'].tolist() == ['bench', 'stool', 'table']
+        assert not isinstance(df['video_id'].dtype, pd.CategoricalDtype)
+        assert df['days_since_published'].tolist() == [1, 2, 10]
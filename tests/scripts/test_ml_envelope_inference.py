@@ -0,0 +1,85 @@
+"""
+Tests for loading the envelope quantile models as one consistent version
+"""
+
+import json
+import os
+import pickle
+import sys
+
+import pytest
+
+# Add scripts directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'scripts'))
+
+from ml_envelope_inference import EnvelopePredictor, get_envelope_predictor, latest_envelope_version
+from ml_model_registry import get_registry
+
+
+class ConstantModel:
+    """Picklable stand-in for a booster"""
+
+    def __init__(self, value):
+        self.value = value
+
+    def predict(self, features):
+        return [self.value] * len(features)
+
+
+def save_quantile(model_dir, quantile, version, value):
+    model_id = f"xgboost_envelope_{quantile}_{version}"
+    with open(os.path.join(model_dir, f"{model_id}.pkl"), 'wb') as f:
+        pickle.dump(ConstantModel(value), f)
+    with open(os.path.join(model_dir, f"{model_id}_metadata.json"), 'w') as f:
+        json.dump({'model_id': model_id, 'features': ['days_since_published', 'subscriber_count']}, f)
+    # Directory mtimes can tie within a test; force the registry to rescan
+    get_registry(model_dir).refresh(force=True)
+
+
+@pytest.fixture
+def model_dir(tmp_path):
+    path = str(tmp_path / 'models')
+    os.makedirs(path)
+    for quantile, value in (('p10', 10), ('p50', 50), ('p90', 90)):
+        save_quantile(path, quantile, '20250101_000000', value)
+    return path
+
+
+class TestEnvelopeVersions:
+    """Test that p10/p50/p90 always come from one training run"""
+
+    def test_half_finished_run_is_ignored(self, model_dir):
+        """Test that a newer p50 without matching p10/p90 doesn't replace the complete set"""
+        save_quantile(model_dir, 'p50', '20250202_000000', 500)
+
+        predictor = EnvelopePredictor.load(model_dir)
+
+        assert latest_envelope_version(get_registry(model_dir)) == '20250101_000000'
+        assert set(predictor.model_ids.values()) == {
+            f"xgboost_envelope_{q}_20250101_000000" for q in ('p10', 'p50', 'p90')
+        }
+        assert predictor.predict_one({'subscriber_count': 1000}, days=[1]).tolist() == [[10, 50, 90]]
+
+    def test_reloads_once_every_quantile_is_newer(self, model_dir):
+        """Test that the cached predictor switches only when the whole new set exists"""
+        first = get_envelope_predictor(model_dir)
+
+        save_quantile(model_dir, 'p50', '20250202_000000', 500)
+        assert get_envelope_predictor(model_dir) is first
+
+        save_quantile(model_dir, 'p10', '20250202_000000', 100)
+        save_quantile(model_dir, 'p90', '20250202_000000', 900)
+        second = get_envelope_predictor(model_dir)
+
+        assert second is not first
+        assert second.version == '20250202_000000'
+        assert second.predict_one({}, days=[1]).tolist() == [[100, 500, 900]]
+
+    def test_no_complete_version(self, tmp_path):
+        """Test that a registry without all three quantiles fails loudly"""
+        path = str(tmp_path / 'models')
+        os.makedirs(path)
+        save_quantile(path, 'p50', '20250101_000000', 50)
+
+        with pytest.raises(FileNotFoundError):
+            EnvelopePredictor.load(path)
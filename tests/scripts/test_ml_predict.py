@@ -0,0 +1,61 @@
+"""
+Tests for batch feature preparation in ml_predict
+"""
+
+import sys
+import os
+
+# Add scripts directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'scripts'))
+
+from ml_predict import prepare_features, prepare_features_batch
+
+
+METADATA = {
+    'features': ['topic_cluster_id', 'day_of_week', 'hour_of_day', 'title_word_count', 'format_tutorial']
+}
+
+PUBLISH_TIMES = [
+    '2025-03-03T22:30:00-08:00',
+    '2025-03-04 09:15',
+    'March 5, 2025 6pm',
+    '2025-03-06T23:45:00+05:30',
+    '2025-03-07T12:00:00Z'
+]
+
+
+class TestPrepareFeaturesBatch:
+    """Test that batch features match single-request features"""
+
+    def _requests(self):
+        return [
+            {'title': f'Video number {i}', 'topic_cluster_id': i, 'planned_publish_time': publish_time}
+            for i, publish_time in enumerate(PUBLISH_TIMES)
+        ]
+
+    def test_mixed_formats_and_offsets_match_single_requests(self):
+        """Test that every row of a mixed batch equals that request scored alone"""
+        requests = self._requests()
+
+        batch = prepare_features_batch(requests, METADATA)
+
+        for i, request in enumerate(requests):
+            single = prepare_features(request, METADATA)
+            assert batch.iloc[i].tolist() == single.iloc[0].tolist()
+
+    def test_times_keep_their_own_offset(self):
+        """Test that offset times are read in local wall-clock time, not shifted to UTC"""
+        batch = prepare_features_batch(self._requests(), METADATA)
+
+        assert batch['day_of_week'].tolist() == [0, 1, 2, 3, 4]
+        assert batch['hour_of_day'].tolist() == [22, 9, 18, 23, 12]
+
+    def test_unparseable_time_does_not_affect_others(self):
+        """Test that a bad time falls back to now without dropping its neighbours"""
+        requests = self._requests()
+        requests[0]['planned_publish_time'] = 'not a date'
+
+        batch = prepare_features_batch(requests, METADATA)
+
+        assert batch['hour_of_day'].tolist()[1:] == [9, 18, 23, 12]
+        assert 0 <= batch['hour_of_day'].iloc[0] <= 23
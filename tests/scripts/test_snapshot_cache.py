@@ -0,0 +1,134 @@
+"""
+Tests for the local view snapshot cache, round-tripped through a temporary store
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add scripts directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'scripts'))
+
+from snapshot_cache import (
+    cache_watermark, discard_unfinished, duration_seconds, load_snapshots, open_cache, save_watermark, snapshot_frame
+)
+
+ATTRIBUTES = {
+    'long': {'duration': 'PT12M5S', 'is_short': False, 'channel_id': 'c1', 'title': 'Building a workbench'},
+    'short': {'duration': 'PT45S', 'is_short': True, 'channel_id': 'c1', 'title': 'Quick tip'},
+    'unflagged_short': {'duration': 'PT1M30S', 'is_short': None, 'channel_id': 'c2', 'title': 'Tip, again'},
+    'unflagged_long': {'duration': 'PT1H0M0S', 'is_short': None, 'channel_id': 'c2', 'title': None},
+    'flag_wins': {'duration': 'PT30S', 'is_short': False, 'channel_id': 'c2', 'title': 'Trailer'},
+}
+
+
+def snapshot_rows(video_ids, created_at='2025-01-01T00:00:00+00:00'):
+    return [{'video_id': video_id, 'snapshot_date': '2025-01-01', 'days_since_published': 3.0,
+             'view_count': 1000.0, 'created_at': created_at} for video_id in video_ids]
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / 'snapshot_cache')
+
+
+class TestDurations:
+    """Test ISO 8601 duration parsing"""
+
+    def test_duration_seconds(self):
+        """Test that each field is optional and unparseable durations are NaN"""
+        seconds = duration_seconds(['PT1H2M3S', 'PT45S', 'PT2M', 'PT1H', None, 'P1D', 'PT', 'garbage'])
+
+        np.testing.assert_array_equal(seconds[:4], [3723, 45, 120, 3600])
+        assert np.isnan(seconds[4:]).all()
+
+
+class TestSnapshotFrame:
+    """Test joining snapshot pages with video attributes"""
+
+    def test_is_short_fallback(self):
+        """Test that the duration rule fills in only where the is_short flag is missing"""
+        video_ids = list(ATTRIBUTES) + ['unknown']
+        df = snapshot_frame(snapshot_rows(video_ids), ATTRIBUTES).set_index('video_id')
+
+        assert df['is_short'].to_dict() == {
+            'long': False,
+            'short': True,
+            'unflagged_short': True,
+            'unflagged_long': False,
+            'flag_wins': False,
+            'unknown': False,
+        }
+        assert np.isnan(df.loc['unknown', 'duration_seconds'])
+
+    def test_round_trip(self, cache_path):
+        """Test that a cached page loads back with its durations, flags and titles"""
+        video_ids = list(ATTRIBUTES) + ['unknown']
+        store = open_cache(cache_path)
+        store.append(snapshot_frame(snapshot_rows(video_ids), ATTRIBUTES), source='sync:1')
+
+        df = load_snapshots(path=cache_path, categorical=False).set_index('video_id')
+
+        assert df['duration_seconds'].dtype == np.float32
+        assert df['duration_seconds'].loc[['long', 'short', 'unflagged_short', 'unflagged_long']].tolist() == \
+            [725, 45, 90, 3600]
+        assert np.isnan(df.loc['unknown', 'duration_seconds'])
+        assert df['is_short'].tolist() == [False, True, True, False, False, False]
+        assert df.loc['unflagged_short', 'title'] == 'Tip, again'
+        assert pd.isna(df.loc['unflagged_long', 'title'])
+        assert df['created_at'].iloc[0] == 1735689600000000
+
+
+class TestDiscardUnfinished:
+    """Test dropping chunks from a sync that never committed its watermark"""
+
+    def append_sync(self, store, video_ids, cutoff):
+        return store.append(snapshot_frame(snapshot_rows(video_ids), ATTRIBUTES), source=f"sync:{cutoff}")
+
+    def test_drops_chunks_past_watermark(self, cache_path):
+        """Test that only chunks newer than the committed watermark are removed from disk"""
+        store = open_cache(cache_path)
+        self.append_sync(store, ['long', 'short'], 100)
+        save_watermark(store, 100)
+        self.append_sync(store, ['unflagged_short'], 200)
+        self.append_sync(store, ['unflagged_long'], 200)
+        unfinished = [chunk['id'] for chunk in store.chunks[1:]]
+
+        store = open_cache(cache_path)
+        discard_unfinished(store, cache_watermark(store))
+
+        reopened = open_cache(cache_path)
+        assert len(reopened.chunks) == 1
+        assert load_snapshots(['video_id'], path=cache_path, categorical=False)['video_id'].tolist() == ['long', 'short']
+        assert not any(os.path.exists(os.path.join(cache_path, chunk_id)) for chunk_id in unfinished)
+
+    def test_no_watermark_drops_every_sync_chunk(self, cache_path):
+        """Test that a first sync that never finished leaves an empty cache"""
+        store = open_cache(cache_path)
+        self.append_sync(store, ['long'], 100)
+        self.append_sync(store, ['short'], 100)
+
+        discard_unfinished(store, None)
+
+        assert len(open_cache(cache_path)) == 0
+        with pytest.raises(FileNotFoundError):
+            load_snapshots(path=cache_path)
+
+    def test_compacted_chunks_are_kept(self, cache_path):
+        """Test that a compacted chunk (no sync source) survives and a later sync appends after it"""
+        store = open_cache(cache_path)
+        self.append_sync(store, ['long'], 100)
+        self.append_sync(store, ['short'], 100)
+        save_watermark(store, 100)
+        store.compact()
+        self.append_sync(store, ['flag_wins'], 200)
+
+        discard_unfinished(store, cache_watermark(store))
+        self.append_sync(store, ['unflagged_long'], 300)
+
+        df = load_snapshots(['video_id', 'is_short'], path=cache_path, categorical=False)
+        assert df['video_id'].tolist() == ['long', 'short', 'unflagged_long']
+        assert df['is_short'].tolist() == [False, True, False]
@@ -0,0 +1,299 @@
+"""
+Tests for the keyset Supabase reader, against an in-memory PostgREST stand-in
+"""
+
+import pytest
+import sys
+import os
+from types import SimpleNamespace
+
+import httpx
+from postgrest.exceptions import APIError
+
+# Add scripts directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'scripts'))
+
+import supabase_reader
+from supabase_reader import (
+    SNAPSHOT_KEY, _after, _literal, _partition_pages, _with_key, execute_with_retry, is_transient, read_rows
+)
+
+
+def split_top_level(expr):
+    """Split a PostgREST logic tree on commas outside parentheses and quotes"""
+    parts, depth, quoted, escaped, current = [], 0, False, False, ''
+    for char in expr:
+        if escaped:
+            escaped = False
+        elif char == '\\' and quoted:
+            escaped = True
+        elif char == '"':
+            quoted = not quoted
+        elif not quoted and char in '()':
+            depth += 1 if char == '(' else -1
+        elif not quoted and depth == 0 and char == ',':
+            parts.append(current)
+            current = ''
+            continue
+        current += char
+    return parts + [current]
+
+
+def unquote(value):
+    if not value.startswith('"'):
+        return value
+    text, out, escaped = value[1:-1], '', False
+    for char in text:
+        if escaped or char != '\\':
+            out += char
+            escaped = False
+        else:
+            escaped = True
+    return out
+
+
+def parse_condition(term):
+    """Predicate for one or() term: col.op.value or and(...)"""
+    if term.startswith('and(') and term.endswith(')'):
+        terms = [parse_condition(t) for t in split_top_level(term[4:-1])]
+        return lambda row: all(t(row) for t in terms)
+    column, op, value = term.split('.', 2)
+    value = unquote(value)
+    return {
+        'eq': lambda row: row[column] == value,
+        'gt': lambda row: row[column] > value,
+    }[op]
+
+
+class FakeQuery:
+    """Just enough of the postgrest query builder for supabase_reader"""
+
+    def __init__(self, db):
+        self.db = db
+        self.conditions = []
+        self.orders = []
+        self.counted = False
+        self.row_limit = None
+        self.row_range = None
+
+    def select(self, columns, count=None):
+        self.counted = count == 'exact'
+        return self
+
+    def gte(self, column, value):
+        self.conditions.append(lambda row: row[column] >= value)
+        return self
+
+    def lt(self, column, value):
+        self.conditions.append(lambda row: row[column] < value)
+        return self
+
+    def gt(self, column, value):
+        self.conditions.append(lambda row: row[column] > value)
+        return self
+
+    def or_(self, expr):
+        terms = [parse_condition(term) for term in split_top_level(expr)]
+        self.conditions.append(lambda row: any(t(row) for t in terms))
+        self.db.or_filters.append(expr)
+        return self
+
+    def order(self, column, desc=False):
+        self.orders.append(column)
+        return self
+
+    def limit(self, n):
+        self.row_limit = n
+        return self
+
+    def range(self, start, end):
+        self.row_range = (start, end)
+        return self
+
+    def execute(self):
+        self.db.requests += 1
+        if self.db.failures:
+            failure = self.db.failures.pop(0)
+            if failure is not None:
+                raise failure
+
+        rows = [row for row in self.db.rows if all(condition(row) for condition in self.conditions)]
+        if self.orders:
+            rows.sort(key=lambda row: tuple(row[column] for column in self.orders))
+        total = len(rows)
+        if self.row_range:
+            rows = rows[self.row_range[0]:self.row_range[1] + 1]
+        if self.row_limit is not None:
+            rows = rows[:self.row_limit]
+        # PostgREST's max-rows caps every response, whatever the limit asked for
+        rows = rows[:self.db.max_rows]
+        return SimpleNamespace(data=[dict(row) for row in rows], count=total if self.counted else None)
+
+
+class FakeSupabase:
+    def __init__(self, rows, max_rows=1000, failures=None):
+        self.rows = rows
+        self.max_rows = max_rows
+        self.failures = list(failures or [])
+        self.requests = 0
+        self.or_filters = []
+
+    def table(self, name):
+        return FakeQuery(self)
+
+
+@pytest.fixture
+def snapshots():
+    # Video ids with reserved characters exercise _literal inside the or() filters
+    video_ids = ['abc', 'a,b', 'a(b)', 'say "hi"', ' padded', 'zz\\z']
+    return [{'video_id': video_id, 'snapshot_date': f'2025-01-{day:02d}', 'view_count': day}
+            for video_id in video_ids for day in range(1, 8)]
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(supabase_reader.time, 'sleep', lambda seconds: None)
+
+
+def read_partition(supabase, page_size, key=SNAPSHOT_KEY, max_retries=3):
+    pages = _partition_pages(supabase, 'view_snapshots', 'video_id, snapshot_date, view_count', key,
+                             None, None, None, page_size, max_retries)
+    return list(pages)
+
+
+def keys(rows):
+    return [(row['video_id'], row['snapshot_date']) for row in rows]
+
+
+class TestFilters:
+    """Test the PostgREST filter pieces"""
+
+    def test_literal_quoting(self):
+        """Values with reserved characters or edge whitespace are quoted and escaped"""
+        assert _literal('abc') == 'abc'
+        assert _literal(42) == '42'
+        assert _literal('2025-01-01T00:00:00+00:00') == '2025-01-01T00:00:00+00:00'
+        assert _literal('a,b') == '"a,b"'
+        assert _literal('a(b)') == '"a(b)"'
+        assert _literal('say "hi"') == '"say \\"hi\\""'
+        assert _literal(' padded') == '" padded"'
+        assert _literal('back\\slash,') == '"back\\\\slash,"'
+
+    def test_after_composite_key(self):
+        """A composite key becomes the expanded row comparison as one or() filter"""
+        supabase = FakeSupabase([])
+        _after(supabase.table('view_snapshots'), ('video_id', 'snapshot_date'), ('a,b', '2025-01-03'))
+
+        assert supabase.or_filters == ['video_id.gt."a,b",and(video_id.eq."a,b",snapshot_date.gt.2025-01-03)']
+
+    def test_after_selects_following_rows(self, snapshots):
+        """The or() filter keeps exactly the rows whose key tuple sorts after the last key"""
+        supabase = FakeSupabase(snapshots)
+        ordered = sorted(snapshots, key=lambda row: (row['video_id'], row['snapshot_date']))
+
+        for i, last in enumerate(ordered):
+            query = _after(supabase.table('view_snapshots'), SNAPSHOT_KEY, (last['video_id'], last['snapshot_date']))
+            for column in SNAPSHOT_KEY:
+                query = query.order(column)
+            assert keys(query.execute().data) == keys(ordered[i + 1:])
+
+    def test_with_key_keeps_embedded_selects(self):
+        """Key columns are appended without splitting an embedded videos!inner(...) select"""
+        columns = 'days_since_published, view_count, videos!inner(duration, title)'
+
+        assert _with_key(columns, SNAPSHOT_KEY) == columns + ', video_id, snapshot_date'
+        assert _with_key('video_id, snapshot_date, videos!inner(video_id)', SNAPSHOT_KEY) == \
+            'video_id, snapshot_date, videos!inner(video_id)'
+        assert _with_key('*', SNAPSHOT_KEY) == '*'
+
+
+class TestPartitionPages:
+    """Test keyset paging over one partition"""
+
+    def test_reads_every_row_once_in_key_order(self, snapshots):
+        """Test that full pages walk the partition in key order without gaps or repeats"""
+        pages = read_partition(FakeSupabase(snapshots), page_size=4)
+
+        assert keys(row for page in pages for row in page) == \
+            sorted(keys(snapshots))
+        assert [len(page) for page in pages] == [4] * 10 + [2]
+
+    def test_page_size_above_server_cap(self, snapshots):
+        """Test that short pages from PostgREST's max-rows cap don't end the read early"""
+        supabase = FakeSupabase(snapshots, max_rows=5)
+        pages = read_partition(supabase, page_size=1000)
+
+        assert len(keys(row for page in pages for row in page)) == len(snapshots)
+        assert [len(page) for page in pages] == [5] * 8 + [2]
+
+    def test_resumes_after_transport_error(self, snapshots):
+        """Test that a dropped connection mid-read retries from the same last key"""
+        failures = [None, None, httpx.ConnectError('connection reset'), None, httpx.ReadTimeout('timed out')]
+        supabase = FakeSupabase(snapshots, failures=failures)
+        pages = read_partition(supabase, page_size=6)
+
+        assert keys(row for page in pages for row in page) == sorted(keys(snapshots))
+        assert supabase.requests == 7 + 1 + 2
+
+    def test_statement_timeout_is_retried(self, snapshots):
+        """Test that a statement timeout (57014) retries the page instead of failing the read"""
+        supabase = FakeSupabase(snapshots, failures=[None, APIError({'code': '57014', 'message': 'canceling statement'})])
+        pages = read_partition(supabase, page_size=10)
+
+        assert keys(row for page in pages for row in page) == sorted(keys(snapshots))
+
+    def test_retries_are_bounded(self, snapshots):
+        """Test that a persistent transient error is raised after max_retries"""
+        supabase = FakeSupabase(snapshots, failures=[httpx.ConnectError('down')] * 3)
+
+        with pytest.raises(httpx.ConnectError):
+            read_partition(supabase, page_size=10, max_retries=2)
+        assert supabase.requests == 3
+
+
+class TestRetry:
+    """Test which failures are treated as transient"""
+
+    @pytest.mark.parametrize('error', [
+        httpx.ConnectError('reset'),
+        APIError({'code': '57014', 'message': 'canceling statement due to statement timeout'}),
+        APIError({'code': 'PGRST003', 'message': 'Timed out acquiring connection from connection pool'}),
+        APIError({'code': '08006', 'message': 'connection failure'}),
+        APIError({'code': 503, 'message': 'JSON could not be generated'}),
+    ])
+    def test_transient(self, error):
+        """Test that dropped connections, PostgREST 5xx and timeouts are retried"""
+        assert is_transient(error)
+
+    @pytest.mark.parametrize('error', [
+        APIError({'code': '42703', 'message': 'column does not exist'}),
+        APIError({'code': 'PGRST116', 'message': 'no rows'}),
+        APIError({'code': 404, 'message': 'JSON could not be generated'}),
+        ValueError('bad filter'),
+    ])
+    def test_permanent(self, error):
+        """Test that client errors fail fast"""
+        assert not is_transient(error)
+
+    def test_permanent_errors_are_not_retried(self):
+        """Test that execute_with_retry raises a bad query on the first attempt"""
+        attempts = []
+
+        def build_query():
+            attempts.append(1)
+            raise APIError({'code': '42703', 'message': 'column does not exist'})
+
+        with pytest.raises(APIError):
+            execute_with_retry(build_query)
+        assert len(attempts) == 1
+
+
+class TestReadPages:
+    """Test reading split across concurrent key partitions"""
+
+    def test_partitions_cover_every_row_once(self, snapshots):
+        """Test that concurrent partitions together return each row exactly once"""
+        rows = list(read_rows(FakeSupabase(snapshots, max_rows=4), 'view_snapshots', 'view_count',
+                              page_size=4, workers=3))
+
+        assert sorted(keys(rows)) == sorted(keys(snapshots))
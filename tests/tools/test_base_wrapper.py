@@ -15,9 +15,21 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../.
 from lib.tools.base_wrapper import (
     wrapTool,
     MemoryCache,
+    LRUCache,
     SimpleLogger,
+    SingleFlight,
+    Bulkhead,
+    BulkheadRegistry,
+    CircuitBreaker,
+    ToolHealthRegistry,
+    HedgeBudget,
+    BatchLoader,
+    wrapBatchTool,
+    create_cache_key,
     createToolContext,
-    executeParallel
+    getToolStats,
+    executeParallel,
+    MAX_BATCH_LOADERS
 )
 
 class TestMemoryCache:
@@ -78,6 +90,79 @@ class TestMemoryCache:
         assert 'valid' in cache.cache
 
 
+class TestLRUCache:
+    """Test the bounded LRU cache backend"""
+    
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used(self):
+        """Test that the oldest untouched entry is evicted at the entry cap"""
+        cache = LRUCache(max_entries=2, sweep_interval=None)
+        
+        await cache.set('a', 1)
+        await cache.set('b', 2)
+        await cache.get('a')  # 'b' is now least recently used
+        await cache.set('c', 3)
+        
+        assert await cache.get('a') == 1
+        assert await cache.get('b') is None
+        assert await cache.get('c') == 3
+        assert cache.get_stats()['evictions'] == 1
+    
+    @pytest.mark.asyncio
+    async def test_byte_budget(self):
+        """Test that entries are evicted to stay under the byte budget"""
+        cache = LRUCache(max_entries=100, max_bytes=2000, sweep_interval=None)
+        
+        for i in range(10):
+            await cache.set(f'key_{i}', 'x' * 500)
+        
+        stats = cache.get_stats()
+        assert stats['bytes'] <= 2000
+        assert stats['entries'] < 10
+        assert await cache.get('key_9') == 'x' * 500
+    
+    @pytest.mark.asyncio
+    async def test_ttl_lru_prefers_expired(self):
+        """Test that ttl-lru evicts expired entries before live ones"""
+        cache = LRUCache(max_entries=2, eviction_policy='ttl-lru', sweep_interval=None)
+        
+        await cache.set('live', 'data', ttl=100)
+        await cache.set('stale', 'data', ttl=0.01)
+        await asyncio.sleep(0.02)
+        await cache.set('new', 'data', ttl=100)
+        
+        assert await cache.exists('live') == True
+        assert await cache.exists('new') == True
+        assert cache.get_stats()['evictions'] == 0
+        assert cache.get_stats()['expirations'] == 1
+    
+    @pytest.mark.asyncio
+    async def test_hit_miss_counters(self):
+        """Test hit and miss accounting"""
+        cache = LRUCache(sweep_interval=None)
+        
+        await cache.set('key', 'value')
+        await cache.get('key')
+        await cache.get('missing')
+        
+        stats = cache.get_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['hit_ratio'] == 0.5
+    
+    @pytest.mark.asyncio
+    async def test_background_sweep(self):
+        """Test that expired entries are swept without being read"""
+        cache = LRUCache(sweep_interval=0.05)
+        
+        await cache.set('key', 'value', ttl=0.01)
+        await asyncio.sleep(0.15)
+        
+        assert 'key' not in cache.cache
+        assert cache.get_stats()['bytes'] == 0
+        cache.close()
+
+
 class TestWrapTool:
     """Test the tool wrapper functionality"""
     
@@ -222,6 +307,225 @@ class TestWrapTool:
         assert result['error']['retryable'] == False
 
 
+class TestRequestCoalescing:
+    """Test single-flight coalescing of identical concurrent calls"""
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self):
+        """Test that identical concurrent calls run the handler once"""
+        call_count = 0
+        
+        async def slow_handler(params, context):
+            nonlocal call_count
+            call_count += 1
+            await asyncio.sleep(0.05)
+            return {'success': True, 'data': {'id': params['id']}}
+        
+        single_flight = SingleFlight()
+        context = createToolContext({'singleFlight': single_flight})
+        wrapped = wrapTool({
+            'name': 'coalesced_tool',
+            'description': 'Coalesced test tool',
+            'parameters': {},
+            'handler': slow_handler,
+            'cacheTTL': 5
+        })
+        
+        results = await asyncio.gather(*[wrapped({'id': 1}, context) for _ in range(5)])
+        
+        assert call_count == 1
+        assert all(r['data'] == {'id': 1} for r in results)
+        assert sum(1 for r in results if r['metadata'].get('coalesced')) == 4
+        assert single_flight.get_stats()['deduplicated'] == 4
+        assert single_flight.get_stats()['in_flight'] == 0
+    
+    @pytest.mark.asyncio
+    async def test_failure_propagates_to_waiters(self):
+        """Test that every waiter receives the shared failure"""
+        call_count = 0
+        
+        async def failing_handler(params, context):
+            nonlocal call_count
+            call_count += 1
+            await asyncio.sleep(0.05)
+            raise ValueError("Backend unavailable")
+        
+        context = createToolContext({'singleFlight': SingleFlight()})
+        wrapped = wrapTool({
+            'name': 'failing_tool',
+            'description': 'Failing test tool',
+            'parameters': {},
+            'handler': failing_handler,
+            'cacheTTL': 5,
+            'retryConfig': {'maxRetries': 1}
+        })
+        
+        results = await asyncio.gather(*[wrapped({}, context) for _ in range(3)])
+        
+        assert call_count == 1
+        assert all(r['success'] == False for r in results)
+        assert all('Backend unavailable' in r['error']['message'] for r in results)
+    
+    @pytest.mark.asyncio
+    async def test_waiter_cancellation_does_not_cancel_others(self):
+        """Test that cancelling one caller leaves the shared call running"""
+        async def slow_handler(params, context):
+            await asyncio.sleep(0.1)
+            return {'success': True, 'data': 'done'}
+        
+        single_flight = SingleFlight()
+        context = createToolContext({'singleFlight': single_flight})
+        wrapped = wrapTool({
+            'name': 'cancel_tool',
+            'description': 'Cancellation test tool',
+            'parameters': {},
+            'handler': slow_handler,
+            'cacheTTL': 5
+        })
+        
+        first = asyncio.ensure_future(wrapped({}, context))
+        second = asyncio.ensure_future(wrapped({}, context))
+        await asyncio.sleep(0.02)
+        first.cancel()
+        
+        result = await second
+        assert first.cancelled()
+        assert result['data'] == 'done'
+    
+    @pytest.mark.asyncio
+    async def test_last_waiter_cancellation_cancels_handler(self):
+        """Test that the shared call is cancelled when nobody is waiting"""
+        handler_cancelled = False
+        
+        async def slow_handler(params, context):
+            nonlocal handler_cancelled
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                handler_cancelled = True
+                raise
+            return {'success': True, 'data': 'done'}
+        
+        single_flight = SingleFlight()
+        context = createToolContext({'singleFlight': single_flight})
+        wrapped = wrapTool({
+            'name': 'abandoned_tool',
+            'description': 'Abandoned test tool',
+            'parameters': {},
+            'handler': slow_handler,
+            'cacheTTL': 5
+        })
+        
+        task = asyncio.ensure_future(wrapped({}, context))
+        await asyncio.sleep(0.02)
+        task.cancel()
+        await asyncio.sleep(0.02)
+        
+        assert handler_cancelled
+        assert single_flight.get_stats()['in_flight'] == 0
+
+
+class TestStaleAndNegativeCaching:
+    """Test stale-while-revalidate and negative caching"""
+    
+    @pytest.mark.asyncio
+    async def test_stale_value_served_while_revalidating(self):
+        """Test that an expired value is returned immediately and refreshed in the background"""
+        call_count = 0
+        
+        async def counting_handler(params, context):
+            nonlocal call_count
+            call_count += 1
+            await asyncio.sleep(0.02)
+            return {'success': True, 'data': {'version': call_count}}
+        
+        context = createToolContext({'singleFlight': SingleFlight()})
+        wrapped = wrapTool({
+            'name': 'swr_tool',
+            'description': 'Stale-while-revalidate test tool',
+            'parameters': {},
+            'handler': counting_handler,
+            'cacheTTL': 0.05,
+            'staleTTL': 5
+        })
+        
+        first = await wrapped({}, context)
+        assert first['metadata']['source'] == 'handler'
+        
+        await asyncio.sleep(0.08)
+        
+        stale = await wrapped({}, context)
+        assert stale['metadata']['source'] == 'stale'
+        assert stale['data'] == {'version': 1}
+        
+        await asyncio.sleep(0.05)
+        
+        fresh = await wrapped({}, context)
+        assert fresh['metadata']['source'] == 'cache'
+        assert fresh['data'] == {'version': 2}
+        assert call_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_not_found_is_negatively_cached(self):
+        """Test that repeated lookups of a missing video skip the handler"""
+        call_count = 0
+        
+        async def missing_handler(params, context):
+            nonlocal call_count
+            call_count += 1
+            return {
+                'success': False,
+                'error': {
+                    'code': 'VIDEO_NOT_FOUND',
+                    'message': f"Video {params['video_id']} not found"
+                }
+            }
+        
+        context = createToolContext()
+        wrapped = wrapTool({
+            'name': 'negative_tool',
+            'description': 'Negative caching test tool',
+            'parameters': {},
+            'handler': missing_handler,
+            'cacheTTL': 300,
+            'negativeTTL': 30
+        })
+        
+        first = await wrapped({'video_id': 'missing'}, context)
+        second = await wrapped({'video_id': 'missing'}, context)
+        
+        assert call_count == 1
+        assert first['metadata']['source'] == 'handler'
+        assert second['success'] == False
+        assert second['error']['code'] == 'VIDEO_NOT_FOUND'
+        assert second['metadata']['source'] == 'negative-cache'
+    
+    @pytest.mark.asyncio
+    async def test_other_errors_not_negatively_cached(self):
+        """Test that only not-found errors are remembered"""
+        call_count = 0
+        
+        async def error_handler(params, context):
+            nonlocal call_count
+            call_count += 1
+            return {'success': False, 'error': {'code': 'DATABASE_ERROR', 'message': 'boom'}}
+        
+        context = createToolContext()
+        wrapped = wrapTool({
+            'name': 'db_error_tool',
+            'description': 'Database error test tool',
+            'parameters': {},
+            'handler': error_handler,
+            'cacheTTL': 300,
+            'negativeTTL': 30
+        })
+        
+        await wrapped({}, context)
+        await wrapped({}, context)
+        
+        assert call_count == 2
+
+
 class TestExecuteParallel:
     """Test parallel tool execution"""
     
@@ -282,6 +586,631 @@ class TestExecuteParallel:
         assert 'not marked as parallel-safe' in str(exc_info.value)
 
 
+class TestBulkheads:
+    """Test per-tool and global concurrency limits"""
+    
+    @pytest.mark.asyncio
+    async def test_per_tool_limit(self):
+        """Test that a tool never runs more handlers than its bulkhead allows"""
+        active = 0
+        peak = 0
+        
+        async def tracked_handler(params, context):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.02)
+            active -= 1
+            return {'success': True, 'data': params['id']}
+        
+        context = createToolContext({'bulkheads': BulkheadRegistry()})
+        tools = [
+            {
+                'config': {
+                    'name': 'limited_tool',
+                    'description': 'Limited tool',
+                    'parameters': {},
+                    'handler': tracked_handler,
+                    'maxConcurrency': 2
+                },
+                'params': {'id': i}
+            }
+            for i in range(6)
+        ]
+        
+        results = await executeParallel(tools, context)
+        
+        assert peak == 2
+        assert [r['data'] for r in results] == list(range(6))
+        assert max(r['metadata']['queueTime'] for r in results) > 0
+    
+    @pytest.mark.asyncio
+    async def test_global_limit_across_tools(self):
+        """Test that the global limit caps all tools together"""
+        active = 0
+        peak = 0
+        
+        async def tracked_handler(params, context):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.02)
+            active -= 1
+            return {'success': True, 'data': None}
+        
+        context = createToolContext({'bulkheads': BulkheadRegistry(global_limit=3)})
+        tools = [
+            {
+                'config': {
+                    'name': f'tool_{i % 3}',
+                    'description': 'Tool',
+                    'parameters': {},
+                    'handler': tracked_handler
+                },
+                'params': {'id': i}
+            }
+            for i in range(9)
+        ]
+        
+        await executeParallel(tools, context)
+        
+        assert peak == 3
+    
+    @pytest.mark.asyncio
+    async def test_priority_admission_order(self):
+        """Test that queued callers are admitted highest priority first"""
+        bulkhead = Bulkhead(1)
+        order = []
+        
+        await bulkhead.acquire()
+        
+        async def waiter(name, priority):
+            await bulkhead.acquire(priority)
+            order.append(name)
+            bulkhead.release()
+        
+        tasks = [
+            asyncio.ensure_future(waiter('low', 0)),
+            asyncio.ensure_future(waiter('high', 10)),
+            asyncio.ensure_future(waiter('medium', 5))
+        ]
+        await asyncio.sleep(0)
+        bulkhead.release()
+        await asyncio.gather(*tasks)
+        
+        assert order == ['high', 'medium', 'low']
+        assert bulkhead.active == 0
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_releases_nothing(self):
+        """Test that a cancelled waiter does not leak a slot"""
+        bulkhead = Bulkhead(1)
+        await bulkhead.acquire()
+        
+        waiter = asyncio.ensure_future(bulkhead.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0)
+        bulkhead.release()
+        
+        assert bulkhead.active == 0
+        assert bulkhead.queued == 0
+
+
+class TestCircuitBreaker:
+    """Test circuit breaking and adaptive timeouts"""
+    
+    @pytest.mark.asyncio
+    async def test_opens_after_failures_and_fails_fast(self):
+        """Test that an unhealthy tool stops calling its handler"""
+        call_count = 0
+        
+        async def down_handler(params, context):
+            nonlocal call_count
+            call_count += 1
+            raise Exception("Connection refused")
+        
+        context = createToolContext({'toolHealth': ToolHealthRegistry()})
+        wrapped = wrapTool({
+            'name': 'down_tool',
+            'description': 'Down test tool',
+            'parameters': {},
+            'handler': down_handler,
+            'circuitBreaker': {'failureThreshold': 2, 'resetTimeoutMs': 60000},
+            'retryConfig': {'maxRetries': 5, 'backoffMs': 1}
+        })
+        
+        first = await wrapped({}, context)
+        assert call_count == 2
+        assert first['error']['code'] == 'CIRCUIT_OPEN'
+        assert first['metadata']['source'] == 'circuit-open'
+        
+        second = await wrapped({}, context)
+        assert call_count == 2
+        assert second['error']['code'] == 'CIRCUIT_OPEN'
+        
+        stats = getToolStats(context, 'down_tool')
+        assert stats['down_tool']['circuit']['state'] == 'open'
+        assert stats['down_tool']['circuit']['rejections'] == 2
+
+    @pytest.mark.asyncio
+    async def test_breaker_is_opt_in(self):
+        """Test that a tool without circuitBreaker keeps calling through after repeated failures"""
+        call_count = 0
+
+        async def down_handler(params, context):
+            nonlocal call_count
+            call_count += 1
+            raise Exception("Connection refused")
+
+        context = createToolContext({'toolHealth': ToolHealthRegistry()})
+        wrapped = wrapTool({
+            'name': 'unguarded_tool',
+            'description': 'Tool without a breaker',
+            'parameters': {},
+            'handler': down_handler,
+            'retryConfig': {'maxRetries': 5, 'backoffMs': 1}
+        })
+
+        for _ in range(3):
+            result = await wrapped({}, context)
+            assert result['error']['code'] != 'CIRCUIT_OPEN'
+
+        assert call_count == 15
+        assert getToolStats(context, 'unguarded_tool')['unguarded_tool']['circuit'] is None
+
+    def test_half_open_probe_closes_on_success(self):
+        """Test the open -> half-open -> closed transition"""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+        
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        
+        assert breaker.allow_request() == True
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow_request() == False  # only one probe at a time
+        
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+    
+    def test_half_open_probe_reopens_on_failure(self):
+        """Test that a failed probe re-opens the circuit"""
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.0)
+        for _ in range(3):
+            breaker.record_failure()
+        
+        assert breaker.allow_request() == True
+        breaker.record_failure()
+        
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.get_stats()['times_opened'] == 2
+    
+    @pytest.mark.asyncio
+    async def test_adaptive_timeout_follows_latency(self):
+        """Test that the timeout tracks the handler's own p99"""
+        delay = 0.01
+        
+        async def variable_handler(params, context):
+            await asyncio.sleep(delay)
+            return {'success': True, 'data': 'done'}
+        
+        health = ToolHealthRegistry()
+        context = createToolContext({'toolHealth': health})
+        config = {
+            'name': 'adaptive_tool',
+            'description': 'Adaptive timeout test tool',
+            'parameters': {},
+            'handler': variable_handler,
+            'timeout': 5,
+            'adaptiveTimeout': {'multiplier': 3, 'minSamples': 5, 'minMs': 1},
+            'retryConfig': {'maxRetries': 1}
+        }
+        wrapped = wrapTool(config)
+        
+        assert health.timeout_for(config) == 5
+        
+        for _ in range(5):
+            await wrapped({}, context)
+        
+        assert health.timeout_for(config) < 0.5
+        
+        delay = 1
+        result = await wrapped({}, context)
+        assert result['success'] == False
+        assert 'timeout' in result['error']['message'].lower()
+
+
+    @pytest.mark.asyncio
+    async def test_handler_timeout_error_without_timeout(self):
+        """A TimeoutError raised by the handler is a normal error when no timeout is set"""
+        async def flaky_handler(params, context):
+            raise asyncio.TimeoutError("upstream timed out")
+        
+        health = ToolHealthRegistry()
+        context = createToolContext({'toolHealth': health})
+        wrapped = wrapTool({
+            'name': 'no_timeout_tool',
+            'description': 'No timeout test tool',
+            'parameters': {},
+            'handler': flaky_handler,
+            'retryConfig': {'maxRetries': 2, 'backoffMs': 1}
+        })
+        
+        result = await wrapped({}, context)
+        
+        assert result['success'] == False
+        assert result['error']['message'] == 'upstream timed out'
+        stats = health.get_stats('no_timeout_tool')['no_timeout_tool']
+        assert stats['latency'] is None or stats['latency']['samples'] == 0
+
+
+class TestHedgedRequests:
+    """Test hedging of slow calls"""
+    
+    def _warm_up(self, health, tool_name, seconds=0.01, samples=20):
+        for _ in range(samples):
+            health.latency(tool_name).record(seconds)
+    
+    @pytest.mark.asyncio
+    async def test_slow_call_is_hedged_and_loser_cancelled(self):
+        """Test that a duplicate fires after p95 and the slow call is cancelled"""
+        calls = 0
+        cancelled = 0
+        
+        async def tail_handler(params, context):
+            nonlocal calls, cancelled
+            calls += 1
+            try:
+                # First call lands in the tail, the hedge is fast
+                await asyncio.sleep(1 if calls == 1 else 0.01)
+            except asyncio.CancelledError:
+                cancelled += 1
+                raise
+            return {'success': True, 'data': calls}
+        
+        health = ToolHealthRegistry()
+        budget = HedgeBudget(max_ratio=1.0)
+        self._warm_up(health, 'hedged_tool')
+        context = createToolContext({'toolHealth': health, 'hedgeBudget': budget})
+        wrapped = wrapTool({
+            'name': 'hedged_tool',
+            'description': 'Hedged test tool',
+            'parameters': {},
+            'handler': tail_handler,
+            'hedge': True
+        })
+        
+        start = time.time()
+        result = await wrapped({}, context)
+        await asyncio.sleep(0)
+        
+        assert time.time() - start < 0.5
+        assert result['success'] == True
+        assert result['metadata']['hedged'] == True
+        assert result['metadata']['hedgeWon'] == True
+        assert cancelled == 1
+        assert budget.get_stats()['hedges'] == 1
+        assert budget.get_stats()['wins'] == 1
+    
+    @pytest.mark.asyncio
+    async def test_hedging_respects_budget(self):
+        """Test that no duplicate fires once the budget is spent"""
+        calls = 0
+        
+        async def slow_handler(params, context):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return {'success': True, 'data': 'done'}
+        
+        health = ToolHealthRegistry()
+        budget = HedgeBudget(max_ratio=1.0, max_hedges=0)
+        self._warm_up(health, 'budget_tool')
+        context = createToolContext({'toolHealth': health, 'hedgeBudget': budget})
+        wrapped = wrapTool({
+            'name': 'budget_tool',
+            'description': 'Budgeted hedge test tool',
+            'parameters': {},
+            'handler': slow_handler,
+            'hedge': True
+        })
+        
+        result = await wrapped({}, context)
+        
+        assert result['success'] == True
+        assert result['metadata']['hedged'] == False
+        assert calls == 1
+        assert budget.get_stats()['denied'] == 1
+    
+    @pytest.mark.asyncio
+    async def test_hedge_needs_a_bulkhead_slot(self):
+        """Test that a duplicate never pushes in-flight calls past maxConcurrency"""
+        calls = 0
+        peak = 0
+        active = 0
+        
+        async def slow_handler(params, context):
+            nonlocal calls, peak, active
+            calls += 1
+            active += 1
+            peak = max(peak, active)
+            try:
+                await asyncio.sleep(0.05)
+            finally:
+                active -= 1
+            return {'success': True, 'data': 'done'}
+        
+        health = ToolHealthRegistry()
+        bulkheads = BulkheadRegistry()
+        budget = HedgeBudget(max_ratio=1.0)
+        self._warm_up(health, 'bounded_hedge_tool')
+        context = createToolContext({'toolHealth': health, 'hedgeBudget': budget, 'bulkheads': bulkheads})
+        config = {
+            'name': 'bounded_hedge_tool',
+            'description': 'Bounded hedge test tool',
+            'parameters': {},
+            'handler': slow_handler,
+            'hedge': True,
+            'maxConcurrency': 1
+        }
+        
+        result = await wrapTool(config)({}, context)
+        assert result['metadata']['hedged'] == False
+        assert calls == 1
+        assert budget.get_stats()['hedges'] == 0
+        
+        # With a spare slot the duplicate fires, and its slot is returned afterwards
+        config['maxConcurrency'] = 2
+        result = await wrapTool(config)({}, context)
+        await asyncio.sleep(0.01)  # Let the cancelled loser unwind
+        assert result['metadata']['hedged'] == True
+        assert peak == 2
+        assert bulkheads.get_stats()['bounded_hedge_tool']['active'] == 0
+    
+    @pytest.mark.asyncio
+    async def test_no_hedge_before_warm_up(self):
+        """Test that hedging waits for enough latency samples"""
+        async def handler(params, context):
+            return {'success': True, 'data': 'done'}
+        
+        budget = HedgeBudget(max_ratio=1.0)
+        context = createToolContext({'toolHealth': ToolHealthRegistry(), 'hedgeBudget': budget})
+        wrapped = wrapTool({
+            'name': 'cold_tool',
+            'description': 'Cold hedge test tool',
+            'parameters': {},
+            'handler': handler,
+            'hedge': True
+        })
+        
+        result = await wrapped({}, context)
+        
+        assert 'hedged' not in result['metadata']
+        assert budget.get_stats()['calls'] == 0
+
+
+class TestBatchTools:
+    """Test micro-batching of single-ID tool calls"""
+    
+    def _batch_config(self, batch_handler, **overrides):
+        config = {
+            'name': 'get_video_bundle',
+            'description': 'Batched bundle tool',
+            'parameters': {},
+            'batchHandler': batch_handler,
+            'keyParam': 'video_id',
+            'batchWindowMs': 5,
+            'cacheTTL': 60,
+            'notFoundCode': 'VIDEO_NOT_FOUND',
+            'retryConfig': {'maxRetries': 1}
+        }
+        config.update(overrides)
+        return config
+    
+    @pytest.mark.asyncio
+    async def test_calls_in_window_share_one_batch(self):
+        """Test that concurrent single-ID calls become one batched handler call"""
+        batches = []
+        
+        async def batch_handler(keys, context):
+            batches.append(sorted(keys))
+            return {'success': True, 'data': {key: {'id': key} for key in keys}}
+        
+        context = createToolContext({'batchLoaders': {}})
+        tools = [
+            {'config': self._batch_config(batch_handler), 'params': {'video_id': f'vid_{i}'}}
+            for i in range(5)
+        ]
+        
+        results = await executeParallel(tools, context)
+        
+        assert batches == [[f'vid_{i}' for i in range(5)]]
+        assert [r['data']['id'] for r in results] == [f'vid_{i}' for i in range(5)]
+        assert all(r['metadata']['source'] == 'batch' for r in results)
+    
+    @pytest.mark.asyncio
+    async def test_each_key_cached_separately(self):
+        """Test that batched results land in per-key cache entries"""
+        batches = []
+        
+        async def batch_handler(keys, context):
+            batches.append(sorted(keys))
+            return {'success': True, 'data': {key: {'id': key} for key in keys}}
+        
+        context = createToolContext({'batchLoaders': {}})
+        wrapped = wrapBatchTool(self._batch_config(batch_handler))
+        
+        await asyncio.gather(wrapped({'video_id': 'a'}, context), wrapped({'video_id': 'b'}, context))
+        result = await wrapped({'video_id': 'a'}, context)
+        
+        assert len(batches) == 1
+        assert result['metadata']['source'] == 'cache'
+        assert await context['cache'].get(create_cache_key('get_video_bundle', {'video_id': 'b'})) == {'id': 'b'}
+    
+    @pytest.mark.asyncio
+    async def test_missing_keys_are_not_found(self):
+        """Test that keys absent from the batch answer with a not-found error"""
+        async def batch_handler(keys, context):
+            return {'success': True, 'data': {'found': {'id': 'found'}}}
+        
+        context = createToolContext({'batchLoaders': {}})
+        wrapped = wrapBatchTool(self._batch_config(batch_handler))
+        
+        found, missing = await asyncio.gather(
+            wrapped({'video_id': 'found'}, context),
+            wrapped({'video_id': 'missing'}, context)
+        )
+        
+        assert found['success'] == True
+        assert missing['success'] == False
+        assert missing['error']['code'] == 'VIDEO_NOT_FOUND'
+    
+    @pytest.mark.asyncio
+    async def test_batch_failure_reaches_every_caller(self):
+        """Test that a failed batch fails each key"""
+        async def batch_handler(keys, context):
+            raise Exception("Database unavailable")
+        
+        context = createToolContext({'batchLoaders': {}})
+        wrapped = wrapBatchTool(self._batch_config(batch_handler))
+        
+        results = await asyncio.gather(*[wrapped({'video_id': k}, context) for k in 'abc'])
+        
+        assert all(r['success'] == False for r in results)
+        assert all('Database unavailable' in r['error']['message'] for r in results)
+    
+    @pytest.mark.asyncio
+    async def test_max_batch_size_flushes_early(self):
+        """Test that a full batch dispatches without waiting for the window"""
+        sizes = []
+        
+        async def batch_fn(keys, context):
+            sizes.append(len(keys))
+            return {key: key for key in keys}
+        
+        loader = BatchLoader(batch_fn, max_batch_size=3, window_ms=1000)
+        
+        start = time.time()
+        results = await asyncio.gather(*[loader.load(i) for i in range(3)])
+        
+        assert time.time() - start < 0.5
+        assert results == [0, 1, 2]
+        assert sizes == [3]
+
+    @pytest.mark.asyncio
+    async def test_rewrapped_tool_uses_its_own_handler(self):
+        """Test that a second wrapBatchTool with the same name runs its own batch handler"""
+        async def old_handler(keys, context):
+            return {'success': True, 'data': {key: 'old' for key in keys}}
+
+        async def new_handler(keys, context):
+            return {'success': True, 'data': {key: 'new' for key in keys}}
+
+        context = createToolContext({'batchLoaders': {}})
+        await wrapBatchTool(self._batch_config(old_handler, cacheTTL=None))({'video_id': 'a'}, context)
+        result = await wrapBatchTool(self._batch_config(new_handler, cacheTTL=None))({'video_id': 'a'}, context)
+
+        assert result['data'] == 'new'
+
+    @pytest.mark.asyncio
+    async def test_per_call_options_reach_the_batch(self):
+        """Test that executeParallel priorities and limits split batches instead of being dropped"""
+        batches = []
+
+        async def batch_handler(keys, context):
+            batches.append(sorted(keys))
+            return {'success': True, 'data': {key: {'id': key} for key in keys}}
+
+        context = createToolContext({'batchLoaders': {}})
+        config = self._batch_config(batch_handler)
+        tools = [
+            {'config': config, 'params': {'video_id': 'a'}, 'priority': 5},
+            {'config': config, 'params': {'video_id': 'b'}, 'priority': 5},
+            {'config': config, 'params': {'video_id': 'c'}, 'priority': 0},
+            {'config': {**config, 'maxConcurrency': 1}, 'params': {'video_id': 'd'}}
+        ]
+
+        results = await executeParallel(tools, context)
+
+        assert all(r['success'] for r in results)
+        assert sorted(batches) == [['a', 'b'], ['c'], ['d']]
+
+    @pytest.mark.asyncio
+    async def test_extra_params_are_rejected(self):
+        """Test that params besides the key are refused instead of served from another call's result"""
+        batches = []
+
+        async def batch_handler(keys, context):
+            batches.append(sorted(keys))
+            return {'success': True, 'data': {key: {'id': key} for key in keys}}
+
+        context = createToolContext({'batchLoaders': {}})
+        wrapped = wrapBatchTool(self._batch_config(batch_handler))
+
+        await wrapped({'video_id': 'a'}, context)
+        result = await wrapped({'video_id': 'a', 'include_comments': True}, context)
+
+        assert result['success'] == False
+        assert result['error']['code'] == 'INVALID_PARAMS'
+        assert 'include_comments' in result['error']['message']
+        assert batches == [['a']]
+
+    @pytest.mark.asyncio
+    async def test_loader_registry_is_bounded(self):
+        """Test that loaders for many distinct configs are evicted least recently used first"""
+        async def batch_handler(keys, context):
+            return {'success': True, 'data': {key: {'id': key} for key in keys}}
+
+        loaders = {}
+        context = createToolContext({'batchLoaders': loaders})
+        first = wrapBatchTool(self._batch_config(batch_handler, cacheTTL=None, priority=-1))
+        await first({'video_id': 'a'}, context)
+
+        for priority in range(MAX_BATCH_LOADERS + 10):
+            wrapped = wrapBatchTool(self._batch_config(batch_handler, cacheTTL=None, priority=priority))
+            await wrapped({'video_id': 'a'}, context)
+            if priority == 0:
+                # Touching the first loader again keeps it past the others
+                await first({'video_id': 'a'}, context)
+
+        assert len(loaders) == MAX_BATCH_LOADERS
+        assert not any(key[2] == 0 for key in loaders)
+        result = await first({'video_id': 'b'}, context)
+        assert result['data'] == {'id': 'b'}
+
+
+class TestCacheKey:
+    """Test canonical cache-key hashing"""
+    
+    def test_stable_across_processes(self):
+        """Test that keys are pinned, independent of dict order and hash seeds"""
+        expected = 'f77a267aa4425d5ac26e5e4f52b45178'
+        
+        assert create_cache_key('search_titles', {'query': 'woodworking', 'top_k': 20}) == expected
+        assert create_cache_key('search_titles', {'top_k': 20, 'query': 'woodworking'}) == expected
+    
+    def test_distinguishes_types_and_boundaries(self):
+        """Test that differently-typed or differently-split params never collide"""
+        keys = {
+            create_cache_key('tool', {'v': 1}),
+            create_cache_key('tool', {'v': 1.0}),
+            create_cache_key('tool', {'v': True}),
+            create_cache_key('tool', {'v': '1'}),
+            create_cache_key('tool', {'v': None}),
+            create_cache_key('tool', {'v': ['ab', 'c']}),
+            create_cache_key('tool', {'v': ['a', 'bc']}),
+            create_cache_key('tool', {'v': [1.0, 2.0]}),
+            create_cache_key('tool', {'v': [1, 2]}),
+            create_cache_key('other_tool', {'v': 1})
+        }
+        
+        assert len(keys) == 10
+    
+    def test_tuples_match_lists(self):
+        """Test that tuples hash like lists, as they did through JSON"""
+        assert create_cache_key('tool', {'ids': ('a', 'b')}) == create_cache_key('tool', {'ids': ['a', 'b']})
+
+
 class TestToolContext:
     """Test tool context creation"""
     
@@ -294,6 +1223,16 @@ class TestToolContext:
         assert context['cache'] is not None
         assert context['logger'] is not None
     
+    def test_default_cache_is_bounded(self):
+        """Contexts without their own cache get a bounded LRU cache"""
+        from lib.tools.base_wrapper import DEFAULT_CACHE_MAX_ENTRIES, DEFAULT_CACHE_MAX_BYTES
+        
+        cache = createToolContext()['cache']
+        
+        assert isinstance(cache, LRUCache)
+        assert cache.max_entries == DEFAULT_CACHE_MAX_ENTRIES
+        assert cache.max_bytes == DEFAULT_CACHE_MAX_BYTES
+    
     def test_context_creation_with_overrides(self):
         """Test that context overrides work"""
         custom_cache = MemoryCache()
@@ -0,0 +1,125 @@
+"""
+Tests for the persistent cache tiers
+"""
+
+import pytest
+import asyncio
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from lib.tools.base_wrapper import LRUCache, wrapTool, createToolContext
+from lib.tools.disk_cache import SQLiteCache, TieredCache, serialize, deserialize
+
+
+class TestSQLiteCache:
+    """Test the on-disk cache"""
+    
+    @pytest.mark.asyncio
+    async def test_set_get_delete(self, tmp_path):
+        """Test basic round trips"""
+        cache = SQLiteCache(str(tmp_path / 'cache.sqlite3'))
+        
+        await cache.set('key', {'videos': [{'id': 'abc', 'views': 1000}]}, ttl=5)
+        assert await cache.get('key') == {'videos': [{'id': 'abc', 'views': 1000}]}
+        assert await cache.exists('key') == True
+        
+        await cache.delete('key')
+        assert await cache.get('key') is None
+        cache.close()
+    
+    @pytest.mark.asyncio
+    async def test_expiry_and_cleanup(self, tmp_path):
+        """Test that expired entries are hidden and swept"""
+        cache = SQLiteCache(str(tmp_path / 'cache.sqlite3'))
+        
+        await cache.set('short', 'value', ttl=0.05)
+        await cache.set('long', 'value', ttl=100)
+        await asyncio.sleep(0.1)
+        
+        assert await cache.get('short') is None
+        assert cache.cleanup() == 1
+        assert await cache.get('long') == 'value'
+        cache.close()
+
+    @pytest.mark.asyncio
+    async def test_writes_trigger_cleanup(self, tmp_path):
+        """Test that expired rows are deleted from disk without calling cleanup()"""
+        cache = SQLiteCache(str(tmp_path / 'cache.sqlite3'), cleanup_every=3)
+
+        await cache.set('expired_1', 'value', ttl=0.01)
+        await cache.set('expired_2', 'value', ttl=0.01)
+        await asyncio.sleep(0.05)
+        await cache.set('live', 'value', ttl=100)
+
+        rows = cache._conn.execute('SELECT key FROM tool_cache').fetchall()
+        assert rows == [('live',)]
+        cache.close()
+
+    @pytest.mark.asyncio
+    async def test_shared_between_connections(self, tmp_path):
+        """Test that a second handle (as another worker would open) sees writes"""
+        path = str(tmp_path / 'cache.sqlite3')
+        writer = SQLiteCache(path)
+        reader = SQLiteCache(path)
+        
+        await writer.set('key', [1, 2, 3], ttl=5)
+        assert await reader.get('key') == [1, 2, 3]
+        
+        writer.close()
+        reader.close()
+    
+    def test_large_payloads_are_compressed(self):
+        """Test that large results are stored compactly"""
+        value = {'ids': [f'video_{i}' for i in range(2000)]}
+        encoding, payload = serialize(value)
+        
+        assert len(payload) < len(repr(value)) / 2
+        assert deserialize(encoding, payload) == value
+
+
+class TestTieredCache:
+    """Test the memory + disk cache"""
+    
+    @pytest.mark.asyncio
+    async def test_survives_memory_tier_loss(self, tmp_path):
+        """Test that a fresh memory tier (worker restart) is refilled from disk"""
+        path = str(tmp_path / 'cache.sqlite3')
+        first = TieredCache(LRUCache(sweep_interval=None), SQLiteCache(path))
+        await first.set('key', 'value', ttl=60)
+        
+        restarted = TieredCache(LRUCache(sweep_interval=None), SQLiteCache(path))
+        assert await restarted.get('key') == 'value'
+        assert await restarted.get('key') == 'value'
+        
+        stats = restarted.get_stats()
+        assert stats['persistent_hits'] == 1
+        assert stats['memory_hits'] == 1
+    
+    @pytest.mark.asyncio
+    async def test_works_as_tool_cache(self, tmp_path):
+        """Test that wrapTool can use the tiered cache from the context"""
+        call_count = 0
+        
+        async def handler(params, context):
+            nonlocal call_count
+            call_count += 1
+            return {'success': True, 'data': {'query': params['query']}}
+        
+        cache = TieredCache(LRUCache(sweep_interval=None), SQLiteCache(str(tmp_path / 'cache.sqlite3')))
+        context = createToolContext({'cache': cache})
+        wrapped = wrapTool({
+            'name': 'tiered_tool',
+            'description': 'Tiered cache test tool',
+            'parameters': {},
+            'handler': handler,
+            'cacheTTL': 60
+        })
+        
+        await wrapped({'query': 'woodworking'}, context)
+        result = await wrapped({'query': 'woodworking'}, context)
+        
+        assert call_count == 1
+        assert result['metadata']['source'] == 'cache'
@@ -0,0 +1,114 @@
+"""
+Tests for the tool metrics registry
+"""
+
+import pytest
+import json
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from lib.tools.metrics import LatencyHistogram, MetricsRegistry
+from lib.tools.base_wrapper import wrapTool, createToolContext, getMetrics, SimpleLogger
+
+
+class TestLatencyHistogram:
+    """Test the HDR-style histogram"""
+    
+    def test_percentiles_within_bucket_error(self):
+        """Test that percentiles land within the sub-bucket resolution"""
+        histogram = LatencyHistogram()
+        for i in range(1, 1001):
+            histogram.record(i / 1000)  # 1ms .. 1s
+        
+        assert histogram.count == 1000
+        assert histogram.percentile(0.5) == pytest.approx(0.5, rel=0.25)
+        assert histogram.percentile(0.99) == pytest.approx(0.99, rel=0.25)
+        assert histogram.max == 1.0
+    
+    def test_overflow_bucket(self):
+        """Test that values past the top bound are still counted"""
+        histogram = LatencyHistogram(max_value=1.0)
+        histogram.record(5.0)
+        
+        assert histogram.counts[-1] == 1
+        assert histogram.percentile(1.0) == 5.0
+
+
+class TestMetricsRegistry:
+    """Test registry export formats"""
+    
+    def test_prometheus_export(self):
+        """Test the Prometheus text format"""
+        registry = MetricsRegistry()
+        registry.inc('cache_hits', 'search_titles', 3)
+        registry.observe('handler_latency', 'search_titles', 0.012)
+        
+        text = registry.to_prometheus()
+        
+        assert '# TYPE tool_cache_hits_total counter' in text
+        assert 'tool_cache_hits_total{tool="search_titles"} 3' in text
+        assert '# TYPE tool_handler_latency_seconds histogram' in text
+        assert 'tool_handler_latency_seconds_bucket{tool="search_titles",le="+Inf"} 1' in text
+        assert 'tool_handler_latency_seconds_count{tool="search_titles"} 1' in text
+    
+    def test_json_snapshot(self):
+        """Test the JSON snapshot including hit ratio"""
+        registry = MetricsRegistry()
+        registry.inc('cache_hits', 'get_video_bundle', 3)
+        registry.inc('cache_misses', 'get_video_bundle', 1)
+        
+        snapshot = json.loads(registry.to_json())
+        tool = snapshot['tools']['get_video_bundle']
+        
+        assert tool['counters']['cache_hits'] == 3
+        assert tool['cache_hit_ratio'] == 0.75
+    
+    @pytest.mark.asyncio
+    async def test_wrapped_tool_records_metrics(self):
+        """Test that wrapTool feeds the registry from context"""
+        attempts = 0
+        
+        async def flaky_handler(params, context):
+            nonlocal attempts
+            attempts += 1
+            if attempts == 1:
+                raise Exception("Temporary failure")
+            return {'success': True, 'data': 'ok'}
+        
+        registry = MetricsRegistry()
+        context = createToolContext({'metrics': registry})
+        wrapped = wrapTool({
+            'name': 'metered_tool',
+            'description': 'Metered test tool',
+            'parameters': {},
+            'handler': flaky_handler,
+            'cacheTTL': 60,
+            'retryConfig': {'maxRetries': 2, 'backoffMs': 1}
+        })
+        
+        await wrapped({}, context)
+        await wrapped({}, context)
+        
+        assert registry.counter('calls', 'metered_tool') == 2
+        assert registry.counter('retries', 'metered_tool') == 1
+        assert registry.counter('handler_errors', 'metered_tool') == 1
+        assert registry.counter('cache_hits', 'metered_tool') == 1
+        assert registry.counter('cache_misses', 'metered_tool') == 1
+        assert registry.histogram('handler_latency', 'metered_tool').count == 1
+        assert 'tool_retries_total{tool="metered_tool"} 1' in getMetrics(context, 'prometheus')
+
+
+class TestDebugLogging:
+    """Test that debug logging can be switched off"""
+    
+    def test_debug_disabled_prints_nothing(self, capsys):
+        logger = SimpleLogger('[Test]', debug_enabled=False)
+        logger.debug('hidden')
+        logger.info('shown')
+        
+        output = capsys.readouterr().out
+        assert 'hidden' not in output
+        assert 'shown' in output